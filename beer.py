@@ -4,10 +4,42 @@
 import os
 import sys
 import log
-from language import Language
-from beershell import *
-from brewery.ingredients import *
-from units import *
+from shell import index
+from shell import server
+
+def create_shell( languages, verbosity=1, watch=False ):
+	"""Registers the languages, loads the ingredients and creates the beer shell.
+	
+	Modules are imported here to keep the autocompletion client light. When
+	watching, the changed ingredients files are reloaded while the shell runs.
+	"""
+	
+	from language import Language
+	from beershell import beershell
+	from brewery.ingredients import ingredient
+	
+	Language.initialize( lang="en" )
+	
+	for filename in languages:
+		Language.register( filename )
+		
+	ingredient.Ingredient.load_directory( "data%singredients" % os.sep )
+	
+	if watch:
+		ingredient.Ingredient.watch()
+	
+	return beershell.BeerShell( verbosity=verbosity )
+
+
+def build_completion_index( shell ):
+	"""Builds the static completion index of the beer shell."""
+	
+	from brewery.ingredients import ingredient
+	
+	data_paths = ingredient.Ingredient.get_catalog_files()
+	
+	return index.build( shell, index.get_index_path( "beer" ), data_paths=data_paths )
+
 
 if __name__ == "__main__":
 
@@ -16,30 +48,51 @@ if __name__ == "__main__":
 	
 	if len(argv) > 0 and argv[0] == "autocomplete":
 		argv.pop( 0 )
+		choices = []
 	
 		if len(argv) > 0:
-			Language.initialize( lang="en" )
-			Language.load( "hops.ini" )
-			Language.load( "ingredients.ini" )
-			ingredient.Ingredient.load_directory( "data%singredients" % os.sep )
-	
-			shell = beershell.BeerShell( verbosity=0 )
-			choices = shell.autocomplete( argv[0] )
+			completion_index = index.load( index.get_index_path( "beer" ) )
+			choices = index.complete( completion_index, argv[0] ) if completion_index != None else None
+			
+			if choices == None:
+				choices = server.request( server.get_socket_path( "beer" ), argv[0] )
+			
+			# Starts the completion server (which also builds the index) for the next requests
+			if choices == None:
+				server.spawn( [ sys.executable, os.path.realpath( __file__ ), "autocomplete-server" ] )
+			
+				shell = create_shell( [ "hops.ini", "ingredients.ini" ], verbosity=0 )
+				choices = shell.autocomplete( argv[0] )
 		
 		if len(choices):
 			print( "\n".join( choices ) )
 	
+	elif len(argv) > 0 and argv[0] == "autocomplete-server":
+		log.verbosity = 0
+		
+		completion_server = server.CompletionServer( None, server.get_socket_path( "beer" ) )
+		
+		# The socket is bound before loading, so duplicate servers exit at once
+		if completion_server.bind():
+			from brewery.ingredients import ingredient
+			
+			shell = create_shell( [ "hops.ini", "ingredients.ini" ], verbosity=0, watch=True )
+			build_completion_index( shell )
+			
+			def autocomplete( line ):
+				# Keeps the static index in line with the reloaded catalog
+				if ingredient.Ingredient.refresh():
+					build_completion_index( shell )
+				
+				return shell.autocomplete( line )
+			
+			completion_server.serve( autocomplete )
+	
 	else:
 		# Development needs
 		log.verbosity = 3
 	
-		Language.initialize( lang="en" )
-		Language.load( "hops.ini" )
-		Language.load( "yeasts.ini" )
-		Language.load( "ingredients.ini" )
-		ingredient.Ingredient.load_directory( "data%singredients" % os.sep )
-	
-		shell = beershell.BeerShell( verbosity=log.verbosity )
+		shell = create_shell( [ "hops.ini", "yeasts.ini", "ingredients.ini" ], verbosity=log.verbosity, watch=len(argv) == 0 )
 		log.current_shell = shell
 	
 		shell.run( argv )
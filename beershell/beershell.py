@@ -2,18 +2,15 @@
 
 from shell import *
 from language import Language
-from . import convert
-from . import hop
-from . import yeast
 
 class BeerShell(shell.Shell):
 
 	def __init__( self, verbosity=1 ):
 		shell.Shell.__init__( self, title="beer", verbosity=verbosity )
-		Language.load( "beershell.ini" )
-		self.add_command( convert.Command() )
-		self.add_command( hop.Command() )
-		self.add_command( yeast.Command() )
+		Language.register( "beershell.ini" )
+		self.register_command( "convert", "beershell.convert" )
+		self.register_command( "hop", "beershell.hop" )
+		self.register_command( "yeast", "beershell.yeast" )
 	
 	
 	def banner( self ):
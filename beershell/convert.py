@@ -7,6 +7,9 @@ import re
 
 class Command(commands.Command):
 
+	_units = None
+	_conversions = {}
+
 	def __init__( self ):
 		commands.Command.__init__( self, "convert" )
 		
@@ -120,11 +123,7 @@ class Command(commands.Command):
 							args.pop( 0 )
 						
 							if len(args) == 1:
-								to_unit = args[0]
-							
-								for conversion_unit in value.conversion_units:
-									if conversion_unit[:len(to_unit)].lower() == to_unit.lower():
-										choices.append( conversion_unit )
+								choices = Command.get_conversions( elements[1] ).find( args[0] )
 					
 					else:
 						incomplete_unit = True
@@ -134,12 +133,47 @@ class Command(commands.Command):
 				
 				# Incomplete unit					
 				if incomplete_unit:
-					for u in unit.Unit.get_all_units():
-						if u[:len(elements[1])].lower() == elements[1].lower():
-							if unit_as_two_args:
-								choices.append( u )
-							else:
-								choices.append( "%s%s" % (unit.Unit.format_value( elements[0] ),u) )
+					for u in Command.get_units().find( elements[1] ):
+						if unit_as_two_args:
+							choices.append( u )
+						else:
+							choices.append( "%s%s" % (unit.Unit.format_value( elements[0] ),u) )
 		
 		return choices
-	
+		
+		
+	def completion_index( self, shell ):
+		conversions = {}
+		
+		for u in unit.Unit.get_all_units():
+			conversions[u] = Command.get_conversions( u ).root
+		
+		return { "type": "units", "pattern": unit.Unit._parse_regex.pattern, "units": Command.get_units().root, "conversions": conversions }
+		
+		
+	@classmethod
+	def get_units( cls ):
+		"""Returns the completion trie of the units, built on first use."""
+		
+		if Command._units == None:
+			Command._units = trie.Trie()
+			
+			for u in unit.Unit.get_all_units():
+				Command._units.add( u, u )
+		
+		return Command._units
+		
+		
+	@classmethod
+	def get_conversions( cls, unit_name ):
+		"""Returns the completion trie of the conversion units of an unit, built on first use."""
+		
+		if unit_name not in Command._conversions:
+			conversions = trie.Trie()
+			
+			for conversion_unit in unit.Unit.units[unit_name]( 0 ).conversion_units:
+				conversions.add( conversion_unit, conversion_unit )
+			
+			Command._conversions[unit_name] = conversions
+		
+		return Command._conversions[unit_name]
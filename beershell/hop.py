@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 from shell import *
 from brewery.ingredients.hop import Hop
-from brewery.ingredients.ingredient import Ingredient
 from language import Language
 from units import *
 
@@ -44,14 +43,19 @@ class Command(commands.Command):
 				choices = command.autocomplete( self._shell, args )
 		
 		return choices
+		
+		
+	def completion_index( self, shell ):
+		return self._shell.completion_index( choices=[ cmd for cmd in self._shell._commands if cmd not in ["quit", "exit", "help"] ] )
 
 
 class Shell(shell.Shell):
 	
 	def __init__( self, verbosity=1 ):
 		shell.Shell.__init__( self, title="hop", verbosity=verbosity )
-		self.add_command( List() )
-		self.add_command( Info() )
+		self.register_command( "list", __name__, "List" )
+		self.register_command( "info", __name__, "Info" )
+		self.register_command( "substitutes", __name__, "Substitutes" )
 		
 
 class List(commands.Command):
@@ -64,7 +68,7 @@ class List(commands.Command):
 		"alpha_acids": { "params": -1, "default": None },
 		"country": { "params": -1, "default": None },
 		"style": { "params": -1, "default": None },
-		"sort": { "params": 1, "default": None },
+		"sort": { "params": -1, "default": None },
 		"limit": { "params": 1, "default": None }
 	}
 
@@ -75,8 +79,14 @@ class List(commands.Command):
 	def run( self, shell, args ):
 	
 		options = List.parse_options( args )
-
-		hops = Hop.list_hops()	
+		sort_options = List.parse_sort_options( shell, options, Hop.sort_attributes, class_=Hop )
+		
+		# Invalid options are reported before loading the catalog
+		if sort_options == None:
+			return 1
+		
+		sort, reverse, limit = sort_options
+		index = Hop.get_index( Hop )
 		
 		printed_hops = 0
 		
@@ -102,65 +112,40 @@ class List(commands.Command):
 				options["alpha_acids"] = None
 				
 				return 1
-
-		for hop in hops:
-			match_options = True
-			
-			# Name filter
-			if match_options and (options["name"] and len(options["name"])):
-			
-				if options["name"].lower() not in hop.name.lower():
-					match_options = False
-			
-			# Purpose filter
-			if match_options and (options["aroma"] or options["bittering"] or options["dual"]):
-				
-				match_options = False
-				
-				if options["aroma"] and hop.purpose == "aroma":
-					match_options = True
-					
-				if options["bittering"] and hop.purpose == "bittering":
-					match_options = True
-					
-				if options["dual"] and hop.purpose == "dual":
-					match_options = True
-			
-			# Country filter
-			# TODO: compare language names and aliases.
-			if match_options and (options["country"] and len(options["country"])):
-				
-				if Ingredient.sanitize_name( options["country"] ) != Ingredient.sanitize_name( hop.country ):
-					match_options = False
-					
-			# Style filter
-			# TODO: compare language names and aliases.
-			if match_options and (options["style"] and len(options["style"])):
-				
-				match_options = False
-				
-				for style in hop.styles:
-					if Ingredient.sanitize_name( options["style"] ) == Ingredient.sanitize_name( style ):
-						match_options = True
-						break
-						
-			# Alpha acids filter
-			if match_options and options["alpha_acids"]:
-			
-				comparator, percent = options["alpha_acids"]
-				
-				if comparator == "eq" and percent != hop.alpha_acids:
-					match_options = False
-					
-				elif comparator == "lt" and percent <= hop.alpha_acids:
-					match_options = False
-					
-				elif comparator == "gt" and percent >= hop.alpha_acids:
-					match_options = False
-			
-			if match_options:
-				shell.print( "%s (%saa)" % ( hop.name, hop.alpha_acids ), lpad=1 )
-				printed_hops += 1
+		
+		# Each filter is answered by the catalog indexes, the intersection of
+		# their posting lists starts from the most selective one.
+		filters = []
+		
+		# Purpose filter
+		if options["aroma"] or options["bittering"] or options["dual"]:
+			filters.append( index.union( [ index.lookup( "purpose", purpose ) for purpose in [ "aroma", "bittering", "dual" ] if options[purpose] ] ) )
+		
+		# Country filter
+		# TODO: compare language names and aliases.
+		if options["country"] and len(options["country"]):
+			filters.append( index.lookup( "country", options["country"] ) )
+		
+		# Style filter
+		# TODO: compare language names and aliases.
+		if options["style"] and len(options["style"]):
+			filters.append( index.lookup( "styles", options["style"] ) )
+		
+		# Alpha acids filter
+		if options["alpha_acids"]:
+			comparator, percent = options["alpha_acids"]
+			filters.append( index.compare( "alpha_acids", comparator, percent ) )
+		
+		matches = index.iterate( index.intersect( filters ) )
+		
+		# Name filter
+		if options["name"] and len(options["name"]):
+			matches = ( hop for hop in matches if options["name"].lower() in hop.name.lower() )
+		
+		# Rows are printed as they are selected
+		for hop in index.select( matches, attribute=sort, reverse=reverse, limit=limit ):
+			shell.print( "%s (%saa)" % ( hop.name, hop.alpha_acids ), lpad=1 )
+			printed_hops += 1
 			
 		if printed_hops > 0:
 			shell.log( Language.get( List, "n_hops_listed" ) % printed_hops, level=0 )
@@ -215,6 +200,10 @@ class List(commands.Command):
 						choices.append( "--%s" % opt )
 		
 		return choices
+		
+		
+	def completion_index( self, shell ):
+		return { "type": "options", "options": list( self._options ) }
 
 
 class Info(commands.Command):
@@ -345,7 +334,13 @@ class Info(commands.Command):
 				
 				shell.print( "" )
 			else:
-				shell.error( Language.get( Info, "hop_does_not_exist" ) % hop_name )
+				# Misspelled names and aliases are only suggested
+				suggestion = Hop.get( hop_name, fuzzy=True )
+				
+				if suggestion:
+					shell.error( Language.get( Info, "hop_did_you_mean" ) % ( hop_name, suggestion.name ) )
+				else:
+					shell.error( Language.get( Info, "hop_does_not_exist" ) % hop_name )
 			
 		return 0
 		
@@ -358,10 +353,95 @@ class Info(commands.Command):
 		hop_name = " ".join( args )
 		
 		if len(hop_name):
-			for hop in Hop.list_hops():
-				if hop.name[:len(hop_name)].lower() == hop_name.lower():
-					choices.append( hop.name )
+			choices = Info.get_names().find( hop_name )
 		
 		return choices
+		
+		
+	def completion_index( self, shell ):
+		return { "type": "names", "trie": Info.get_names().root }
+		
+		
+	@classmethod
+	def get_names( cls ):
+		"""Returns the completion trie of the hops names.
+		
+		The trie maps the names, the sanitized names and the aliases of the
+		hops to their names. It is built once per catalog load.
+		"""
+		
+		index = Hop.get_index( Hop )
+		
+		if "names" not in index.cache:
+			names = trie.Trie()
+			
+			for hop in index.ingredients:
+				for key in [ hop.name, hop.clean_name ] + hop.aliases:
+					names.add( key, hop.name )
+			
+			index.cache["names"] = names
+		
+		return index.cache["names"]
+
 
+class Substitutes(commands.Command):
 
+	def __init__( self ):
+		commands.Command.__init__( self, "substitutes" )
+		
+		
+	def run( self, shell, args ):
+	
+		if len(args) <= 1:
+			shell.error( Language.get( Substitutes, "please_specify_hop" ) )
+			
+		else:
+			args.pop( 0 )
+			hop_name = " ".join( args )
+			hop = Hop.get( hop_name )
+			
+			if hop:
+				substitutes = hop.get_substitutes()
+				
+				if len(substitutes):
+					title = Language.get( Substitutes, "hop_substitutes" ) % hop.name
+					shell.print( title, lpad=1 )
+					shell.print( "=" * len(title), lpad=1 )
+					shell.print( "" )
+					
+					# Substitutes of substitutes are indented
+					for substitute, distance in substitutes:
+						shell.print( "%s (%saa)" % ( substitute.name, substitute.alpha_acids ), lpad=2 * distance - 1 )
+					
+					shell.print( "" )
+					
+				else:
+					shell.log( Language.get( Substitutes, "no_substitute_found" ) % hop.name, level=0 )
+				
+			else:
+				# Misspelled names and aliases are only suggested
+				suggestion = Hop.get( hop_name, fuzzy=True )
+				
+				if suggestion:
+					shell.error( Language.get( Substitutes, "hop_did_you_mean" ) % ( hop_name, suggestion.name ) )
+				else:
+					shell.error( Language.get( Substitutes, "hop_does_not_exist" ) % hop_name )
+			
+		return 0
+		
+		
+	def autocomplete( self, shell, args ):
+	
+		choices = []
+	
+		args.pop( 0 )
+		hop_name = " ".join( args )
+		
+		if len(hop_name):
+			choices = Info.get_names().find( hop_name )
+		
+		return choices
+		
+		
+	def completion_index( self, shell ):
+		return { "type": "names", "trie": Info.get_names().root }
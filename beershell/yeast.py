@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 from shell import *
 from brewery.ingredients.yeast import Yeast
-from brewery.ingredients.ingredient import Ingredient
 from language import Language
 from units import *
 
@@ -44,14 +43,18 @@ class Command(commands.Command):
 				choices = command.autocomplete( self._shell, args )
 		
 		return choices
+		
+		
+	def completion_index( self, shell ):
+		return self._shell.completion_index( choices=[ cmd for cmd in self._shell._commands if cmd not in ["quit", "exit", "help"] ] )
 
 
 class Shell(shell.Shell):
 	
 	def __init__( self, verbosity=1 ):
 		shell.Shell.__init__( self, title="yeast", verbosity=verbosity )
-		self.add_command( List() )
-		self.add_command( Info() )
+		self.register_command( "list", __name__, "List" )
+		self.register_command( "info", __name__, "Info" )
 		
 
 class List(commands.Command):
@@ -62,7 +65,7 @@ class List(commands.Command):
 		"liquid": { "params": 0, "default": False },
 		"attenuation": { "params": -1, "default": None },
 		"style": { "params": -1, "default": None },
-		"sort": { "params": 1, "default": None },
+		"sort": { "params": -1, "default": None },
 		"limit": { "params": 1, "default": None }
 	}
 
@@ -73,8 +76,14 @@ class List(commands.Command):
 	def run( self, shell, args ):
 	
 		options = List.parse_options( args )
-
-		yeasts = Yeast.list_yeasts()	
+		sort_options = List.parse_sort_options( shell, options, Yeast.sort_attributes, class_=Yeast )
+		
+		# Invalid options are reported before loading the catalog
+		if sort_options == None:
+			return 1
+		
+		sort, reverse, limit = sort_options
+		index = Yeast.get_index( Yeast )
 		
 		printed_yeasts = 0
 		
@@ -89,45 +98,34 @@ class List(commands.Command):
 				options["attenuation"] = None
 				
 				return 1
-
-		for yeast in yeasts:
-			match_options = True
-			
-			# Name filter
-			if match_options and (options["name"] and len(options["name"])):
-			
-				if options["name"].lower() not in yeast.name.lower():
-					match_options = False
-			
-			# Form filter
-			if match_options and (options["dry"] or options["liquid"]):
-				
-				match_options = False
-				
-				if options["dry"] and yeast.is_dry():
-					match_options = True
-					
-				if options["liquid"] and yeast.is_liquid():
-					match_options = True
-					
-			# Style filter
-			# TODO: compare language names and aliases.
-			if match_options and (options["style"] and len(options["style"])):
-				
-				match_options = False
-				
-				for style in yeast.styles:
-					if Ingredient.sanitize_name( options["style"] ) == Ingredient.sanitize_name( style ):
-						match_options = True
-						break
-			
-			# Attenuation filter
-			if match_options and options["attenuation"]:
-				match_options = (options["attenuation"] == yeast.attenuation)
-			
-			if match_options:
-				shell.print( "%s" % yeast.name, lpad=1 )
-				printed_yeasts += 1
+		
+		# Each filter is answered by the catalog indexes, the intersection of
+		# their posting lists starts from the most selective one.
+		filters = []
+		
+		# Form filter
+		if options["dry"] or options["liquid"]:
+			filters.append( index.union( [ index.lookup( "form", form ) for form in [ "dry", "liquid" ] if options[form] ] ) )
+		
+		# Style filter
+		# TODO: compare language names and aliases.
+		if options["style"] and len(options["style"]):
+			filters.append( index.lookup( "styles", options["style"] ) )
+		
+		# Attenuation filter
+		if options["attenuation"]:
+			filters.append( index.compare( "attenuation", "eq", options["attenuation"] ) )
+		
+		matches = index.iterate( index.intersect( filters ) )
+		
+		# Name filter
+		if options["name"] and len(options["name"]):
+			matches = ( yeast for yeast in matches if options["name"].lower() in yeast.name.lower() )
+		
+		# Rows are printed as they are selected
+		for yeast in index.select( matches, attribute=sort, reverse=reverse, limit=limit ):
+			shell.print( "%s" % yeast.name, lpad=1 )
+			printed_yeasts += 1
 			
 		if printed_yeasts > 0:
 			shell.log( Language.get( List, "n_yeasts_listed" ) % printed_yeasts, level=0 )
@@ -176,6 +174,10 @@ class List(commands.Command):
 						choices.append( "--%s" % opt )
 		
 		return choices
+		
+		
+	def completion_index( self, shell ):
+		return { "type": "options", "options": list( self._options ) }
 
 
 class Info(commands.Command):
@@ -270,7 +272,13 @@ class Info(commands.Command):
 				
 				shell.print( "" )
 			else:
-				shell.error( Language.get( Info, "yeast_does_not_exist" ) % yeast_name )
+				# Misspelled names and aliases are only suggested
+				suggestion = Yeast.get( yeast_name, fuzzy=True )
+				
+				if suggestion:
+					shell.error( Language.get( Info, "yeast_did_you_mean" ) % ( yeast_name, suggestion.name ) )
+				else:
+					shell.error( Language.get( Info, "yeast_does_not_exist" ) % yeast_name )
 			
 		return 0
 		
@@ -283,10 +291,33 @@ class Info(commands.Command):
 		yeast_name = " ".join( args )
 		
 		if len(yeast_name):
-			for yeast in Yeast.list_yeasts():
-				if yeast.name[:len(yeast_name)].lower() == yeast_name.lower():
-					choices.append( yeast.name )
+			choices = Info.get_names().find( yeast_name )
 		
 		return choices
-
+		
+		
+	def completion_index( self, shell ):
+		return { "type": "names", "trie": Info.get_names().root }
+		
+		
+	@classmethod
+	def get_names( cls ):
+		"""Returns the completion trie of the yeasts names.
+		
+		The trie maps the names, the sanitized names and the aliases of the
+		yeasts to their names. It is built once per catalog load.
+		"""
+		
+		index = Yeast.get_index( Yeast )
+		
+		if "names" not in index.cache:
+			names = trie.Trie()
+			
+			for yeast in index.ingredients:
+				for key in [ yeast.name, yeast.clean_name ] + yeast.aliases:
+					names.add( key, yeast.name )
+			
+			index.cache["names"] = names
+		
+		return index.cache["names"]
 
@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
-__all__ = [ "recipe", "ingredients" ]
+__all__ = [ "recipe", "optimizer", "ingredients" ]
 __version__ = "0.1.0"
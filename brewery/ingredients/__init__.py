@@ -1,4 +1,4 @@
 # -*- coding: utf-8 -*-
-__all__ = [ "ingredient", "hop", "malt", "sugar", "water", "yeast" ]
+__all__ = [ "ingredient", "index", "hop", "malt", "sugar", "water", "yeast" ]
 __version__ = "0.1.0"
 
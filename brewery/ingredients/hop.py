@@ -5,6 +5,11 @@ from units import *
 
 class Hop(Ingredient):
 	
+	section = "hop"
+	indexed_attributes = [ "purpose", "country", "styles" ]
+	indexed_units = [ "alpha_acids" ]
+	sort_attributes = Ingredient.sort_attributes + [ "purpose", "alpha_acids", "beta_acids", "cohumulone", "humulene", "myrcene", "caryophyllene", "farnesene", "oil_volume_per_100g" ]
+	
 	def __init__( self, config ):
 	
 		Ingredient.__init__( self, config )
@@ -69,24 +74,14 @@ class Hop(Ingredient):
 	
 	@classmethod
 	def list_hops( cls, name=None ):
-		hops = []
-		
-		for ingredient in cls._ingredients:
-
-			if isinstance( cls._ingredients[ingredient], Hop ):
-				hops.append( cls._ingredients[ingredient] )
 	
-		return sorted( hops, key=lambda h: h.name )
+		return cls.get_index( Hop ).get()
 		
 		
 	@classmethod
-	def get( cls, name ):
-		hop = None
-		sane_name = cls.sanitize_name( name )
-		
-		if sane_name in cls._ingredients:
-			if isinstance( cls._ingredients[sane_name], Hop ):
-				hop = cls._ingredients[sane_name]
-		
-		return hop
+	def get( cls, name, fuzzy=False ):
+		"""Returns a hop by its exact name, or its most similar name or alias
+		when fuzzy (see `Ingredient.get_ingredient`)."""
+	
+		return cls.get_ingredient( name, Hop, fuzzy=fuzzy )
 	
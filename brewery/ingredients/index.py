@@ -0,0 +1,669 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+import heapq
+import itertools
+from units import unit
+
+class IngredientIndex():
+	"""Represents the attribute indexes of a list of ingredients.
+	
+	Ingredients are identified by their position in the indexed list. Each
+	indexed attribute maps its values to the sorted positions of the
+	ingredients having them (posting lists), so filters are answered by
+	intersecting lists instead of checking every ingredient. Unit-valued
+	attributes are indexed by `IntervalTree`. Names and aliases are indexed
+	by trigrams for fuzzy searches.
+	
+	Attributes:
+		- (list) ingredients: The indexed ingredients.
+		- (dict) cache: Structures derived from the indexed ingredients by
+		  their users, dropped with the index.
+		- (callable) _key: Normalizes the indexed and looked up values.
+		- (dict) _postings: (str => dict) posting lists of each attribute,
+		  indexed by normalized values.
+		- (dict) _intervals: (str => IntervalTree) unit-valued attributes indexes.
+		- (dict) _trigrams: (str => list) positions of the names containing
+		  each trigram, None until the first search.
+		- (list) _names: (int, int) positions of the ingredients of the names
+		  and their numbers of trigrams.
+		- (dict) _aliases: (str => int) positions of the ingredients indexed
+		  by their normalized names and aliases.
+		- (dict) _resolved: (tuple => int) memoized `resolve` results.
+		- (dict) _positions: (str => int) positions of the ingredients
+		  indexed by their normalized names.
+		- (dict) _substitutes: (tuple => list) substitutes closures of the
+		  ingredients, by depth and threshold.
+	"""
+	
+	def __init__( self, ingredients, attributes=None, unit_attributes=None, key=None ):
+		"""Initialize the indexes of a list of ingredients.
+		
+		Parameters:
+			- (list) ingredients: The ingredients to index.
+			- (list) attributes: The names of the attributes to index; list
+			  attributes are indexed for each of their values (default: None).
+			- (list) unit_attributes: The names of the unit-valued attributes
+			  to index (default: None).
+			- (callable) key: Normalizes the values (default: None, unchanged).
+		"""
+		
+		self.ingredients = ingredients
+		self.cache = {}
+		self._key = key if key != None else lambda value: value
+		self._postings = {}
+		self._intervals = {}
+		self._trigrams = None
+		self._names = []
+		self._aliases = {}
+		self._resolved = {}
+		self._positions = { self._key( ingredients[position].name ): position for position in range( len(ingredients) ) }
+		self._substitutes = {}
+		
+		for attribute in attributes if attributes != None else []:
+			postings = {}
+			
+			for position in range( len(ingredients) ):
+				values = getattr( ingredients[position], attribute, None )
+				
+				if values == None:
+					continue
+				
+				if not isinstance( values, list ):
+					values = [ values ]
+				
+				for value in values:
+					posting = postings.setdefault( self._key( value ), [] )
+					
+					if len(posting) == 0 or posting[-1] != position:
+						posting.append( position )
+			
+			self._postings[attribute] = postings
+		
+		for attribute in unit_attributes if unit_attributes != None else []:
+			self._intervals[attribute] = IntervalTree( [ getattr( ingredient, attribute, None ) for ingredient in ingredients ] )
+	
+	
+	def __len__( self ):
+		return len(self.ingredients)
+	
+	
+	def lookup( self, attribute, value ):
+		"""Returns the positions of the ingredients having an attribute value.
+		
+		Parameters:
+			- (str) attribute: The indexed attribute.
+			- (str) value: The value, normalized with the index key.
+		
+		Return value:
+			- list -- the sorted positions.
+		"""
+		
+		return self._postings[attribute].get( self._key( value ), [] )
+	
+	
+	def compare( self, attribute, comparator, value ):
+		"""Returns the positions of the ingredients matching an unit comparison.
+		
+		Parameters:
+			- (str) attribute: The indexed unit-valued attribute.
+			- (str) comparator: "eq" (overlapping or containing), "lt" (lower)
+			  or "gt" (greater).
+			- (units.unit.Unit) value: The compared value or range.
+		
+		Return value:
+			- list -- the sorted positions.
+		"""
+		
+		positions = []
+		intervals = self._intervals[attribute]
+		
+		if comparator == "eq":
+			positions = intervals.overlap( value )
+		
+		elif comparator == "lt":
+			positions = intervals.below( value )
+		
+		elif comparator == "gt":
+			positions = intervals.above( value )
+		
+		return positions
+	
+	
+	def get( self, positions=None ):
+		"""Returns the ingredients at positions.
+		
+		Parameters:
+			- (list) positions: The positions (default: None, all ingredients).
+		
+		Return value:
+			- list -- the ingredients.
+		"""
+		
+		if positions == None:
+			return list( self.ingredients )
+		
+		return [ self.ingredients[position] for position in positions ]
+	
+	
+	@classmethod
+	def get_trigrams( cls, text ):
+		"""Returns the set of trigrams of a text, padded to weight its first letters."""
+		
+		text = "  " + text + " "
+		
+		return set( text[i:i+3] for i in range( len(text) - 2 ) )
+	
+	
+	def build_trigrams( self ):
+		"""Indexes the trigrams of the names and aliases of the ingredients."""
+		
+		self._trigrams = {}
+		self._names = []
+		self._aliases = {}
+		
+		for position in range( len(self.ingredients) ):
+			ingredient = self.ingredients[position]
+			
+			for name in dict.fromkeys( self._key( name ) for name in [ ingredient.name ] + getattr( ingredient, "aliases", [] ) ):
+				trigrams = self.get_trigrams( name )
+				
+				for trigram in trigrams:
+					self._trigrams.setdefault( trigram, [] ).append( len(self._names) )
+				
+				self._names.append( ( position, len(trigrams) ) )
+				self._aliases.setdefault( name, position )
+	
+	
+	def search( self, name, limit=10, threshold=0.0 ):
+		"""Returns the positions of the ingredients whose names or aliases are similar to a name.
+		
+		The similarity is the Dice coefficient of the trigrams of the names,
+		counted from the trigrams posting lists: only the names sharing at
+		least one trigram with the searched one are considered.
+		
+		Parameters:
+			- (str) name: The searched name.
+			- (int) limit: The maximum number of results (default: 10).
+			- (float) threshold: The minimum similarity, from 0 to 1 (default: 0.0).
+		
+		Return value:
+			- list -- (int, float) the positions of the ingredients and their
+			  similarity, from the most similar.
+		"""
+		
+		if self._trigrams == None:
+			self.build_trigrams()
+		
+		trigrams = self.get_trigrams( self._key( name ) )
+		counts = {}
+		scores = {}
+		
+		for trigram in trigrams:
+			for name_id in self._trigrams.get( trigram, [] ):
+				counts[name_id] = counts.get( name_id, 0 ) + 1
+		
+		for name_id in counts:
+			position, size = self._names[name_id]
+			score = 2.0 * counts[name_id] / ( len(trigrams) + size )
+			
+			if score >= threshold and score > scores.get( position, 0.0 ):
+				scores[position] = score
+		
+		best = heapq.nsmallest( limit, scores, key=lambda position: ( -scores[position], position ) )
+		
+		return [ ( position, scores[position] ) for position in best ]
+	
+	
+	def resolve( self, name, threshold=0.0 ):
+		"""Returns the ingredient whose name or alias is the most similar to a name.
+		
+		An exact name or alias is preferred to similar ones. Results are
+		memoized, so resolving the same name again costs a dictionary lookup.
+		
+		Parameters:
+			- (str) name: The searched name.
+			- (float) threshold: The minimum similarity, from 0 to 1 (default: 0.0).
+		
+		Return value:
+			- Ingredient -- the ingredient, None if no name is similar enough.
+		"""
+		
+		position = self.resolve_position( name, threshold=threshold )
+		
+		return self.ingredients[position] if position != None else None
+	
+	
+	def resolve_position( self, name, threshold=0.0 ):
+		"""Returns the position of the ingredient resolved by `resolve`, or None."""
+		
+		key = ( self._key( name ), threshold )
+		
+		if key not in self._resolved:
+			if self._trigrams == None:
+				self.build_trigrams()
+			
+			if key[0] in self._aliases:
+				self._resolved[key] = self._aliases[key[0]]
+			
+			else:
+				matches = self.search( name, limit=1, threshold=threshold )
+				self._resolved[key] = matches[0][0] if len(matches) else None
+		
+		return self._resolved[key]
+	
+	
+	def get_substitutes( self, ingredient, depth=1, threshold=0.0 ):
+		"""Returns the substitutes of an ingredient, up to a depth.
+		
+		The substitutes names of all the ingredients are resolved with
+		`resolve` and their closures computed on the first call for a depth.
+		The substitution is considered symmetric: an ingredient substitutes
+		the ones it lists and the ones listing it.
+		
+		Parameters:
+			- (Ingredient) ingredient: The indexed ingredient.
+			- (int) depth: The maximum number of substitutions (default: 1).
+			- (float) threshold: The minimum similarity of resolved names (default: 0.0).
+		
+		Return value:
+			- list -- (Ingredient, int) the substitutes and their number of
+			  substitutions, from the closest.
+		"""
+		
+		if ( depth, threshold ) not in self._substitutes:
+			self.build_substitutes( depth, threshold=threshold )
+		
+		closure = self._substitutes[( depth, threshold )][self._positions[self._key( ingredient.name )]]
+		
+		return [ ( self.ingredients[position], distance ) for position, distance in closure ]
+	
+	
+	def build_substitutes( self, depth, threshold=0.0 ):
+		"""Resolves the substitutes of the ingredients and computes their closures.
+		
+		Parameters:
+			- (int) depth: The maximum number of substitutions.
+			- (float) threshold: The minimum similarity of resolved names (default: 0.0).
+		"""
+		
+		graph = [ set() for ingredient in self.ingredients ]
+		closures = []
+		
+		for position in range( len(self.ingredients) ):
+			for name in getattr( self.ingredients[position], "substitutes", [] ):
+				substitute = self.resolve_position( name, threshold=threshold )
+				
+				if substitute != None and substitute != position:
+					graph[position].add( substitute )
+					graph[substitute].add( position )
+		
+		# Breadth-first walks bounded by the depth
+		for position in range( len(self.ingredients) ):
+			distances = { position: 0 }
+			frontier = [ position ]
+			closure = []
+			
+			for distance in range( 1, depth + 1 ):
+				next_frontier = []
+				
+				for node in frontier:
+					for substitute in graph[node]:
+						if substitute not in distances:
+							distances[substitute] = distance
+							next_frontier.append( substitute )
+				
+				next_frontier.sort()
+				closure += [ ( substitute, distance ) for substitute in next_frontier ]
+				frontier = next_frontier
+			
+			closures.append( closure )
+		
+		self._substitutes[( depth, threshold )] = closures
+	
+	
+	def iterate( self, positions=None ):
+		"""Iterates over the ingredients at positions.
+		
+		Parameters:
+			- (list) positions: The positions (default: None, all ingredients).
+		
+		Return value:
+			- generator -- the ingredients.
+		"""
+		
+		for position in ( positions if positions != None else range( len(self.ingredients) ) ):
+			yield self.ingredients[position]
+	
+	
+	@classmethod
+	def get_sort_value( cls, ingredient, attribute, unit_name=None ):
+		"""Returns the value of an ingredient attribute as a sort key.
+		
+		Units are compared by their value in a common unit (the middle of
+		ranges), strings and lists of strings case-insensitively.
+		
+		Parameters:
+			- (Ingredient) ingredient: The ingredient.
+			- (str) attribute: The attribute name.
+			- (str) unit_name: The unit of the unit values (default: None, their default unit).
+		
+		Return value:
+			- object -- the sort value, None if the attribute is not defined
+			  or can not be converted.
+		"""
+		
+		value = getattr( ingredient, attribute, None )
+		
+		if isinstance( value, unit.Unit ):
+			value = value.get_value( unit=unit_name )
+		
+		elif isinstance( value, list ):
+			value = ", ".join( value ).lower() if len(value) else None
+		
+		elif isinstance( value, str ):
+			value = value.lower()
+		
+		return value
+	
+	
+	@classmethod
+	def select( cls, ingredients, attribute=None, reverse=False, limit=None ):
+		"""Sorts and limits a stream of ingredients.
+		
+		With a limit, the first ingredients are selected with a bounded heap
+		instead of sorting the whole stream; without sort attribute, the
+		stream is only consumed up to the limit. Unit values are compared in
+		the unit of the first one. Ingredients without value for the attribute
+		always come last. Ties keep the stream order.
+		
+		Parameters:
+			- (iterable) ingredients: The ingredients.
+			- (str) attribute: The sort attribute (default: None, unsorted).
+			- (bool) reverse: Sort in descending order (default: False).
+			- (int) limit: The maximum number of ingredients (default: None).
+		
+		Return value:
+			- iterable -- the selected ingredients.
+		"""
+		
+		selection = ingredients
+		
+		if attribute == None:
+			if limit != None:
+				selection = itertools.islice( ingredients, limit )
+		
+		else:
+			missing = ( 0, 0 ) if reverse else ( 1, 0 )
+			defined = 1 if reverse else 0
+			units = []
+			
+			def key( ingredient ):
+				value = getattr( ingredient, attribute, None )
+				
+				if len(units) == 0 and isinstance( value, unit.Unit ):
+					units.append( IntervalTree.get_unit( value ) )
+				
+				value = cls.get_sort_value( ingredient, attribute, unit_name=units[0] if len(units) else None )
+				return missing if value == None else ( defined, value )
+			
+			if limit != None:
+				selection = heapq.nlargest( limit, ingredients, key=key ) if reverse else heapq.nsmallest( limit, ingredients, key=key )
+			
+			else:
+				selection = sorted( ingredients, key=key, reverse=reverse )
+		
+		return selection
+	
+	
+	@classmethod
+	def union( cls, postings ):
+		"""Returns the sorted union of posting lists."""
+		
+		positions = set()
+		
+		for posting in postings:
+			positions.update( posting )
+		
+		return sorted( positions )
+	
+	
+	@classmethod
+	def intersect( cls, postings ):
+		"""Returns the sorted intersection of posting lists.
+		
+		Lists are intersected from the most selective (the shortest) one, so
+		the intermediate results only shrink and the intersection stops as
+		soon as it is empty.
+		
+		Parameters:
+			- (list) postings: The posting lists.
+		
+		Return value:
+			- list -- the positions, None if there is no posting list.
+		"""
+		
+		positions = None
+		
+		for posting in sorted( postings, key=len ):
+			if positions == None:
+				positions = list( posting )
+			
+			else:
+				posting = set( posting )
+				positions = [ position for position in positions if position in posting ]
+			
+			if len(positions) == 0:
+				break
+		
+		return positions
+
+
+class IntervalTree():
+	"""Represents an interval tree of unit-valued attributes.
+	
+	Values are indexed as intervals: a range (`units.unit.Range`) by its
+	bounds, a single value as an empty interval. The bounds are expressed in
+	the unit of the first indexed value.
+	
+	The tree is a centered interval tree: each node keeps the intervals
+	containing its center, sorted by lower and by higher bounds, the lower
+	and higher intervals being stored in its left and right subtrees. Point
+	queries walk down a single path, so they cost O(log n + k) for k
+	results. The bounds are also kept sorted to answer overlap and
+	comparison queries by bisection.
+	
+	Attributes:
+		- (str) unit: The unit of the indexed bounds.
+		- (list) _root: The root node, as [center, intervals sorted by lower
+		  bounds, intervals sorted by decreasing higher bounds, left node,
+		  right node], None if the tree is empty.
+		- (list) _mins: The sorted lower bounds.
+		- (list) _by_min: The positions of the values sorted by lower bounds.
+		- (list) _maxs: The sorted higher bounds.
+		- (list) _by_max: The positions of the values sorted by higher bounds.
+	"""
+	
+	def __init__( self, values ):
+		"""Initialize the tree of a list of values.
+		
+		Parameters:
+			- (list) values: The units or ranges, None values are not indexed.
+		"""
+		
+		self.unit = None
+		intervals = []
+		
+		for position in range( len(values) ):
+			if values[position] == None:
+				continue
+			
+			if self.unit == None:
+				self.unit = self.get_unit( values[position] )
+			
+			low, high = self.get_bounds( values[position] )
+			
+			if low != None and high != None:
+				intervals.append( ( low, high, position ) )
+		
+		intervals.sort()
+		self._mins = [ interval[0] for interval in intervals ]
+		self._by_min = [ interval[2] for interval in intervals ]
+		self._root = self.build( intervals )
+		
+		intervals.sort( key=lambda interval: ( interval[1], interval[2] ) )
+		self._maxs = [ interval[1] for interval in intervals ]
+		self._by_max = [ interval[2] for interval in intervals ]
+	
+	
+	@classmethod
+	def build( cls, intervals ):
+		"""Builds the node of a list of intervals.
+		
+		Parameters:
+			- (list) intervals: The (low, high, position) intervals, sorted.
+		
+		Return value:
+			- list -- the node, None if there is no interval.
+		"""
+		
+		node = None
+		
+		if len(intervals):
+			center = intervals[len(intervals) // 2][0]
+			left = []
+			right = []
+			centered = []
+			
+			for interval in intervals:
+				if interval[1] < center:
+					left.append( interval )
+				
+				elif interval[0] > center:
+					right.append( interval )
+				
+				else:
+					centered.append( interval )
+			
+			node = [
+				center,
+				[ ( interval[0], interval[2] ) for interval in centered ],
+				sorted( [ ( interval[1], interval[2] ) for interval in centered ], key=lambda bound: -bound[0] ),
+				cls.build( left ),
+				cls.build( right )
+			]
+		
+		return node
+	
+	
+	@classmethod
+	def get_unit( cls, value ):
+		"""Returns the default unit of an unit or of a range."""
+		
+		return value.get_min().unit if isinstance( value, unit.Range ) else value.unit
+	
+	
+	def get_bounds( self, value ):
+		"""Returns the bounds of an unit or of a range in the tree unit.
+		
+		Return value:
+			- tuple -- (float, float) the bounds, (None, None) if the value
+			  can not be converted into the tree unit.
+		"""
+		
+		if isinstance( value, unit.Range ):
+			bounds = ( value.get_min().get_value( unit=self.unit ), value.get_max().get_value( unit=self.unit ) )
+		
+		else:
+			v = value.get_value( unit=self.unit )
+			bounds = ( v, v )
+		
+		return bounds
+	
+	
+	def stab( self, point ):
+		"""Returns the positions of the intervals containing a point.
+		
+		Parameters:
+			- (float) point: The point, in the tree unit.
+		
+		Return value:
+			- list -- the positions, unsorted.
+		"""
+		
+		positions = []
+		node = self._root
+		
+		while node != None:
+			center, by_low, by_high, left, right = node
+			
+			if point < center:
+				for low, position in by_low:
+					if low > point:
+						break
+					
+					positions.append( position )
+				
+				node = left
+			
+			elif point > center:
+				for high, position in by_high:
+					if high < point:
+						break
+					
+					positions.append( position )
+				
+				node = right
+			
+			else:
+				positions += [ position for low, position in by_low ]
+				node = None
+		
+		return positions
+	
+	
+	def contains( self, value ):
+		"""Returns the sorted positions of the intervals containing a value.
+		
+		Parameters:
+			- (units.unit.Unit) value: The contained value.
+		"""
+		
+		low, high = self.get_bounds( value )
+		
+		return sorted( self.stab( low ) ) if low != None else []
+	
+	
+	def overlap( self, value ):
+		"""Returns the sorted positions of the intervals overlapping a value.
+		
+		The overlapping intervals are the ones containing the lower bound of
+		the value, and the ones starting inside the value.
+		
+		Parameters:
+			- (units.unit.Unit) value: The value or range.
+		"""
+		
+		positions = []
+		low, high = self.get_bounds( value )
+		
+		if low != None and high != None:
+			positions = self.stab( low ) + self._by_min[bisect.bisect_right( self._mins, low ):bisect.bisect_right( self._mins, high )]
+		
+		return sorted( positions )
+	
+	
+	def below( self, value ):
+		"""Returns the sorted positions of the intervals strictly lower than a value."""
+		
+		low, high = self.get_bounds( value )
+		
+		return sorted( self._by_max[:bisect.bisect_left( self._maxs, low )] ) if low != None else []
+	
+	
+	def above( self, value ):
+		"""Returns the sorted positions of the intervals strictly greater than a value."""
+		
+		low, high = self.get_bounds( value )
+		
+		return sorted( self._by_min[bisect.bisect_right( self._mins, high ):] ) if high != None else []
@@ -3,6 +3,8 @@
 import os
 import sys
 import errno
+import hashlib
+import marshal
 import configparser
 import log
 import re
@@ -10,8 +12,66 @@ import unicodedata
 from language import Language
 
 class Ingredient():
+	"""Represents an ingredient of the catalog.
+	
+	Ingredients are described by INI files. Directories registered with
+	`load_directory` are only scanned when the catalog is first accessed: the
+	scan reads the name and the kind of each file to build an index, and an
+	ingredient object is only built the first time it is requested. Scanning
+	a directory again only reindexes its changed, added and removed files.
+	
+	Class variables:
+		- (str) section: The INI section specific to the ingredient class.
+		- (list) sections: The INI sections specific to ingredient classes.
+		- (dict) _ingredients: (str => Ingredient) built ingredients.
+		- (dict) _catalog: (str => (str, str)) ingredients files and sections
+		  indexed by sanitized names.
+		- (list) _directories: Directories waiting to be scanned.
+		- (dict) _sources: (str => dict) (mtime, digest, name, section) of
+		  the indexed files of each scanned directory, by relative paths.
+		- (DirectoryWatcher) _watcher: The watcher of the scanned
+		  directories, None if they are not watched.
+		- (dict) _configs: (str => dict) parsed files indexed by paths.
+		- (dict) _indexes: (class => IngredientIndex) attribute indexes of the
+		  ingredient classes, dropped when the catalog changes.
+		- (list) indexed_attributes: The attributes indexed by `get_index`.
+		- (list) indexed_units: The unit-valued attributes indexed by `get_index`.
+		- (list) sort_attributes: The data attributes listings can be sorted by.
+		- (float) fuzzy_threshold: The minimum similarity of fuzzy lookups.
+		- (int) substitutes_depth: The default depth of substitutes lookups.
+		- (int) workers: The number of parallel workers parsing the files,
+		  0 to parse them sequentially (default).
+		- (bool) use_processes: Parse the files in a pool of processes rather
+		  than threads.
+		- (str) snapshot_directory: The directory of the compiled catalogs,
+		  None for $XDG_CACHE_HOME/beer/ingredients (default).
+	"""
 
+	section = None
+	sections = [ "hop", "malt", "yeast", "sugar", "water" ]
+	
 	_ingredients = {}
+	_catalog = {}
+	_directories = []
+	_sources = {}
+	_watcher = None
+	_configs = {}
+	_indexes = {}
+	
+	indexed_attributes = []
+	indexed_units = []
+	sort_attributes = [ "name", "country" ]
+	fuzzy_threshold = 0.5
+	substitutes_depth = 2
+	
+	workers = 0
+	use_processes = True
+	
+	snapshot_directory = None
+	snapshot_version = 2
+	
+	_section_regex = re.compile( r"^\[([^\]]+)\]\s*$" )
+	_name_regex = re.compile( r"^name\s*[=:]\s*(.*?)\s*$", re.IGNORECASE )
 	
 
 	def __init__( self, config ):
@@ -40,6 +100,27 @@ class Ingredient():
 			self.country = Ingredient.sanitize_name( config["ingredient"]["country"] )
 		
 		
+	def get_substitutes( self, depth=None ):
+		"""Returns the substitutes of the ingredient.
+		
+		Substitutes names are resolved to catalog ingredients, exactly or by
+		similarity, and the substitutes of substitutes are followed up to the
+		depth. The closures are computed once per catalog load.
+		
+		Parameters:
+			- (int) depth: The maximum number of substitutions (default: None, `substitutes_depth`).
+		
+		Return value:
+			- list -- (Ingredient, int) the substitutes and their number of
+			  substitutions, from the closest.
+		"""
+		
+		if depth == None:
+			depth = self.substitutes_depth
+		
+		return Ingredient.get_index( self.__class__ ).get_substitutes( self, depth=depth, threshold=self.fuzzy_threshold )
+		
+		
 	@property
 	def country_name( self ):
 		return Language.get( Ingredient, "country_%s" % self.country )
@@ -56,65 +137,686 @@ class Ingredient():
 		return re.sub( r"[^a-z0-9_]", "", re.sub( r"\s+", "_", unicodedata.normalize( 'NFKD', name ).strip().lower() ) )
 	
 		
+	@classmethod
+	def get_class( cls, section ):
+		"""Returns the ingredient class matching an INI specific section.
+		
+		Parameters:
+			- (str) section: The specific section ("hop", "yeast", etc.) or None.
+		
+		Return value:
+			- class -- the ingredient class.
+		"""
+		
+		class_ = Ingredient
+		
+		if section == "hop":
+			from .hop import Hop
+			class_ = Hop
+			
+		elif section == "malt":
+			from .malt import Malt
+			class_ = Malt
+			
+		elif section == "yeast":
+			from .yeast import Yeast
+			class_ = Yeast
+			
+		elif section == "sugar":
+			from .sugar import Sugar
+			class_ = Sugar
+			
+		elif section == "water":
+			from .water import Water
+			class_ = Water
+		
+		return class_
+	
+	
 	@classmethod
 	def load_directory( cls, dirpath ):
+		"""Registers a directory of ingredients files.
+		
+		The directory is not read immediately: it is scanned on the first
+		access to the catalog.
+		
+		Parameters:
+			- (str) dirpath: The directory path, absolute or relative to the application.
+		"""
 		
 		if os.path.abspath( dirpath ) != dirpath:
 			dirpath = os.path.dirname( os.path.realpath( os.path.abspath( sys.argv[0] ) ) ) + os.sep + dirpath
 		
+		if dirpath not in cls._directories:
+			Ingredient._directories.append( dirpath )
+	
+	
+	@classmethod
+	def scan( cls ):
+		"""Indexes the ingredients files of the registered directories.
+		
+		If the directories are watched, their changed files are reloaded.
+		"""
+		
+		while len(Ingredient._directories):
+			dirpath = Ingredient._directories.pop( 0 )
+			cls.scan_directory( dirpath )
+			
+			if Ingredient._watcher != None:
+				Ingredient._watcher.add( dirpath )
+		
+		cls.refresh()
+	
+	
+	@classmethod
+	def scan_directory( cls, dirpath ):
+		"""Indexes the ingredients files of a directory.
+		
+		If the directory has an up-to-date snapshot, it is used to index the
+		files and provides their parsed content. If the snapshot is outdated
+		and the user cache is writable, it is compiled again. Otherwise, only
+		the headers of the files are read.
+		
+		If the directory was already scanned, only its changed, added and
+		removed files are reindexed: their ingredients are dropped, to be
+		built again on request, and so are the indexes of their classes.
+		
+		Return value:
+			- bool -- True if the catalog changed.
+		"""
+		
+		changed = False
+		files = cls.list_files( dirpath ) if os.path.isdir( dirpath ) else {}
+		previous = Ingredient._sources.get( dirpath, {} )
+		
+		if dirpath not in Ingredient._sources or { f: previous[f][0] for f in previous } != files:
+			snapshot = cls.load_snapshot( dirpath )
+			
+			if snapshot == None or { f: snapshot[f][0] for f in snapshot } != files:
+				cache_directory = os.path.dirname( cls.get_snapshot_path( dirpath ) )
+				
+				try:
+					os.makedirs( cache_directory, exist_ok=True )
+				
+				except OSError:
+					log.debug( "Unable to create the snapshots directory \"%s\"." % cache_directory )
+				
+				if os.path.isdir( dirpath ) and os.access( cache_directory, os.W_OK ):
+					snapshot = cls.compile_directory( dirpath, files=files, snapshot=snapshot )
+				else:
+					snapshot = None
+			
+			# Without snapshot, the headers of the new and modified files are read
+			if snapshot == None:
+				snapshot = {}
+				modified_files = [ f for f in sorted( files ) if f not in previous or previous[f][0] != files[f] ]
+				headers = dict( zip( modified_files, cls.map_files( Ingredient.read_header, [ dirpath + os.sep + f for f in modified_files ] ) ) )
+				
+				for f in files:
+					if f in headers:
+						snapshot[f] = ( files[f], None ) + headers[f] + ( None, )
+					else:
+						snapshot[f] = previous[f] + ( None, )
+			
+			changed = cls.merge_directory( dirpath, previous, snapshot )
+			Ingredient._sources[dirpath] = { f: snapshot[f][:4] for f in snapshot }
+		
+		return changed
+	
+	
+	@classmethod
+	def merge_directory( cls, dirpath, previous, entries ):
+		"""Merges the indexed files of a directory into the catalog.
+		
+		Files are merged in a deterministic order, whatever the order of the
+		directory listing or of the workers. A file is unchanged if its
+		modification time or its content digest is the same.
+		
+		Parameters:
+			- (str) dirpath: The directory path.
+			- (dict) previous: The (mtime, digest, name, section) entries of the
+			  previous scan, by relative paths.
+			- (dict) entries: The (mtime, digest, name, section, config) entries
+			  of the files, by relative paths.
+		
+		Return value:
+			- bool -- True if the catalog changed.
+		"""
+		
+		sections = set()
+		
+		for f in sorted( set( previous ) | set( entries ) ):
+			filepath = dirpath + os.sep + f
+			old = previous.get( f )
+			new = entries.get( f )
+			
+			if old != None and new != None and (old[0] == new[0] or (old[1] != None and old[1] == new[1])):
+				continue
+			
+			if old != None:
+				Ingredient._configs.pop( filepath, None )
+				sections.add( old[3] )
+				
+				if old[2] != None and Ingredient._catalog.get( cls.sanitize_name( old[2] ), ( None, ) )[0] == filepath:
+					Ingredient._catalog.pop( cls.sanitize_name( old[2] ) )
+					Ingredient._ingredients.pop( cls.sanitize_name( old[2] ), None )
+			
+			if new != None:
+				mtime, digest, name, section, config = new
+				sections.add( section )
+				
+				if config != None:
+					Ingredient._configs[filepath] = config
+				
+				if name != None:
+					Ingredient._catalog[cls.sanitize_name( name )] = ( filepath, section )
+					Ingredient._ingredients.pop( cls.sanitize_name( name ), None )
+				
+				else:
+					log.error( "File \"%s\" has no \"ingredient\" section." % filepath )
+		
+		cls.drop_indexes( sections )
+		
+		return len(sections) > 0
+	
+	
+	@classmethod
+	def drop_indexes( cls, sections ):
+		"""Drops the indexes of the ingredient classes of specific sections.
+		
+		The index of all the ingredients is dropped too.
+		
+		Parameters:
+			- (set) sections: The changed specific sections.
+		"""
+		
+		for class_ in list( Ingredient._indexes ):
+			if class_ == None or class_.section in sections:
+				del Ingredient._indexes[class_]
+	
+	
+	@classmethod
+	def reload( cls ):
+		"""Reindexes the changed, added and removed files of the scanned directories.
+		
+		Return value:
+			- bool -- True if the catalog changed.
+		"""
+		
+		changed = False
+		
+		for dirpath in list( Ingredient._sources ):
+			changed = cls.scan_directory( dirpath ) or changed
+		
+		return changed
+	
+	
+	@classmethod
+	def watch( cls, interval=2.0 ):
+		"""Watches the scanned directories to reload their changed files.
+		
+		Directories are watched with inotify on Linux, or polled every
+		interval otherwise. Changes are reloaded by `refresh`, on each access
+		to the catalog, so long-running processes always see fresh data.
+		
+		Parameters:
+			- (float) interval: The polling interval, in seconds, when inotify
+			  is unavailable (default: 2.0).
+		"""
+		
+		from .watcher import DirectoryWatcher
+		
+		if Ingredient._watcher == None:
+			Ingredient._watcher = DirectoryWatcher( list( Ingredient._sources ), interval=interval )
+	
+	
+	@classmethod
+	def refresh( cls ):
+		"""Reloads the changed files of the watched directories, if any.
+		
+		Return value:
+			- bool -- True if the catalog changed.
+		"""
+		
+		changed = False
+		
+		if Ingredient._watcher != None and Ingredient._watcher.poll():
+			changed = cls.reload()
+		
+		return changed
+	
+	
+	@classmethod
+	def get_catalog_files( cls ):
+		"""Returns the paths of the files indexed in the catalog.
+		
+		Return value:
+			- list -- the files paths.
+		"""
+		
+		cls.scan()
+		
+		return [ filepath for filepath, section in Ingredient._catalog.values() ]
+	
+	
+	@classmethod
+	def list_files( cls, dirpath, prefix="" ):
+		"""Recursively lists the ingredients files of a directory.
+		
+		Parameters:
+			- (str) dirpath: The directory path.
+			- (str) prefix: The path prefix of listed files (default: "").
+		
+		Return value:
+			- dict -- (str => int) modification times of the files, in
+			  nanoseconds, indexed by paths relative to the directory.
+		"""
+		
+		files = {}
+		
 		for f in os.listdir( dirpath ):
 			filepath = dirpath + os.sep + f
 		
 			if os.path.isdir( filepath ):
-				cls.load_directory( filepath )
+				files.update( cls.list_files( filepath, prefix=prefix + f + os.sep ) )
 				
-			elif os.path.isfile( filepath ) and re.search( "\.ini$", f ):
-				cls.load( filepath )
+			elif os.path.isfile( filepath ) and re.search( r"\.ini$", f ):
+				files[prefix + f] = os.stat( filepath ).st_mtime_ns
+		
+		return files
 	
 	
 	@classmethod
-	def load( cls, filepath ):
+	def load_snapshot( cls, dirpath ):
+		"""Loads the compiled catalog of a directory.
+		
+		Return value:
+			- dict -- (str => tuple) the (mtime, digest, name, section, config)
+			  entries indexed by relative paths, None if there is no valid snapshot.
+		"""
+		
+		snapshot = None
+		filepath = cls.get_snapshot_path( dirpath )
 		
 		if os.path.isfile( filepath ):
-			config = configparser.ConfigParser()
-			config.read( filepath, encoding="utf-8" )
-			
-			if "ingredient" in config:
-				
-				if "name" in config["ingredient"]:
-					name = cls.sanitize_name( config["ingredient"]["name"] )
+			try:
+				with open( filepath, "rb" ) as f:
+					version, python_version, entries = marshal.loads( f.read() )
 				
-				class_ = Ingredient	
+				if version == cls.snapshot_version and python_version == sys.hexversion:
+					snapshot = entries
+			
+			except (OSError, EOFError, ValueError, TypeError):
+				log.debug( "Ignoring invalid snapshot \"%s\"." % filepath )
+		
+		return snapshot
+	
+	
+	@classmethod
+	def get_snapshot_path( cls, dirpath ):
+		"""Returns the path of the compiled catalog of a directory.
+		
+		Snapshots are stored in `snapshot_directory`, by default in
+		$XDG_CACHE_HOME (or ~/.cache), and named after the digest of the
+		absolute path of their directory, so the data directories are only
+		read.
+		"""
+		
+		directory = cls.snapshot_directory
+		
+		if directory == None:
+			directory = os.environ.get( "XDG_CACHE_HOME", os.path.expanduser( "~" ) + os.sep + ".cache" ) + os.sep + "beer" + os.sep + "ingredients"
+		
+		return directory + os.sep + hashlib.sha1( os.path.abspath( dirpath ).encode( "utf-8" ) ).hexdigest() + ".snapshot"
+	
+	
+	@classmethod
+	def compile_directory( cls, dirpath, files=None, snapshot=None ):
+		"""Compiles the ingredients files of a directory into a snapshot.
+		
+		Files are fully parsed and stored into a single binary file, in the
+		user cache (see `get_snapshot_path`), which is loaded in one read by
+		`scan_directory`. The snapshot is not written if the cache is not
+		writable. Entries
+		of a previous snapshot are reused when their file is unchanged, or
+		only touched (same content digest), the other files are parsed by
+		`map_files`.
+		
+		Parameters:
+			- (str) dirpath: The directory path.
+			- (dict) files: The files modification times (default: None, listed).
+			- (dict) snapshot: A previous snapshot (default: None).
+		
+		Return value:
+			- dict -- (str => tuple) the compiled (mtime, digest, name,
+			  section, config) entries indexed by relative paths.
+		"""
+		
+		entries = {}
+		
+		if files == None:
+			files = cls.list_files( dirpath )
+		
+		changed_files = []
+		
+		for f in sorted( files ):
+			if snapshot != None and f in snapshot and snapshot[f][0] == files[f]:
+				entries[f] = snapshot[f]
+			
+			# Touched files keep their entry
+			elif snapshot != None and f in snapshot and snapshot[f][1] == cls.get_digest( dirpath + os.sep + f ):
+				entries[f] = ( files[f], ) + snapshot[f][1:]
+			
+			else:
+				changed_files.append( f )
+		
+		compiled_files = cls.map_files( Ingredient.compile_file, [ dirpath + os.sep + f for f in changed_files ] )
+		
+		for i in range( len(changed_files) ):
+			entries[changed_files[i]] = ( files[changed_files[i]], ) + compiled_files[i]
+		
+		entries = { f: entries[f] for f in sorted( entries ) }
+		
+		filepath = cls.get_snapshot_path( dirpath )
+		log.debug( "Compiling ingredients snapshot \"%s\"..." % filepath )
+		
+		try:
+			os.makedirs( os.path.dirname( filepath ), exist_ok=True )
+			
+			with open( filepath + ".tmp", "wb" ) as f:
+				f.write( marshal.dumps( ( cls.snapshot_version, sys.hexversion, entries ) ) )
+			
+			os.replace( filepath + ".tmp", filepath )
+		
+		except OSError as e:
+			log.warn( "Unable to write snapshot \"%s\": %s" % ( filepath, e.strerror ), level=2 )
+		
+		return entries
+	
+	
+	@classmethod
+	def map_files( cls, function, filepaths ):
+		"""Applies a function to files, in parallel if workers are enabled.
+		
+		When `workers` is set, the files are spread across a pool of
+		processes (or threads, if `use_processes` is False) from
+		`concurrent.futures`. The function must then be picklable, like a
+		class method. Results are returned in the order of the files.
+		
+		Parameters:
+			- (callable) function: The function to apply to each file path.
+			- (list) filepaths: The files paths.
+		
+		Return value:
+			- list -- the results of the function, in the order of the files.
+		"""
+		
+		results = None
+		
+		if cls.workers > 1 and len(filepaths) > 1:
+			import concurrent.futures
+			
+			if cls.use_processes:
+				executor = concurrent.futures.ProcessPoolExecutor( max_workers=cls.workers )
+				chunksize = max( 1, len(filepaths) // (cls.workers * 4) )
+			else:
+				executor = concurrent.futures.ThreadPoolExecutor( max_workers=cls.workers )
+				chunksize = 1
+			
+			try:
+				with executor:
+					results = list( executor.map( function, filepaths, chunksize=chunksize ) )
+			
+			except (OSError, concurrent.futures.BrokenExecutor) as e:
+				log.warn( "Unable to parse ingredients in parallel: %s" % e, level=2 )
+		
+		if results == None:
+			results = [ function( filepath ) for filepath in filepaths ]
+		
+		return results
+	
+	
+	@classmethod
+	def compile_file( cls, filepath ):
+		"""Parses an ingredient file for a snapshot.
+		
+		Return value:
+			- tuple -- (str, str, str, dict) the digest of the file content, the
+			  name of the ingredient (None if there is none), its specific
+			  section and the parsed file.
+		"""
+		
+		with open( filepath, "rb" ) as f:
+			data = f.read()
+		
+		config = cls.parse( filepath, text=data.decode( "utf-8" ) )
+		name = None
+		
+		if "ingredient" in config and "name" in config["ingredient"]:
+			name = config["ingredient"]["name"]
+		
+		return ( hashlib.sha1( data ).hexdigest(), name, cls.get_section( config ), config )
+	
+	
+	@classmethod
+	def get_digest( cls, filepath ):
+		"""Returns the digest of the content of a file, None if it can not be read."""
+		
+		digest = None
+		
+		try:
+			with open( filepath, "rb" ) as f:
+				digest = hashlib.sha1( f.read() ).hexdigest()
+		
+		except OSError:
+			digest = None
+		
+		return digest
+	
+	
+	@classmethod
+	def read_header( cls, filepath ):
+		"""Reads the name and the specific section of an ingredient file.
+		
+		Only the lines needed to find the name of the ingredient and its
+		specific section are read.
+		
+		Return value:
+			- str -- the name of the ingredient, None if there is none.
+			- str -- the specific section, None if there is none.
+		"""
+		
+		name = None
+		section = None
+		current_section = None
+		
+		with open( filepath, encoding="utf-8" ) as f:
+			for line in f:
+				match = cls._section_regex.match( line )
 				
-				# Find the specific ingredient class
-				if "hop" in config:
-					from .hop import Hop
-					class_ = Hop
-					
-				elif "malt" in config:
-					from .malt import Malt
-					class_ = Malt
-					
-				elif "yeast" in config:
-					from .yeast import Yeast
-					class_ = Yeast
+				if match:
+					current_section = match.group( 1 )
 					
-				elif "sugar" in config:
-					from .sugar import Sugar
-					class_ = Sugar
+					if current_section in cls.sections:
+						section = current_section
+				
+				elif current_section == "ingredient" and name == None:
+					match = cls._name_regex.match( line )
 					
-				elif "water" in config:
-					from .water import Water
-					class_ = Water
+					if match:
+						name = match.group( 1 ).replace( "%%", "%" )
+				
+				if name != None and section != None:
+					break
+		
+		return ( name, section )
+	
+	
+	@classmethod
+	def parse( cls, filepath, text=None ):
+		"""Parses an ingredient file.
+		
+		Parameters:
+			- (str) filepath: The file path.
+			- (str) text: The content of the file (default: None, read).
+		
+		Return value:
+			- dict -- (str => dict) the sections of the file.
+		"""
+		
+		config = configparser.ConfigParser()
+		
+		if text != None:
+			config.read_string( text, source=filepath )
+		else:
+			config.read( filepath, encoding="utf-8" )
+		
+		return { section: dict( config[section] ) for section in config.sections() }
+	
+	
+	@classmethod
+	def get_section( cls, config ):
+		"""Returns the specific section of a parsed ingredient file, or None."""
+		
+		section = None
+		
+		for section_name in cls.sections:
+			if section_name in config:
+				section = section_name
+				break
+		
+		return section
+	
+	
+	@classmethod
+	def load( cls, filepath ):
+		"""Loads and builds an ingredient file.
+		
+		The parsed content of the file is taken from the loaded snapshots if
+		it is available.
+		
+		Return value:
+			- Ingredient -- the loaded ingredient, None if the file is invalid.
+		"""
+		
+		ingredient = None
+		
+		if filepath in Ingredient._configs or os.path.isfile( filepath ):
+			if filepath in Ingredient._configs:
+				config = Ingredient._configs[filepath]
+			else:
+				config = cls.parse( filepath )
+			
+			if "ingredient" in config and "name" in config["ingredient"]:
+				name = cls.sanitize_name( config["ingredient"]["name"] )
+				section = cls.get_section( config )
+				class_ = cls.get_class( section )
 				
 				log.debug( "Loading %s \"%s\"..." % (class_.__name__.lower(), name) )
 
 				#TODO: allow merge with user created ingredients
-				cls._ingredients[name] = class_( config )
+				ingredient = class_( config )
+				Ingredient._ingredients[name] = ingredient
+				previous = Ingredient._catalog.get( name )
+				
+				# Building an indexed ingredient does not change the catalog
+				if previous != ( filepath, section ):
+					Ingredient._catalog[name] = ( filepath, section )
+					cls.drop_indexes( set( [ section ] + ( [ previous[1] ] if previous != None else [] ) ) )
 				
 			else:
 				log.error( "File \"%s\" has no \"ingredient\" section." % filepath )
 			
 		else:
 			raise FileNotFoundError( errno.ENOENT, os.strerror(errno.ENOENT), filepath )
-
+		
+		return ingredient
+	
+	
+	@classmethod
+	def get_ingredient( cls, name, class_=None, fuzzy=False ):
+		"""Returns an ingredient from the catalog, building it if necessary.
+		
+		When fuzzy, a name which is not in the catalog is resolved to the
+		ingredient with the most similar name or alias, if it is similar
+		enough (see `fuzzy_threshold`).
+		
+		Parameters:
+			- (str) name: The name of the ingredient.
+			- (class) class_: The expected ingredient class (default: None).
+			- (bool) fuzzy: Resolve misspelled names and aliases (default: False).
+		
+		Return value:
+			- Ingredient -- the ingredient, None if it does not exist.
+		"""
+		
+		ingredient = None
+		sane_name = cls.sanitize_name( name )
+		
+		cls.scan()
+		
+		if sane_name in Ingredient._catalog:
+			filepath, section = Ingredient._catalog[sane_name]
+			
+			if class_ == None or class_.section == section:
+				if sane_name in Ingredient._ingredients:
+					ingredient = Ingredient._ingredients[sane_name]
+				else:
+					ingredient = cls.load( filepath )
+		
+		if ingredient == None and fuzzy:
+			ingredient = cls.get_index( class_ ).resolve( name, threshold=cls.fuzzy_threshold )
+		
+		return ingredient
+	
+	
+	@classmethod
+	def list_ingredients( cls, class_=None ):
+		"""Returns the ingredients of the catalog, building them if necessary.
+		
+		Parameters:
+			- (class) class_: The ingredient class to list (default: None, all).
+		
+		Return value:
+			- list -- the ingredients.
+		"""
+		
+		ingredients = []
+		
+		cls.scan()
+		
+		for name in list( Ingredient._catalog ):
+			if class_ == None or class_.section == Ingredient._catalog[name][1]:
+				ingredient = cls.get_ingredient( name, class_ )
+				
+				if ingredient != None:
+					ingredients.append( ingredient )
+		
+		return ingredients
+	
+	
+	@classmethod
+	def get_index( cls, class_=None ):
+		"""Returns the attribute indexes of the ingredients of a class.
+		
+		The indexes are built on the first call, over the ingredients sorted
+		by name, and kept until the catalog changes.
+		
+		Parameters:
+			- (class) class_: The ingredient class (default: None, all ingredients).
+		
+		Return value:
+			- IngredientIndex -- the indexes.
+		"""
+		
+		from .index import IngredientIndex
+		
+		cls.scan()
+		
+		if class_ not in Ingredient._indexes:
+			ingredients = sorted( cls.list_ingredients( class_ ), key=lambda i: i.name )
+			indexed_class = class_ if class_ != None else Ingredient
+			
+			Ingredient._indexes[class_] = IngredientIndex( ingredients, attributes=indexed_class.indexed_attributes, unit_attributes=indexed_class.indexed_units, key=cls.sanitize_name )
+		
+		return Ingredient._indexes[class_]
@@ -4,6 +4,8 @@ from .ingredient import *
 
 class Malt(Ingredient):
 	
+	section = "malt"
+	
 	def __init__( self, config ):
 	
 		Ingredient.__init__( self, config )
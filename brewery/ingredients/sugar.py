@@ -4,6 +4,8 @@ from .ingredient import *
 
 class Sugar(Ingredient):
 	
+	section = "sugar"
+	
 	def __init__( self, config ):
 	
 		Ingredient.__init__( self, config )
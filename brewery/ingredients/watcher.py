@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import errno
+import time
+import struct
+
+try:
+	import ctypes
+	import ctypes.util
+except ImportError:
+	ctypes = None
+
+class DirectoryWatcher():
+	"""Represents a watcher of ingredients directories.
+	
+	On Linux, the directories and their sub-directories are watched with
+	inotify, called through `ctypes`: polling the watcher is a single
+	non-blocking read. Elsewhere, or if inotify is unavailable, the watcher
+	falls back to reporting a possible change every `interval` seconds, the
+	caller being in charge of comparing the files.
+	
+	Attributes:
+		- (list) paths: The watched directories.
+		- (float) interval: The polling interval of the fallback, in seconds.
+		- (int) _fd: The inotify file descriptor, None if unavailable.
+		- (ctypes.CDLL) _libc: The C library providing inotify.
+		- (float) _last_poll: The time of the last fallback poll.
+	
+	Class variables:
+		- (int) mask: The inotify events watched.
+		- (str) extension: The extension of the watched files.
+	"""
+	
+	IN_MODIFY = 0x00000002
+	IN_ATTRIB = 0x00000004
+	IN_CLOSE_WRITE = 0x00000008
+	IN_MOVED_FROM = 0x00000040
+	IN_MOVED_TO = 0x00000080
+	IN_CREATE = 0x00000100
+	IN_DELETE = 0x00000200
+	IN_DELETE_SELF = 0x00000400
+	IN_MOVE_SELF = 0x00000800
+	IN_Q_OVERFLOW = 0x00004000
+	IN_ISDIR = 0x40000000
+	IN_NONBLOCK = 0o4000
+	IN_CLOEXEC = 0o2000000
+	
+	mask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+	extension = ".ini"
+	
+	_event_header = struct.Struct( "iIII" )
+	
+	def __init__( self, paths=None, interval=2.0 ):
+		"""Initialize a watcher.
+		
+		Parameters:
+			- (list) paths: The directories to watch (default: None).
+			- (float) interval: The polling interval of the fallback, in seconds (default: 2.0).
+		"""
+		
+		self.paths = []
+		self.interval = interval
+		self._fd = None
+		self._libc = None
+		self._last_poll = time.monotonic()
+		
+		if ctypes != None and sys.platform.startswith( "linux" ):
+			try:
+				self._libc = ctypes.CDLL( ctypes.util.find_library( "c" ), use_errno=True )
+				fd = self._libc.inotify_init1( DirectoryWatcher.IN_NONBLOCK | DirectoryWatcher.IN_CLOEXEC )
+				
+				if fd >= 0:
+					self._fd = fd
+			
+			except (OSError, AttributeError):
+				self._fd = None
+		
+		for path in paths if paths != None else []:
+			self.add( path )
+	
+	
+	@property
+	def is_native( self ):
+		"""Returns True if the directories are watched with inotify."""
+		
+		return self._fd != None
+	
+	
+	def add( self, path ):
+		"""Watches a directory and its sub-directories.
+		
+		Parameters:
+			- (str) path: The directory path.
+		"""
+		
+		if path not in self.paths:
+			self.paths.append( path )
+		
+		if self._fd != None:
+			for dirpath, dirnames, filenames in os.walk( path ):
+				if self._libc.inotify_add_watch( self._fd, os.fsencode( dirpath ), DirectoryWatcher.mask ) < 0:
+					# The directory vanished or watches are exhausted, fall back to polling
+					if ctypes.get_errno() not in [ errno.ENOENT, errno.ENOTDIR ]:
+						self.close()
+						break
+	
+	
+	def poll( self ):
+		"""Checks if the watched directories changed since the last poll.
+		
+		Return value:
+			- bool -- True if an ingredient file or a directory may have
+			  changed, False otherwise.
+		"""
+		
+		changed = False
+		
+		if self._fd != None:
+			new_directory = False
+			
+			while True:
+				try:
+					data = os.read( self._fd, 65536 )
+				
+				except BlockingIOError:
+					break
+				
+				events_changed, events_new_directory = self.parse_events( data )
+				changed = changed or events_changed
+				new_directory = new_directory or events_new_directory
+			
+			# Watch the created sub-directories
+			if new_directory:
+				for path in self.paths:
+					self.add( path )
+		
+		elif time.monotonic() - self._last_poll >= self.interval:
+			self._last_poll = time.monotonic()
+			changed = True
+		
+		return changed
+	
+	
+	def parse_events( self, data ):
+		"""Reads a buffer of inotify events.
+		
+		When the event queue overflows, events are lost: the overflow is
+		reported as a change of the files and of the directories.
+		
+		Parameters:
+			- (bytes) data: The events read from inotify.
+		
+		Return value:
+			- bool -- True if an ingredient file or a directory may have changed.
+			- bool -- True if a directory may have been created.
+		"""
+		
+		changed = False
+		new_directory = False
+		offset = 0
+		
+		while offset + self._event_header.size <= len(data):
+			wd, mask, cookie, length = self._event_header.unpack_from( data, offset )
+			name = data[offset + self._event_header.size:offset + self._event_header.size + length].rstrip( b"\0" ).decode( "utf-8", "replace" )
+			offset += self._event_header.size + length
+			
+			if mask & DirectoryWatcher.IN_Q_OVERFLOW:
+				changed = True
+				new_directory = True
+			
+			elif mask & DirectoryWatcher.IN_ISDIR:
+				changed = True
+				new_directory = new_directory or bool( mask & (DirectoryWatcher.IN_CREATE | DirectoryWatcher.IN_MOVED_TO) )
+			
+			elif mask & (DirectoryWatcher.IN_DELETE_SELF | DirectoryWatcher.IN_MOVE_SELF) or name.endswith( self.extension ):
+				changed = True
+		
+		return ( changed, new_directory )
+	
+	
+	def close( self ):
+		"""Stops watching with inotify."""
+		
+		if self._fd != None:
+			os.close( self._fd )
+			self._fd = None
@@ -4,6 +4,8 @@ from .ingredient import *
 
 class Water(Ingredient):
 	
+	section = "water"
+	
 	def __init__( self, config ):
 	
 		Ingredient.__init__( self, config )
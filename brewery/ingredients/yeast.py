@@ -5,6 +5,11 @@ from units import *
 
 class Yeast(Ingredient):
 	
+	section = "yeast"
+	indexed_attributes = [ "form", "styles" ]
+	indexed_units = [ "attenuation", "alcohol_tolerance", "temperature" ]
+	sort_attributes = Ingredient.sort_attributes + [ "form", "strain", "attenuation", "alcohol_tolerance", "temperature", "flocculation", "dry_weight", "viable_cells_per_g" ]
+	
 	def __init__( self, config ):
 	
 		Ingredient.__init__( self, config )
@@ -14,7 +19,8 @@ class Yeast(Ingredient):
 
 		if self.is_dry():
 			self.dry_weight = unit.Unit.create( config["yeast"]["dry_weight"] ) if "dry_weight" in config["yeast"] else None
-			self.viable_cells_per_g = config["yeast"]["viable_cells_per_g"] if "viable_cells_per_g" in config["yeast"] else None
+			viable_cells = config["yeast"]["viable_cells_per_g"] if "viable_cells_per_g" in config["yeast"] else ""
+			self.viable_cells_per_g = int( viable_cells ) if viable_cells.isdigit() else None
 		else:
 			self.dry_weight = None
 			self.viable_cells_per_g = None
@@ -36,24 +42,13 @@ class Yeast(Ingredient):
 		
 	@classmethod
 	def list_yeasts( cls, name=None ):
-		yeasts = []
-		
-		for ingredient in cls._ingredients:
-
-			if isinstance( cls._ingredients[ingredient], Yeast ):
-				yeasts.append( cls._ingredients[ingredient] )
 	
-		return sorted( yeasts, key=lambda h: h.name )
+		return cls.get_index( Yeast ).get()
 		
 		
 	@classmethod
-	def get( cls, name ):
-		yeast = None
-		sane_name = cls.sanitize_name( name )
-		
-		if sane_name in cls._ingredients:
-			if isinstance( cls._ingredients[sane_name], Yeast ):
-				yeast = cls._ingredients[sane_name]
-		
-		return yeast
-
+	def get( cls, name, fuzzy=False ):
+		"""Returns a yeast by its exact name, or its most similar name or alias
+		when fuzzy (see `Ingredient.get_ingredient`)."""
+	
+		return cls.get_ingredient( name, Yeast, fuzzy=fuzzy )
@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+
+import array
+import itertools
+
+try:
+	import numpy
+
+except ImportError:
+	numpy = None
+
+from units import *
+from units.color import Color
+from .recipe import Recipe
+
+class Optimizer():
+	"""Represents a solver of ingredient amounts hitting style targets.
+	
+	Targets are windows of original gravity, bitterness, color and alcohol
+	by volume. The problem is split along the recipe dependencies:
+		- the yeast only sets the final gravity, so the yeasts of the catalog
+		  are checked at once against the gravity and alcohol windows, which
+		  gives the gravity points to reach;
+		- the gravity points and the color (Morey malt color units) are both
+		  linear in the fermentable weights: single fermentables and every
+		  pair of fermentables are solved in closed form, as whole arrays;
+		- the bitterness is linear in the hop weights once the gravity is
+		  known: the bitterness per gram of every hop of the catalog is
+		  computed in one `units.ibu.compute` call.
+	
+	The solution uses the fewest ingredients ("count" objective, the
+	cheapest then the lightest solution among them) or is the cheapest one
+	("cost" objective, ingredients without cost are ignored). Arrays are
+	NumPy arrays when NumPy is available. The coefficients of the candidates
+	are computed once, the hop bitterness per gram is cached by gravity and
+	the solutions are cached by targets, so an interactive search only
+	computes what its targets change.
+	
+	Attributes:
+		- (list) fermentables: The candidate fermentables, dicts of "name",
+		  "extract" (potential extract unit) and "color" (color unit).
+		- (list) hops: The candidate hops.
+		- (list) yeasts: The candidate yeasts.
+		- (Unit) volume: The post-boil volume.
+		- (Unit) efficiency: The brewhouse efficiency.
+		- (Unit) hop_time: The boil time of the hop additions.
+		- (dict) _coefficients: (str => array) the gravity points and malt
+		  color units per kilogram of the fermentables, the alpha acids of
+		  the hops, the attenuations of the yeasts and the costs per kilogram.
+		- (dict) _bitterness: (tuple => array) the bitterness per gram of the
+		  hops, by (gravity, volume, boil time).
+		- (dict) _solutions: (tuple => tuple) the solutions by targets.
+	
+	Class variables:
+		- (list) objectives: The available objectives.
+		- (float) abv_factor: The alcohol by volume of a gravity point of
+		  apparent attenuation, in percent.
+	"""
+	
+	objectives = [ "count", "cost" ]
+	abv_factor = 0.13125
+	
+	def __init__( self, fermentables, hops=None, yeasts=None, costs=None, volume=None, efficiency=None, hop_time=None ):
+		"""Initialize an optimizer.
+		
+		Parameters:
+			- (list) fermentables: The candidate fermentables, dicts of
+			  "name", "extract" and "color" units.
+			- (list) hops: The candidate hops (default: None, the catalog).
+			- (list) yeasts: The candidate yeasts (default: None, the catalog).
+			- (dict) costs: (str => float) the costs per kilogram, by
+			  ingredient names (default: None, unknown costs).
+			- (Unit) volume: The post-boil volume (default: None, as `Recipe`).
+			- (Unit) efficiency: The efficiency (default: None, as `Recipe`).
+			- (Unit) hop_time: The boil time of hops (default: None, 60 mn).
+		"""
+		
+		if hops == None:
+			from .ingredients.hop import Hop
+			hops = Hop.list_hops()
+		
+		if yeasts == None:
+			from .ingredients.yeast import Yeast
+			yeasts = Yeast.list_yeasts()
+		
+		if costs == None:
+			costs = {}
+		
+		self.fermentables = fermentables
+		self.hops = [ hop for hop in hops if hop.alpha_acids != None ]
+		self.yeasts = [ yeast for yeast in yeasts if yeast.attenuation != None ]
+		self.volume = volume if volume != None else unit.Unit.create( Recipe.default_volume )
+		self.efficiency = efficiency if efficiency != None else unit.Unit.create( Recipe.default_efficiency )
+		self.hop_time = hop_time if hop_time != None else unit.Unit.create( "60 mn" )
+		
+		pounds_per_kg = weight.Gram( 1000 ).get_value( unit="lb" )
+		gallons = self.volume.get_value( unit="gal" )
+		efficiency = self.efficiency.get_value( unit="%" ) / 100.0
+		
+		self._coefficients = {
+			"points": Optimizer.to_array( [ f["extract"].get_value( unit="ppg" ) * pounds_per_kg * efficiency / gallons for f in self.fermentables ] ),
+			"colors": Optimizer.to_array( [ Color.get_grain_lovibond( f["color"] ) * pounds_per_kg / gallons for f in self.fermentables ] ),
+			"fermentable_costs": Optimizer.to_array( [ costs.get( f["name"], float( "inf" ) ) for f in self.fermentables ] ),
+			"alpha_acids": ibu.get_alpha_acids( [ hop.alpha_acids for hop in self.hops ] ),
+			"hop_costs": Optimizer.to_array( [ costs.get( hop.name, float( "inf" ) ) for hop in self.hops ] ),
+			"attenuations": Optimizer.to_array( [ yeast.attenuation.get_value( unit="%" ) / 100.0 for yeast in self.yeasts ] )
+		}
+		
+		self._bitterness = {}
+		self._solutions = {}
+	
+	
+	@classmethod
+	def to_array( cls, values ):
+		"""Returns a NumPy array of floats, or an `array.array` without NumPy."""
+		
+		return numpy.asarray( values, dtype=numpy.float64 ) if numpy != None else array.array( "d", values )
+	
+	
+	@classmethod
+	def get_window( cls, target, unit_name ):
+		"""Returns a target as a (low, high) window.
+		
+		Parameters:
+			- (Range|Unit|tuple) target: The target, None if unconstrained.
+			- (str) unit_name: The unit of the window.
+		
+		Return value:
+			- tuple -- (float, float) the window, None if unconstrained.
+		"""
+		
+		window = None
+		
+		if isinstance( target, unit.Range ):
+			window = ( target.get_min().get_value( unit=unit_name ), target.get_max().get_value( unit=unit_name ) )
+		
+		elif isinstance( target, unit.Unit ):
+			window = ( target.get_value( unit=unit_name ), target.get_value( unit=unit_name ) )
+		
+		elif target != None:
+			window = ( float( target[0] ), float( target[1] ) )
+		
+		return window
+	
+	
+	def solve( self, original_gravity=None, bitterness=None, color=None, alcohol_by_volume=None, objective="count" ):
+		"""Finds ingredient amounts hitting the targets.
+		
+		Parameters:
+			- (Range) original_gravity: The gravity window (default: None).
+			- (tuple) bitterness: The (low, high) IBU window (default: None).
+			- (Range|tuple) color: The color window, in SRM (default: None).
+			- (Range|tuple) alcohol_by_volume: The alcohol window, in percent
+			  (default: None).
+			- (str) objective: "count" or "cost" (default: "count").
+		
+		Return value:
+			- Recipe -- the recipe, None if the targets can not be reached.
+		"""
+		
+		if objective not in Optimizer.objectives:
+			raise ValueError( "unknown objective \"%s\"" % objective )
+		
+		if original_gravity == None and alcohol_by_volume == None:
+			raise ValueError( "a gravity or an alcohol target is required" )
+		
+		color_window = Optimizer.get_window( color, "°SRM" )
+		
+		# The color window is solved in malt color units, the Morey equation being monotonic
+		if color_window != None:
+			color_window = tuple( Color.get_malt_color_units( max( srm, 0.0 ) ) for srm in color_window )
+		
+		targets = (
+			Optimizer.get_window( original_gravity, "points" ),
+			Optimizer.get_window( bitterness, None ),
+			color_window,
+			Optimizer.get_window( alcohol_by_volume, "%" ),
+			objective
+		)
+		
+		if targets not in self._solutions:
+			self._solutions[targets] = self.solve_windows( *targets )
+		
+		return self.build_recipe( self._solutions[targets] )
+	
+	
+	def solve_windows( self, points_window, bitterness_window, color_window, abv_window, objective ):
+		"""Solves targets given as windows, see `solve`.
+		
+		Return value:
+			- tuple -- (yeast index, fermentables, hops) with the (index,
+			  weight) of the additions, in kilograms for the fermentables and
+			  in grams for the hops, None if there is no solution.
+		"""
+		
+		solution = None
+		yeast = self.solve_yeast( points_window, abv_window )
+		
+		if yeast != None:
+			yeast_index, points = yeast
+			fermentables = self.solve_fermentables( points, color_window, objective )
+			
+			if fermentables != None:
+				hops = []
+				
+				if bitterness_window != None:
+					hops = self.solve_hops( 1.0 + points / 1000.0, sum( bitterness_window ) / 2.0, objective )
+				
+				if hops != None:
+					solution = ( yeast_index, fermentables, hops )
+		
+		return solution
+	
+	
+	def solve_yeast( self, points_window, abv_window ):
+		"""Chooses the yeast and the gravity points to reach.
+		
+		The alcohol window gives a gravity window for each yeast attenuation,
+		the yeast leaving the widest intersection with the gravity window is
+		chosen and the middle of the intersection is targeted.
+		
+		Return value:
+			- tuple -- (yeast index, points), the index is None without alcohol
+			  target; None if no yeast fits.
+		"""
+		
+		result = None
+		low, high = points_window if points_window != None else ( 0.0, float( "inf" ) )
+		
+		if abv_window == None:
+			result = ( None, (low + high) / 2.0 )
+		
+		elif len(self.yeasts):
+			attenuations = self._coefficients["attenuations"]
+			
+			if numpy != None:
+				lows = numpy.maximum( low, abv_window[0] / (attenuations * Optimizer.abv_factor) )
+				highs = numpy.minimum( high, abv_window[1] / (attenuations * Optimizer.abv_factor) )
+				index = int( numpy.argmax( highs - lows ) )
+			else:
+				lows = [ max( low, abv_window[0] / (a * Optimizer.abv_factor) ) for a in attenuations ]
+				highs = [ min( high, abv_window[1] / (a * Optimizer.abv_factor) ) for a in attenuations ]
+				index = max( range( len(lows) ), key=lambda i: highs[i] - lows[i] )
+			
+			if highs[index] >= lows[index]:
+				result = ( index, float( lows[index] + highs[index] ) / 2.0 )
+		
+		return result
+	
+	
+	def solve_fermentables( self, points, color_window, objective ):
+		"""Chooses the fermentables and their weights.
+		
+		A single fermentable reaches the gravity points with its own color, a
+		pair of fermentables reaches both the gravity points and the middle of
+		the color window: both are solved for all the candidates at once.
+		
+		Return value:
+			- list -- the (index, weight in kilograms) additions, None if the
+			  targets can not be reached.
+		"""
+		
+		gravity = self._coefficients["points"]
+		colors = self._coefficients["colors"]
+		costs = self._coefficients["fermentable_costs"]
+		solutions = []
+		
+		# Single fermentables
+		if numpy != None:
+			weights = points / gravity
+			feasible = gravity > 0
+			
+			if color_window != None:
+				feasible &= (weights * colors >= color_window[0]) & (weights * colors <= color_window[1])
+			
+			solutions += Optimizer.get_best( [ ( i, ) for i in numpy.nonzero( feasible )[0] ], [ ( w, ) for w in weights[feasible] ], (weights * costs)[feasible], weights[feasible], objective )
+		
+		else:
+			singles = [ ( i, points / gravity[i] ) for i in range( len(gravity) ) if gravity[i] > 0 ]
+			
+			if color_window != None:
+				singles = [ ( i, w ) for i, w in singles if color_window[0] <= w * colors[i] <= color_window[1] ]
+			
+			solutions += Optimizer.get_best( [ ( i, ) for i, w in singles ], [ ( w, ) for i, w in singles ], [ w * costs[i] for i, w in singles ], [ w for i, w in singles ], objective )
+		
+		# Pairs of fermentables hitting the middle of the color window
+		if color_window != None and len(gravity) > 1 and ( objective == "cost" or len(solutions) == 0 ):
+			target_color = sum( color_window ) / 2.0
+			
+			if numpy != None:
+				first, second = numpy.triu_indices( len(gravity), 1 )
+				determinants = gravity[first] * colors[second] - gravity[second] * colors[first]
+				
+				with numpy.errstate( divide="ignore", invalid="ignore" ):
+					first_weights = (points * colors[second] - gravity[second] * target_color) / determinants
+					second_weights = (gravity[first] * target_color - points * colors[first]) / determinants
+				
+				feasible = numpy.isfinite( first_weights ) & numpy.isfinite( second_weights ) & (first_weights >= 0) & (second_weights >= 0)
+				first, second = first[feasible], second[feasible]
+				first_weights, second_weights = first_weights[feasible], second_weights[feasible]
+				
+				solutions += Optimizer.get_best( list( zip( first, second ) ), list( zip( first_weights, second_weights ) ), first_weights * costs[first] + second_weights * costs[second], first_weights + second_weights, objective )
+			
+			else:
+				pairs = []
+				
+				for i, j in itertools.combinations( range( len(gravity) ), 2 ):
+					determinant = gravity[i] * colors[j] - gravity[j] * colors[i]
+					
+					if determinant != 0:
+						wi = (points * colors[j] - gravity[j] * target_color) / determinant
+						wj = (gravity[i] * target_color - points * colors[i]) / determinant
+						
+						if wi >= 0 and wj >= 0:
+							pairs.append( ( i, j, wi, wj ) )
+				
+				solutions += Optimizer.get_best( [ ( i, j ) for i, j, wi, wj in pairs ], [ ( wi, wj ) for i, j, wi, wj in pairs ], [ wi * costs[i] + wj * costs[j] for i, j, wi, wj in pairs ], [ wi + wj for i, j, wi, wj in pairs ], objective )
+		
+		return Optimizer.choose( solutions, objective )
+	
+	
+	def solve_hops( self, gravity, bitterness, objective ):
+		"""Chooses the bittering hop and its weight.
+		
+		Return value:
+			- list -- the (index, weight in grams) addition, None if no hop fits.
+		"""
+		
+		liters = self.volume.get_value( unit="L" )
+		seconds = self.hop_time.get_value( unit="s" )
+		key = ( round( gravity, 4 ), liters, seconds )
+		
+		if key not in self._bitterness:
+			count = len(self.hops)
+			self._bitterness[key] = ibu.compute( Optimizer.to_array( [ 1.0 ] * count ), self._coefficients["alpha_acids"], Optimizer.to_array( [ seconds ] * count ), key[0], liters )
+		
+		per_gram = self._bitterness[key]
+		costs = self._coefficients["hop_costs"]
+		indexes = [ i for i in range( len(per_gram) ) if per_gram[i] > 0 ]
+		weights = [ bitterness / per_gram[i] for i in indexes ]
+		
+		solutions = Optimizer.get_best( [ ( i, ) for i in indexes ], [ ( w, ) for w in weights ], [ weights[k] / 1000.0 * costs[indexes[k]] for k in range( len(indexes) ) ], weights, objective )
+		
+		return Optimizer.choose( solutions, objective )
+	
+	
+	@classmethod
+	def get_best( cls, indexes, weights, costs, total_weights, objective ):
+		"""Returns the best candidate of a group of the same size.
+		
+		Candidates are ranked by cost, then by total weight. With the "cost"
+		objective, candidates without cost are ignored.
+		
+		Return value:
+			- list -- the ((cost, count, weight), additions) best candidate,
+			  empty if there is none.
+		"""
+		
+		best = []
+		
+		if len(indexes):
+			if numpy != None:
+				costs = numpy.asarray( costs, dtype=numpy.float64 )
+				position = int( numpy.lexsort( ( numpy.asarray( total_weights, dtype=numpy.float64 ), costs ) )[0] )
+			else:
+				position = min( range( len(indexes) ), key=lambda k: ( costs[k], total_weights[k] ) )
+			
+			cost = float( costs[position] )
+			
+			if objective != "cost" or cost != float( "inf" ):
+				additions = [ ( int( i ), float( w ) ) for i, w in zip( indexes[position], weights[position] ) ]
+				best.append( ( ( cost, len(additions), float( total_weights[position] ) ), additions ) )
+		
+		return best
+	
+	
+	@classmethod
+	def choose( cls, solutions, objective ):
+		"""Chooses the additions of the best solution.
+		
+		Return value:
+			- list -- the (index, weight) additions, None without solution.
+		"""
+		
+		additions = None
+		
+		if len(solutions):
+			if objective == "cost":
+				additions = min( solutions, key=lambda s: s[0] )[1]
+			else:
+				additions = min( solutions, key=lambda s: ( s[0][1], s[0][0], s[0][2] ) )[1]
+		
+		return additions
+	
+	
+	def build_recipe( self, solution ):
+		"""Builds the recipe of a solution.
+		
+		Return value:
+			- Recipe -- the recipe, None without solution.
+		"""
+		
+		recipe = None
+		
+		if solution != None:
+			yeast_index, fermentables, hops = solution
+			
+			recipe = Recipe()
+			recipe.volume = self.volume.copy()
+			recipe.efficiency = self.efficiency.copy()
+			
+			for index, kilograms in fermentables:
+				fermentable = self.fermentables[index]
+				recipe.add_fermentable( weight.Gram( kilograms * 1000.0 ), fermentable["extract"], fermentable["color"], ingredient=fermentable.get( "ingredient" ) )
+			
+			for index, grams in hops:
+				recipe.add_hop( self.hops[index], weight.Gram( grams ), self.hop_time.copy() )
+			
+			if yeast_index != None:
+				recipe.set_yeast( self.yeasts[yeast_index] )
+		
+		return recipe
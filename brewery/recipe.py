@@ -1,12 +1,72 @@
 # -*- coding: utf-8 -*-
 
+import array
 from units import *
 
 class Recipe():
-
+	"""Represents a beer recipe and computes its characteristics.
+	
+	The characteristics (original and final gravities, alcohol by volume,
+	bitterness and color) are derived from the recipe inputs (volume,
+	efficiency, fermentables, hops and yeast) through a dependency graph,
+	described by the `dependencies` class variable. Each characteristic is
+	computed on first access and cached, and changing an input only drops the
+	characteristics depending on it: changing a hop addition recomputes the
+	bitterness but neither the gravities nor the color. The bitterness of each
+	hop addition is also kept, so only the changed addition is recomputed,
+	unless the gravity or the volume changes.
+	
+	The weights of the additions are kept as arrays of floats, in grams, so
+	recipes are scaled with array operations (see `scale_batch`).
+	
+	Attributes:
+		- (list) _ingredients: The ingredients of the recipe.
+		- (Yeast) _yeast: The yeast ingredient of the recipe, None if it is
+		  only given by its attenuation.
+		- (Unit) _volume: The post-boil volume.
+		- (Unit) _efficiency: The brewhouse efficiency, in percent.
+		- (Unit) _attenuation: The apparent attenuation of the yeast, in percent.
+		- (list) _fermentables: The fermentable additions, dicts of "extract"
+		  (potential extract) and "color" units.
+		- (array.array) _fermentable_weights: The weights of the fermentable
+		  additions, in grams.
+		- (list) _hops: The hop additions, dicts of "alpha_acids" and "time"
+		  (boil time) units, and of the cached "bitterness" of the addition
+		  with the "key" (gravity, volume) it was computed with.
+		- (array.array) _hop_weights: The weights of the hop additions, in grams.
+		- (dict) _values: (str => object) the computed characteristics.
+	
+	Class variables:
+		- (dict) dependencies: (str => list) the inputs and characteristics
+		  each characteristic is computed from.
+		- (dict) _dependents: (str => list) the characteristics depending,
+		  directly or not, on each node of the graph.
+		- (str) default_volume: The volume of new recipes.
+		- (str) default_efficiency: The efficiency of new recipes.
+		- (str) default_attenuation: The attenuation used without yeast.
+		- (str) bitterness_formula: The formula of `units.ibu` computing the
+		  bitterness.
+	"""
+	
+	dependencies = {
+		"original_gravity": [ "volume", "efficiency", "fermentables" ],
+		"final_gravity": [ "original_gravity", "yeast" ],
+		"alcohol_by_volume": [ "original_gravity", "final_gravity" ],
+		"bitterness": [ "volume", "original_gravity", "hops" ],
+		"color": [ "volume", "fermentables" ]
+	}
+	
+	_dependents = {}
+	
+	default_volume = "20 L"
+	default_efficiency = "75 %"
+	default_attenuation = "75 %"
+	bitterness_formula = "tinseth"
+	
 	def __init__( self ):
 		
 		self._ingredients = []
+		self._yeast = None
 		
 		self._mashProfile = None
 		self._spargeProfile = None
@@ -14,12 +74,405 @@ class Recipe():
 		self._fermentationProfile = None
 		self._carbonatationProfile = None
 		
-		# self._fermentiscibleSugars = ?
-		# self._nonFermentiscibleSugars = ?
+		self._volume = unit.Unit.create( Recipe.default_volume )
+		self._efficiency = unit.Unit.create( Recipe.default_efficiency )
+		self._attenuation = unit.Unit.create( Recipe.default_attenuation )
+		self._fermentables = []
+		self._fermentable_weights = array.array( "d" )
+		self._hops = []
+		self._hop_weights = array.array( "d" )
+		self._values = {}
 		
-		#self._originalGravity = Unit.create( "0SG" )
-		#self._finalGravity = Unit.create( "0SG" )
-		#self._color = Unit.create( "0EBC" )
-		#self._alcoholByVolume = 0
-		#self._bitterness = 0
 		#self._aromas = []
+	
+	
+	@classmethod
+	def get_dependents( cls, name ):
+		"""Returns the characteristics depending on an input or a characteristic.
+		
+		The reversed graph is walked once per node and cached.
+		
+		Parameters:
+			- (str) name: The input or characteristic name.
+		
+		Return value:
+			- list -- the names of the dependent characteristics.
+		"""
+		
+		dependents = cls._dependents.get( name )
+		
+		if dependents == None:
+			dependents = []
+			queue = [ name ]
+			
+			while len(queue):
+				current = queue.pop( 0 )
+				
+				for characteristic in cls.dependencies:
+					if current in cls.dependencies[characteristic] and characteristic not in dependents:
+						dependents.append( characteristic )
+						queue.append( characteristic )
+			
+			cls._dependents[name] = dependents
+		
+		return dependents
+	
+	
+	def invalidate( self, name ):
+		"""Drops the characteristics depending on a changed input.
+		
+		Parameters:
+			- (str) name: The changed input or characteristic.
+		"""
+		
+		self._values.pop( name, None )
+		
+		for dependent in Recipe.get_dependents( name ):
+			self._values.pop( dependent, None )
+	
+	
+	def get( self, name ):
+		"""Returns a characteristic, computing it if it is not cached.
+		
+		Parameters:
+			- (str) name: The characteristic name, a key of `dependencies`.
+		
+		Return value:
+			- object -- the characteristic.
+		"""
+		
+		if name not in self._values:
+			self._values[name] = getattr( self, "compute_%s" % name )()
+		
+		return self._values[name]
+	
+	
+	@property
+	def volume( self ):
+		return self._volume
+	
+	
+	@volume.setter
+	def volume( self, value ):
+		self._volume = value
+		self.invalidate( "volume" )
+	
+	
+	@property
+	def efficiency( self ):
+		return self._efficiency
+	
+	
+	@efficiency.setter
+	def efficiency( self, value ):
+		self._efficiency = value
+		self.invalidate( "efficiency" )
+	
+	
+	@property
+	def attenuation( self ):
+		return self._attenuation
+	
+	
+	def set_yeast( self, yeast ):
+		"""Sets the yeast of the recipe, replacing the previous one.
+		
+		Parameters:
+			- (Yeast|Unit) yeast: The yeast, or its apparent attenuation.
+		"""
+		
+		attenuation = getattr( yeast, "attenuation", yeast )
+		
+		if self._yeast != None:
+			self._ingredients = [ ingredient for ingredient in self._ingredients if ingredient is not self._yeast ]
+			self._yeast = None
+		
+		if yeast is not attenuation:
+			self._ingredients.append( yeast )
+			self._yeast = yeast
+		
+		self._attenuation = attenuation if attenuation != None else unit.Unit.create( Recipe.default_attenuation )
+		self.invalidate( "yeast" )
+	
+	
+	def add_fermentable( self, weight, extract, color, ingredient=None ):
+		"""Adds a fermentable to the recipe.
+		
+		Parameters:
+			- (Unit) weight: The weight of the fermentable.
+			- (Unit) extract: Its potential extract (ppg, HWE or %Extract).
+			- (Unit) color: Its color.
+			- (Ingredient) ingredient: The fermentable ingredient (default: None).
+		
+		Return value:
+			- int -- the index of the addition.
+		"""
+		
+		if ingredient != None:
+			self._ingredients.append( ingredient )
+		
+		self._fermentables.append( { "extract": extract, "color": color } )
+		self._fermentable_weights.append( weight.get_value( unit="g" ) )
+		self.invalidate( "fermentables" )
+		
+		return len(self._fermentables) - 1
+	
+	
+	def update_fermentable( self, index, weight ):
+		"""Changes the weight of a fermentable addition."""
+		
+		self._fermentable_weights[index] = weight.get_value( unit="g" )
+		self.invalidate( "fermentables" )
+	
+	
+	def remove_fermentable( self, index ):
+		"""Removes a fermentable addition."""
+		
+		del self._fermentables[index]
+		del self._fermentable_weights[index]
+		self.invalidate( "fermentables" )
+	
+	
+	def get_fermentable_weight( self, index ):
+		"""Returns the weight of a fermentable addition.
+		
+		Return value:
+			- Gram -- the weight.
+		"""
+		
+		return weight.Gram( self._fermentable_weights[index] )
+	
+	
+	def add_hop( self, hop, weight, time ):
+		"""Adds a hop addition to the recipe.
+		
+		Parameters:
+			- (Hop|Unit) hop: The hop, or its alpha acids.
+			- (Unit) weight: The weight of the addition.
+			- (Unit) time: The boil time of the addition.
+		
+		Return value:
+			- int -- the index of the addition.
+		"""
+		
+		alpha_acids = getattr( hop, "alpha_acids", hop )
+		
+		if hop is not alpha_acids:
+			self._ingredients.append( hop )
+		
+		self._hops.append( { "alpha_acids": alpha_acids, "time": time, "bitterness": None, "key": None } )
+		self._hop_weights.append( weight.get_value( unit="g" ) )
+		self.invalidate( "hops" )
+		
+		return len(self._hops) - 1
+	
+	
+	def update_hop( self, index, weight=None, time=None ):
+		"""Changes the weight or the boil time of a hop addition.
+		
+		Only the bitterness of this addition is recomputed.
+		"""
+		
+		addition = self._hops[index]
+		
+		if weight != None:
+			self._hop_weights[index] = weight.get_value( unit="g" )
+		
+		if time != None:
+			addition["time"] = time
+		
+		addition["key"] = None
+		self.invalidate( "hops" )
+	
+	
+	def remove_hop( self, index ):
+		"""Removes a hop addition."""
+		
+		del self._hops[index]
+		del self._hop_weights[index]
+		self.invalidate( "hops" )
+	
+	
+	def get_hop_weight( self, index ):
+		"""Returns the weight of a hop addition.
+		
+		Return value:
+			- Gram -- the weight.
+		"""
+		
+		return weight.Gram( self._hop_weights[index] )
+	
+	
+	@property
+	def original_gravity( self ):
+		return self.get( "original_gravity" )
+	
+	
+	@property
+	def final_gravity( self ):
+		return self.get( "final_gravity" )
+	
+	
+	@property
+	def alcohol_by_volume( self ):
+		return self.get( "alcohol_by_volume" )
+	
+	
+	@property
+	def bitterness( self ):
+		return self.get( "bitterness" )
+	
+	
+	@property
+	def color( self ):
+		return self.get( "color" )
+	
+	
+	def compute_original_gravity( self ):
+		"""Computes the original gravity from the fermentables extract.
+		
+		Return value:
+			- SpecificGravity -- the original gravity.
+		"""
+		
+		points = 0.0
+		pounds = unit.Unit.convert_array( self._fermentable_weights, "g", "lb" )
+		
+		for i in range( len(self._fermentables) ):
+			points += self._fermentables[i]["extract"].get_value( unit="ppg" ) * float( pounds[i] )
+		
+		points *= self._efficiency.get_value( unit="%" ) / 100.0
+		
+		return density.SpecificGravity( 1.0 + points / self._volume.get_value( unit="gal" ) / 1000.0 )
+	
+	
+	def compute_final_gravity( self ):
+		"""Computes the final gravity from the yeast apparent attenuation.
+		
+		Return value:
+			- SpecificGravity -- the final gravity.
+		"""
+		
+		points = self.original_gravity.get_value( unit="points" )
+		
+		return density.SpecificGravity( 1.0 + points * (1.0 - self._attenuation.get_value( unit="%" ) / 100.0) / 1000.0 )
+	
+	
+	def compute_alcohol_by_volume( self ):
+		"""Computes the alcohol by volume, in percent."""
+		
+		return (self.original_gravity.get_value() - self.final_gravity.get_value()) * 131.25
+	
+	
+	def compute_bitterness( self ):
+		"""Computes the bitterness, in IBU, with `bitterness_formula`.
+		
+		The bitterness of each addition is kept with the gravity and the
+		volume it was computed with. The additions for which they changed are
+		recomputed together with `units.ibu.compute`.
+		"""
+		
+		gravity = self.original_gravity.get_value()
+		liters = self._volume.get_value( unit="L" )
+		key = ( gravity, liters )
+		
+		indexes = [ i for i in range( len(self._hops) ) if self._hops[i]["key"] != key ]
+		
+		if len(indexes):
+			weights = [ self._hop_weights[i] for i in indexes ]
+			alpha_acids = [ self._hops[i]["alpha_acids"] for i in indexes ]
+			times = [ self._hops[i]["time"] for i in indexes ]
+			
+			bitterness = ibu.compute( weights, alpha_acids, times, gravity, liters, formula=Recipe.bitterness_formula )
+			
+			for i in range( len(indexes) ):
+				self._hops[indexes[i]]["bitterness"] = float( bitterness[i] )
+				self._hops[indexes[i]]["key"] = key
+		
+		return sum( addition["bitterness"] for addition in self._hops )
+	
+	
+	def compute_color( self ):
+		"""Computes the color with the Morey equation.
+		
+		Return value:
+			- SRM -- the color.
+		"""
+		
+		return color.Color.predict( self._fermentable_weights, [ fermentable["color"] for fermentable in self._fermentables ], self._volume )
+	
+	
+	def scale( self, volume=None, efficiency=None, factor=None ):
+		"""Scales the recipe, see `scale_batch`."""
+		
+		Recipe.scale_batch( [ self ], volume=volume, efficiency=efficiency, factor=factor )
+	
+	
+	@classmethod
+	def scale_batch( cls, recipes, volume=None, efficiency=None, factor=None ):
+		"""Scales recipes to a batch volume or an efficiency, in place.
+		
+		Scaling to a volume multiplies the weights of all the additions, and
+		the volume, by the ratio of the volumes. Re-targeting an efficiency
+		multiplies the weights of the fermentables by the ratio of the
+		efficiencies, so the gravities are kept. A factor, a real number or a
+		`Proportion` as for `Unit.__imul__`, multiplies the volume and the
+		weights of the additions.
+		
+		The weights of all the recipes are concatenated and scaled in a
+		single `Unit.scale_array` pass, then split back.
+		
+		Parameters:
+			- (list) recipes: The recipes.
+			- (Unit) volume: The new batch volume (default: None).
+			- (Unit) efficiency: The new efficiency (default: None).
+			- (float|Proportion) factor: The scaling factor (default: None).
+		"""
+		
+		fermentable_weights = array.array( "d" )
+		fermentable_factors = array.array( "d" )
+		hop_weights = array.array( "d" )
+		hop_factors = array.array( "d" )
+		
+		for recipe in recipes:
+			if volume != None:
+				new_volume = volume.copy()
+			elif factor != None:
+				new_volume = recipe._volume * factor
+			else:
+				new_volume = recipe._volume
+			
+			volume_factor = new_volume.get_value( unit="L" ) / recipe._volume.get_value( unit="L" )
+			efficiency_factor = recipe._efficiency.get_value( unit="%" ) / efficiency.get_value( unit="%" ) if efficiency != None else 1.0
+			
+			fermentable_weights.extend( recipe._fermentable_weights )
+			fermentable_factors.extend( array.array( "d", [ volume_factor * efficiency_factor ] ) * len(recipe._fermentable_weights) )
+			hop_weights.extend( recipe._hop_weights )
+			hop_factors.extend( array.array( "d", [ volume_factor ] ) * len(recipe._hop_weights) )
+			
+			recipe._volume = new_volume
+			
+			if efficiency != None:
+				recipe._efficiency = efficiency.copy()
+		
+		unit.Unit.scale_array( fermentable_weights, fermentable_factors )
+		unit.Unit.scale_array( hop_weights, hop_factors )
+		
+		fermentable_offset = 0
+		hop_offset = 0
+		
+		for recipe in recipes:
+			count = len(recipe._fermentable_weights)
+			recipe._fermentable_weights = fermentable_weights[fermentable_offset:fermentable_offset + count]
+			fermentable_offset += count
+			
+			count = len(recipe._hop_weights)
+			recipe._hop_weights = hop_weights[hop_offset:hop_offset + count]
+			hop_offset += count
+			
+			for addition in recipe._hops:
+				addition["key"] = None
+			
+			recipe.invalidate( "volume" )
+			recipe.invalidate( "efficiency" )
+			recipe.invalidate( "hops" )
@@ -0,0 +1,483 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import environment
+
+from units import *
+from brewery.recipe import Recipe
+from brewery.optimizer import Optimizer
+from brewery.ingredients.ingredient import Ingredient
+from brewery.ingredients.hop import Hop
+from brewery.ingredients.yeast import Yeast
+from brewery.ingredients.index import IngredientIndex, IntervalTree
+from brewery.ingredients.watcher import DirectoryWatcher
+from beershell import hop as hop_commands
+from language import Language
+
+Ingredient.load_directory( environment.basepath + os.sep + "data" + os.sep + "ingredients" )
+
+class TestRecipe(unittest.TestCase):
+
+	def create_recipe( self ):
+		
+		recipe = Recipe()
+		recipe.volume = unit.Unit.create( "20 L" )
+		recipe.efficiency = unit.Unit.create( "75 %" )
+		recipe.add_fermentable( unit.Unit.create( "4 kg" ), unit.Unit.create( "37 ppg" ), color.Lovibond( 2 ) )
+		recipe.add_fermentable( unit.Unit.create( "300 g" ), unit.Unit.create( "34 ppg" ), color.Lovibond( 60 ) )
+		recipe.add_hop( unit.Unit.create( "12 %" ), unit.Unit.create( "25 g" ), unit.Unit.create( "60 mn" ) )
+		recipe.add_hop( unit.Unit.create( "5 %" ), unit.Unit.create( "30 g" ), unit.Unit.create( "10 mn" ) )
+		recipe.set_yeast( unit.Unit.create( "75 %" ) )
+		
+		return recipe
+	
+	
+	def test_characteristics( self ):
+		
+		recipe = self.create_recipe()
+		pounds = [ unit.Unit.create( "4 kg" ).get_value( unit="lb" ), unit.Unit.create( "300 g" ).get_value( unit="lb" ) ]
+		gallons = unit.Unit.create( "20 L" ).get_value( unit="gal" )
+		
+		points = (37 * pounds[0] + 34 * pounds[1]) * 0.75 / gallons
+		self.assertAlmostEqual( recipe.original_gravity.get_value(), 1.0 + points / 1000.0, places=6 )
+		self.assertAlmostEqual( recipe.final_gravity.get_value(), 1.0 + points * 0.25 / 1000.0, places=6 )
+		self.assertAlmostEqual( recipe.alcohol_by_volume, points * 0.75 / 1000.0 * 131.25, places=6 )
+		
+		bitterness = ibu.total( [ 25, 30 ], [ 12, 5 ], [ 3600, 600 ], recipe.original_gravity.get_value(), 20 )
+		self.assertAlmostEqual( recipe.bitterness, bitterness, places=6 )
+		
+		srm = 1.4922 * pow( (2 * pounds[0] + 60 * pounds[1]) / gallons, 0.6859 )
+		self.assertAlmostEqual( recipe.color.get_value( unit="°SRM" ), srm, places=6 )
+	
+	
+	def test_update_hop( self ):
+		
+		recipe = self.create_recipe()
+		
+		for name in Recipe.dependencies:
+			recipe.get( name )
+		
+		first_bitterness = recipe._hops[0]["bitterness"]
+		computed = []
+		compute = ibu.compute
+		
+		def compute_spy( weights, *args, **kwargs ):
+			computed.append( len(weights) )
+			return compute( weights, *args, **kwargs )
+		
+		try:
+			ibu.compute = compute_spy
+			recipe.update_hop( 1, weight=unit.Unit.create( "60 g" ) )
+			
+			# Only the bitterness is dropped
+			self.assertEqual( sorted( recipe._values ), sorted( name for name in Recipe.dependencies if name != "bitterness" ) )
+			
+			bitterness = recipe.bitterness
+		
+		finally:
+			ibu.compute = compute
+		
+		# Only the changed addition is recomputed
+		self.assertEqual( computed, [ 1 ] )
+		self.assertEqual( recipe._hops[0]["bitterness"], first_bitterness )
+		self.assertAlmostEqual( bitterness, ibu.total( [ 25, 60 ], [ 12, 5 ], [ 3600, 600 ], recipe.original_gravity.get_value(), 20 ), places=6 )
+	
+	
+	def test_set_yeast( self ):
+		
+		recipe = self.create_recipe()
+		recipe.add_hop( Hop.get( "Cascade" ), unit.Unit.create( "20 g" ), unit.Unit.create( "5 mn" ) )
+		first = Yeast.get( "WLP001 California Ale Yeast®" )
+		second = Yeast.get( "Lallemand Belle Saison" )
+		
+		# The previous yeast is replaced
+		recipe.set_yeast( first )
+		recipe.set_yeast( second )
+		self.assertEqual( [ ingredient for ingredient in recipe._ingredients if isinstance( ingredient, Yeast ) ], [ second ] )
+		self.assertEqual( recipe._ingredients, [ Hop.get( "Cascade" ), second ] )
+		self.assertIs( recipe.attenuation, second.attenuation )
+		
+		recipe.set_yeast( first )
+		self.assertEqual( recipe._ingredients, [ Hop.get( "Cascade" ), first ] )
+		
+		# Attenuations remove the yeast ingredient
+		recipe.set_yeast( unit.Unit.create( "70 %" ) )
+		self.assertEqual( recipe._ingredients, [ Hop.get( "Cascade" ) ] )
+	
+	
+	def test_scale( self ):
+		
+		recipe = self.create_recipe()
+		original_gravity = recipe.original_gravity.get_value()
+		bitterness = recipe.bitterness
+		
+		recipe.scale( volume=unit.Unit.create( "50 L" ) )
+		self.assertAlmostEqual( recipe.original_gravity.get_value(), original_gravity, places=6 )
+		self.assertAlmostEqual( recipe.bitterness, bitterness, places=6 )
+		self.assertAlmostEqual( recipe.get_fermentable_weight( 0 ).get_value( unit="kg" ), 10, places=6 )
+		
+		recipes = [ self.create_recipe(), self.create_recipe() ]
+		Recipe.scale_batch( recipes, efficiency=unit.Unit.create( "60 %" ) )
+		
+		for scaled_recipe in recipes:
+			self.assertAlmostEqual( scaled_recipe.original_gravity.get_value(), original_gravity, places=6 )
+			self.assertAlmostEqual( scaled_recipe.get_fermentable_weight( 0 ).get_value( unit="kg" ), 5, places=6 )
+		
+		recipes = [ self.create_recipe(), self.create_recipe() ]
+		Recipe.scale_batch( recipes, factor=0.5 )
+		
+		for scaled_recipe in recipes:
+			self.assertAlmostEqual( scaled_recipe.original_gravity.get_value(), original_gravity, places=6 )
+			self.assertAlmostEqual( scaled_recipe.volume.get_value( unit="L" ), 10, places=6 )
+
+
+class TestOptimizer(unittest.TestCase):
+
+	def create_optimizer( self ):
+		
+		fermentables = [
+			{ "name": "Pale", "extract": unit.Unit.create( "37 ppg" ), "color": color.Lovibond( 2 ) },
+			{ "name": "Amber", "extract": unit.Unit.create( "35 ppg" ), "color": color.Lovibond( 10 ) },
+			{ "name": "Crystal", "extract": unit.Unit.create( "34 ppg" ), "color": color.EBC( 240 ) }
+		]
+		
+		costs = { "Pale": 1.0, "Amber": 10.0, "Crystal": 2.0, "Magnum": 30.0 }
+		
+		return Optimizer( fermentables, hops=[ Hop.get( "Cascade" ), Hop.get( "Magnum" ) ], yeasts=[ Yeast.get( "WLP001 California Ale Yeast®" ) ], costs=costs, volume=unit.Unit.create( "20 L" ) )
+	
+	
+	def solve( self, optimizer, objective="count", alcohol_by_volume=( 4.5, 5.5 ) ):
+		
+		return optimizer.solve( original_gravity=unit.Unit.create( "1.045~1.060 SG" ), bitterness=( 30, 40 ), color=unit.Unit.create( "9~14 °SRM" ), alcohol_by_volume=alcohol_by_volume, objective=objective )
+	
+	
+	def get_additions( self, recipe ):
+		
+		return ( [ round( w, 6 ) for w in recipe._fermentable_weights ], [ round( w, 6 ) for w in recipe._hop_weights ] )
+	
+	
+	def test_windows( self ):
+		
+		for objective in Optimizer.objectives:
+			recipe = self.solve( self.create_optimizer(), objective=objective )
+			
+			self.assertNotEqual( recipe, None )
+			self.assertTrue( 1.045 <= round( recipe.original_gravity.get_value(), 6 ) <= 1.060 )
+			self.assertTrue( 30 <= round( recipe.bitterness, 6 ) <= 40 )
+			self.assertTrue( 9 <= round( recipe.color.get_value( unit="°SRM" ), 6 ) <= 14 )
+			self.assertTrue( 4.5 <= round( recipe.alcohol_by_volume, 6 ) <= 5.5 )
+	
+	
+	def test_objectives( self ):
+		
+		optimizer = self.create_optimizer()
+		
+		# The fewest ingredients: the amber malt alone
+		recipe = self.solve( optimizer, objective="count" )
+		self.assertEqual( len(recipe._fermentables), 1 )
+		self.assertEqual( recipe._fermentables[0]["color"], optimizer.fermentables[1]["color"] )
+		
+		# The cheapest: pale and crystal malts, and the only hop with a cost
+		recipe = self.solve( optimizer, objective="cost" )
+		self.assertEqual( len(recipe._fermentables), 2 )
+		self.assertEqual( [ f["color"] for f in recipe._fermentables ], [ optimizer.fermentables[0]["color"], optimizer.fermentables[2]["color"] ] )
+		self.assertEqual( recipe._hops[0]["alpha_acids"], Hop.get( "Magnum" ).alpha_acids )
+		
+		with self.assertRaises( ValueError ):
+			self.solve( optimizer, objective="weight" )
+	
+	
+	def test_infeasible( self ):
+		
+		self.assertEqual( self.solve( self.create_optimizer(), alcohol_by_volume=( 11, 12 ) ), None )
+		
+		optimizer = self.create_optimizer()
+		self.assertEqual( optimizer.solve( original_gravity=unit.Unit.create( "1.050 SG" ), color=unit.Unit.create( "60~70 °SRM" ) ), None )
+	
+	
+	def test_cache( self ):
+		
+		optimizer = self.create_optimizer()
+		
+		for objective in Optimizer.objectives:
+			uncached = self.get_additions( self.solve( self.create_optimizer(), objective=objective ) )
+			self.assertEqual( self.get_additions( self.solve( optimizer, objective=objective ) ), uncached )
+			
+			# Solutions are cached by targets, and the hop bitterness by gravity
+			self.assertEqual( self.get_additions( self.solve( optimizer, objective=objective ) ), uncached )
+			optimizer._solutions.clear()
+			self.assertEqual( self.get_additions( self.solve( optimizer, objective=objective ) ), uncached )
+		
+		self.assertEqual( len(optimizer._bitterness), 1 )
+
+
+class Item():
+	"""Represents an indexed ingredient."""
+	
+	def __init__( self, name, aliases=None, substitutes=None ):
+		self.name = name
+		self.aliases = aliases if aliases != None else []
+		self.substitutes = substitutes if substitutes != None else []
+
+
+class TestIndex(unittest.TestCase):
+
+	def create_index( self ):
+		
+		items = [
+			Item( "Cascade", substitutes=[ "Centennial", "Amarillo" ] ),
+			Item( "Centennial", substitutes=[ "Columbus" ] ),
+			Item( "Columbus", aliases=[ "Tomahawk", "Zeus" ] ),
+			Item( "Amarillo" ),
+			Item( "Hallertau Magnum", aliases=[ "Magnum" ], substitutes=[ "Nortern Brewer" ] ),
+			Item( "Northern Brewer", substitutes=[ "Hallertau Magnum" ] )
+		]
+		
+		return IngredientIndex( items, key=Ingredient.sanitize_name )
+	
+	
+	def test_resolve( self ):
+		
+		index = self.create_index()
+		
+		# Exact names and aliases are preferred, whatever their case
+		self.assertEqual( index.resolve( "cascade" ).name, "Cascade" )
+		self.assertEqual( index.resolve( "Tomahawk" ).name, "Columbus" )
+		self.assertEqual( index.resolve( "magnum" ).name, "Hallertau Magnum" )
+		
+		# Misspelled names
+		self.assertEqual( index.resolve( "Cascde" ).name, "Cascade" )
+		self.assertEqual( index.resolve( "Centenial" ).name, "Centennial" )
+		self.assertEqual( index.resolve( "Tomahwak" ).name, "Columbus" )
+		self.assertEqual( index.resolve( "Zzzz", threshold=0.5 ), None )
+		
+		positions = index.search( "Columbus", limit=2 )
+		self.assertEqual( positions[0], ( 2, 1.0 ) )
+		self.assertEqual( len(positions), 2 )
+		self.assertTrue( positions[1][1] < 1.0 )
+		self.assertEqual( index.search( "Columbus", threshold=1.0 ), [ ( 2, 1.0 ) ] )
+		
+		# Resolutions are memoized
+		self.assertIn( ( "cascde", 0.0 ), index._resolved )
+		self.assertEqual( index.resolve( "Cascde" ).name, "Cascade" )
+		
+		# Catalog lookups are only fuzzy on demand
+		self.assertEqual( Hop.get( "Cascde" ), None )
+		self.assertEqual( Hop.get( "Cascde", fuzzy=True ).name, "Cascade" )
+		self.assertEqual( Yeast.get( "WLP001" ), None )
+		self.assertEqual( Yeast.get( "WLP001", fuzzy=True ).name, "WLP001 California Ale Yeast®" )
+		
+		
+	def test_substitutes( self ):
+	
+		index = self.create_index()
+		
+		def get_substitutes( name, depth ):
+			return [ ( substitute.name, distance ) for substitute, distance in index.get_substitutes( index.resolve( name ), depth=depth ) ]
+		
+		self.assertEqual( get_substitutes( "Cascade", 1 ), [ ( "Centennial", 1 ), ( "Amarillo", 1 ) ] )
+		self.assertEqual( get_substitutes( "Cascade", 2 ), [ ( "Centennial", 1 ), ( "Amarillo", 1 ), ( "Columbus", 2 ) ] )
+		self.assertEqual( get_substitutes( "Cascade", 5 ), get_substitutes( "Cascade", 2 ) )
+		self.assertEqual( get_substitutes( "Amarillo", 0 ), [] )
+		
+		# Substitutions are symmetric
+		self.assertEqual( get_substitutes( "Columbus", 1 ), [ ( "Centennial", 1 ) ] )
+		self.assertEqual( get_substitutes( "Columbus", 3 ), [ ( "Centennial", 1 ), ( "Cascade", 2 ), ( "Amarillo", 3 ) ] )
+		
+		# Misspelled substitutes are resolved, and listed once
+		self.assertEqual( get_substitutes( "Hallertau Magnum", 2 ), [ ( "Northern Brewer", 1 ) ] )
+		self.assertEqual( get_substitutes( "Northern Brewer", 2 ), [ ( "Hallertau Magnum", 1 ) ] )
+		
+		# Closures are computed once per depth
+		self.assertEqual( sorted( index._substitutes ), [ ( 0, 0.0 ), ( 1, 0.0 ), ( 2, 0.0 ), ( 3, 0.0 ), ( 5, 0.0 ) ] )
+	
+	
+	def test_interval_tree( self ):
+		
+		values = [ None ]
+		
+		for low in range( 1, 16 ):
+			values.append( unit.Unit.create( "%d %%" % low ) )
+			values.append( unit.Unit.create( "%d~%d %%" % ( low, low + low % 4 ) ) )
+		
+		values.append( unit.Unit.create( "0.1" ) )
+		tree = IntervalTree( values )
+		positions = [ position for position in range( len(values) ) if values[position] != None ]
+		
+		# Stabbing queries, in the unit of the first value
+		for point in [ 0, 1, 4.5, 7, 10, 12.5, 18, 30 ]:
+			expected = [ p for p in positions if tree.get_bounds( values[p] )[0] <= point <= tree.get_bounds( values[p] )[1] ]
+			self.assertEqual( sorted( tree.stab( point ) ), expected )
+		
+		# Comparisons follow the Range semantics
+		for literal in [ "5 %", "4~7 %", "12~12 %", "1 %", "0.5~30 %", "7.5 %", "25 %" ]:
+			value = unit.Unit.create( literal )
+			
+			self.assertEqual( tree.overlap( value ), [ p for p in positions if value == values[p] ] )
+			self.assertEqual( tree.below( value ), [ p for p in positions if not value <= values[p] ] )
+			self.assertEqual( tree.above( value ), [ p for p in positions if not value >= values[p] ] )
+		
+		self.assertEqual( IntervalTree( [ None ] ).overlap( unit.Unit.create( "5 %" ) ), [] )
+
+
+class TestCatalog(unittest.TestCase):
+
+	def setUp( self ):
+		
+		self._directory = tempfile.mkdtemp()
+		self._cache = tempfile.mkdtemp()
+		Ingredient.snapshot_directory = self._cache
+	
+	
+	def tearDown( self ):
+		
+		shutil.rmtree( self._directory )
+		Ingredient.reload()
+		Ingredient._sources.pop( self._directory, None )
+		Ingredient.snapshot_directory = None
+		shutil.rmtree( self._cache )
+	
+	
+	def write_hop( self, filename, name, alpha_acids ):
+		
+		filepath = self._directory + os.sep + filename
+		mtime = os.stat( filepath ).st_mtime_ns if os.path.exists( filepath ) else None
+		
+		with open( filepath, "w", encoding="utf-8" ) as f:
+			f.write( "[ingredient]\nname = %s\n\n[hop]\nalpha_acids = %s %%%%\n" % ( name, alpha_acids ) )
+		
+		# Rewritten files get a new modification time, whatever the clock resolution
+		if mtime != None:
+			os.utime( filepath, ns=( mtime + 1000000000, mtime + 1000000000 ) )
+	
+	
+	def test_snapshot( self ):
+		
+		self.write_hop( "first.ini", "Snapshot First", 5 )
+		Ingredient.load_directory( self._directory )
+		self.assertEqual( Ingredient.get_ingredient( "Snapshot First", Hop ).alpha_acids, unit.Unit.create( "5 %" ) )
+		
+		# Snapshots are written in the cache, not in the data directory
+		self.assertEqual( os.listdir( self._directory ), [ "first.ini" ] )
+		self.assertEqual( os.listdir( self._cache ), [ os.path.basename( Ingredient.get_snapshot_path( self._directory ) ) ] )
+		self.assertEqual( list( Ingredient.load_snapshot( self._directory ) ), [ "first.ini" ] )
+		
+		# Without writable cache, the catalog is still indexed
+		with open( self._cache + os.sep + "file", "w" ) as f:
+			f.write( "" )
+		
+		Ingredient.snapshot_directory = self._cache + os.sep + "file" + os.sep + "snapshots"
+		self.write_hop( "second.ini", "Snapshot Second", 6 )
+		self.assertTrue( Ingredient.reload() )
+		self.assertEqual( Ingredient.get_ingredient( "Snapshot Second", Hop ).alpha_acids, unit.Unit.create( "6 %" ) )
+		self.assertEqual( Ingredient.load_snapshot( self._directory ), None )
+	
+	
+	def test_reload( self ):
+		
+		self.write_hop( "first.ini", "Reloaded First", 5 )
+		self.write_hop( "second.ini", "Reloaded Second", 6 )
+		
+		Ingredient.load_directory( self._directory )
+		self.assertEqual( Ingredient.get_ingredient( "Reloaded First", Hop ).alpha_acids, unit.Unit.create( "5 %" ) )
+		self.assertNotEqual( Ingredient.get_ingredient( "Reloaded Second", Hop ), None )
+		index = Hop.get_index( Hop )
+		
+		self.assertFalse( Ingredient.reload() )
+		self.assertIs( Hop.get_index( Hop ), index )
+		
+		# Modified, added and removed files
+		self.write_hop( "first.ini", "Reloaded First", 7 )
+		self.write_hop( "third.ini", "Reloaded Third", 8 )
+		os.remove( self._directory + os.sep + "second.ini" )
+		
+		self.assertTrue( Ingredient.reload() )
+		self.assertEqual( Ingredient.get_ingredient( "Reloaded First", Hop ).alpha_acids, unit.Unit.create( "7 %" ) )
+		self.assertEqual( Ingredient.get_ingredient( "Reloaded Second", Hop ), None )
+		self.assertEqual( Ingredient.get_ingredient( "Reloaded Third", Hop ).alpha_acids, unit.Unit.create( "8 %" ) )
+		
+		# The index of the hops is built again
+		self.assertIsNot( Hop.get_index( Hop ), index )
+		self.assertEqual( len([ hop for hop in Hop.get_index( Hop ).ingredients if hop.name.startswith( "Reloaded" ) ]), 2 )
+	
+	
+	def test_watcher( self ):
+		
+		watcher = DirectoryWatcher( [ self._directory ], interval=0.0 )
+		
+		try:
+			self.assertEqual( watcher.poll(), not watcher.is_native )
+			
+			self.write_hop( "first.ini", "Watched", 5 )
+			self.assertTrue( watcher.poll() )
+			
+			# Overflowed event queues are changes
+			overflow = DirectoryWatcher._event_header.pack( -1, DirectoryWatcher.IN_Q_OVERFLOW, 0, 0 )
+			self.assertEqual( watcher.parse_events( overflow ), ( True, True ) )
+			self.assertEqual( watcher.parse_events( b"" ), ( False, False ) )
+		
+		finally:
+			watcher.close()
+
+
+class Errors():
+	"""Records the errors of a command instead of a shell."""
+	
+	def __init__( self ):
+		self.errors = []
+	
+	
+	def error( self, message, code=0 ):
+		self.errors.append( message )
+
+
+class TestListing(unittest.TestCase):
+
+	def setUp( self ):
+		Language.register( "beershell.ini" )
+	
+	
+	def test_sort_options( self ):
+		
+		shell = Errors()
+		
+		def parse( sort, limit=None ):
+			return hop_commands.List.parse_sort_options( shell, { "sort": sort, "limit": limit }, Hop.sort_attributes, class_=Hop )
+		
+		self.assertEqual( parse( "alpha_acids desc", "5" ), ( "alpha_acids", True, 5 ) )
+		self.assertEqual( parse( None ), ( None, False, None ) )
+		self.assertEqual( shell.errors, [] )
+		
+		# Only the listed data attributes are accepted
+		for sort in [ "description", "_catalog", "get_substitutes", "load" ]:
+			self.assertEqual( parse( sort ), None )
+		
+		self.assertEqual( parse( "name", "0" ), None )
+		self.assertEqual( len(shell.errors), 5 )
+		
+		# Invalid options do not load the catalog
+		Ingredient.drop_indexes( { Hop.section } )
+		self.assertEqual( hop_commands.List().run( shell, [ "list", "--sort", "get_substitutes" ] ), 1 )
+		self.assertNotIn( Hop, Ingredient._indexes )
+	
+	
+	def test_numeric_sort( self ):
+		
+		self.assertNotIn( "pitching_rate", Yeast.sort_attributes )
+		
+		index = Yeast.get_index( Yeast )
+		values = [ yeast.viable_cells_per_g for yeast in IngredientIndex.select( iter( index.ingredients ), attribute="viable_cells_per_g" ) ]
+		defined = [ value for value in values if value != None ]
+		
+		# Cell counts are numbers, missing ones come last
+		self.assertTrue( len(defined) > 1 )
+		self.assertTrue( all( isinstance( value, int ) for value in defined ) )
+		self.assertEqual( defined, sorted( defined ) )
+		self.assertEqual( values[:len(defined)], defined )
+
+if __name__ == "__main__":
+	unittest.main()
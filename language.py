@@ -4,14 +4,16 @@ import os
 import sys
 import re
 import errno
-import configparser
+import hashlib
+import marshal
 import log
 
 class Language():
 	"""Represents the singleton Language class which provides localized texts.
 	
 	Represents the singleton Language class which provides localized texts.
-	Text values are stored in INI files and can be load with the `load` method.
+	Text values are stored in INI files and can be load with the `load` method,
+	or registered with the `register` method to be loaded on first use.
 	By default, files are located in "<app root>/i18n/<language>/" directory.
 	INI's section names are part of the full key-path of a text. For instance,
 	this class, Language, is fully named "language.Language". In our fictive
@@ -21,19 +23,37 @@ class Language():
 	will be generated as "language.Language.my_text" and will match our INI
 	parsed file.
 	
+	Loaded files are compiled into binary catalogs, in the user cache, which
+	are used as long as the INI files are unchanged. The texts of a class are
+	resolved once into a key table, so getting a text is a dict lookup.
+	
 	Class variables:
 		- (Language) _instance: the current Language instance.
+		- (str) catalog_directory: The directory of the compiled catalogs,
+		  None for $XDG_CACHE_HOME/beer/i18n (default).
+		- (str) catalog_extension: The extension of the compiled catalogs.
+		- (int) catalog_version: The format version of the compiled catalogs.
 	"""
 
 	_instance = None
-
+	
+	catalog_directory = None
+	catalog_extension = ".catalog"
+	catalog_version = 2
+	
+	_reference_regex = re.compile( r"\[\[([A-Za-z0-9\._]+)\]\]" )
+	_section_regex = re.compile( r"^\[([^\]]+)\]\s*$" )
+	
 	def __init__( self, lang, path ):
 		"""Internal Language instance initialization."""
 		
 		self._language = lang
 		self._path = path
 		self._content = {}
+		self._tables = {}
+		self._sections = {}
 		self._files = set()
+		self._registered = set()
 	
 	
 	@classmethod
@@ -41,7 +61,8 @@ class Language():
 		"""Initialize the language instance.
 		
 		Initialize the language instance. If the path is unspecified
-		the default used path is "<app root>/i18n".
+		the default used path is "<app root>/i18n". Files loaded or
+		registered in the previous instance are registered again.
 		
 		Parameters:
 			- lang: The language (default: "en").
@@ -57,11 +78,11 @@ class Language():
 			cls._instance = cls( lang, path )
 		
 		else:
-			loaded_files = cls._instance._files
+			registered_files = cls._instance._registered
 			cls._instance = cls( lang, path )
 			
-			for filename in loaded_files:
-				cls._instance.load( filename )
+			for filename in registered_files:
+				cls._instance.register( filename )
 	
 	
 	@classmethod
@@ -70,7 +91,7 @@ class Language():
 		
 		if cls._instance == None:
 			cls.initialize()
-	
+		
 		return cls._instance
 	
 	
@@ -81,37 +102,292 @@ class Language():
 		return class_.__module__ + "." + class_.__qualname__ + "." + key.lower()
 	
 	
+	@classmethod
+	def get_table( cls, class_ ):
+		"""Returns the texts of a class.
+		
+		The table of a class is resolved once and cached: it is the dict of
+		its INI section, which is shared with the loaded content, so texts
+		loaded afterwards are visible through it. If the section belongs to
+		a registered file, the file is loaded. A section which is neither
+		loaded nor registered is not cached, so a file registered afterwards
+		is still loaded.
+		
+		Parameters:
+			- (class) class_: The class.
+		
+		Return value:
+			- dict -- (str => str) the texts indexed by lowercased keys.
+		"""
+		
+		language = cls.getInstance()
+		table = language._tables.get( class_ )
+		
+		if table == None:
+			section = class_.__module__ + "." + class_.__qualname__
+			
+			if section in language._sections:
+				cls.load( language._sections[section] )
+			
+			table = language._content.get( section )
+			
+			if table != None:
+				language._tables[class_] = table
+			else:
+				table = {}
+		
+		return table
+	
+	
+	@classmethod
+	def register( cls, filename ):
+		"""Registers an INI file to be loaded on first use.
+		
+		Only the section names of the file are read, from its compiled
+		catalog, or from the INI section headers if the catalog is outdated.
+		The file is loaded the first time a text of one of its sections is
+		requested.
+		
+		Parameters:
+			- (str) filename: The file name, relative to the language directory.
+		"""
+		
+		language = cls.getInstance()
+		
+		if filename not in language._registered:
+			filepath = language._path + os.sep + language._language + os.sep + filename
+			
+			if os.path.isfile( filepath ):
+				log.debug( "Registering language file: %s..." % (language._language + os.sep + filename) )
+				language._registered.add( filename )
+				
+				if filename not in language._files:
+					sections = cls.load_sections( filepath )
+					
+					for section in sections:
+						language._sections[section] = filename
+					
+					# Cached tables of sections also found in this file are resolved again
+					for class_ in [ class_ for class_ in language._tables if class_.__module__ + "." + class_.__qualname__ in sections ]:
+						del language._tables[class_]
+			
+			else:
+				raise FileNotFoundError( errno.ENOENT, os.strerror(errno.ENOENT), filepath )
+	
+	
 	@classmethod
 	def load( cls, filename ):
-		"""Loads an INI file into the Language text collection."""
+		"""Loads an INI file into the Language text collection.
+		
+		The file is loaded from its compiled catalog when it is up to date,
+		otherwise it is compiled first (see `compile`).
+		"""
 		
 		language = cls.getInstance()
 		
 		if filename not in language._files:
-			if os.path.isfile( language._path + os.sep + language._language + os.sep + filename ):
+			filepath = language._path + os.sep + language._language + os.sep + filename
+			
+			if os.path.isfile( filepath ):
 				log.debug( "Loading language file: %s..." % (language._language + os.sep + filename) )
 				language._files.add( filename )
-			
-				config = configparser.ConfigParser()
-				config.read( language._path + os.sep + language._language + os.sep + filename, encoding="utf-8" )
-			
-				for section in config:
-					for key in config[section]:
-						value = config[section][key]
-						matches = re.findall( r"\[\[([A-Za-z0-9\._]+)\]\]", value )
-						
-						# Replacing references
-						if len( matches ):
-							for match in matches:
-								if match in language._content:
-									value = value.replace( "[[%s]]" % match, language._content[match] )
-								else:
-									value = value.replace( "[[%s]]" % match, "" )
-						
-						language._content["%s.%s" % ( section, key )] = value
+				language._registered.add( filename )
+				
+				catalog = cls.load_catalog( filepath )
+				
+				if catalog == None:
+					catalog = cls.compile( filepath )
+				
+				for section, texts, references in catalog:
+					if language._sections.get( section ) == filename:
+						del language._sections[section]
+					
+					table = language._content.setdefault( section, {} )
+					
+					if len(references) == 0:
+						table.update( texts )
+					
+					else:
+						for key in texts:
+							table[key] = cls.resolve( texts[key] ) if key in references else texts[key]
 			
 			else:
-				raise FileNotFoundError( errno.ENOENT, os.strerror(errno.ENOENT), language._path + os.sep + language._language + os.sep + filename )
+				raise FileNotFoundError( errno.ENOENT, os.strerror(errno.ENOENT), filepath )
+	
+	
+	@classmethod
+	def resolve( cls, value ):
+		"""Replaces the "[[section.key]]" references of a text by the loaded texts.
+		
+		The registered files of the referenced sections are loaded.
+		"""
+		
+		language = cls.getInstance()
+		
+		def replace( match ):
+			section, dot, key = match.group( 1 ).rpartition( "." )
+			
+			if section in language._sections:
+				cls.load( language._sections[section] )
+			
+			return language._content.get( section, {} ).get( key, "" )
+		
+		return cls._reference_regex.sub( replace, value )
+	
+	
+	@classmethod
+	def get_catalog_path( cls, filepath, mtime=None ):
+		"""Returns the path of the compiled catalog of a language file.
+		
+		Catalogs are stored in `catalog_directory`, by default in
+		$XDG_CACHE_HOME (or ~/.cache), and named after the digest of the
+		absolute path of their file followed by its modification time.
+		
+		Parameters:
+			- (str) filepath: The path of the language file.
+			- (int) mtime: Its modification time in nanoseconds (default:
+			  None, read from the file).
+		"""
+		
+		directory = cls.catalog_directory
+		
+		if directory == None:
+			directory = os.environ.get( "XDG_CACHE_HOME", os.path.expanduser( "~" ) + os.sep + ".cache" ) + os.sep + "beer" + os.sep + "i18n"
+		
+		if mtime == None:
+			mtime = os.stat( filepath ).st_mtime_ns
+		
+		return directory + os.sep + "%s-%d%s" % ( hashlib.sha1( os.path.abspath( filepath ).encode( "utf-8" ) ).hexdigest(), mtime, cls.catalog_extension )
+	
+	
+	@classmethod
+	def load_sections( cls, filepath ):
+		"""Returns the section names of a language file.
+		
+		The names are stored in the header of the compiled catalog, which is
+		read without the texts. If the catalog is outdated, the section
+		headers of the INI file are read.
+		
+		Return value:
+			- list -- the section names.
+		"""
+		
+		sections = None
+		mtime = os.stat( filepath ).st_mtime_ns
+		catalog_path = cls.get_catalog_path( filepath, mtime=mtime )
+		
+		try:
+			with open( catalog_path, "rb" ) as f:
+				version, python_version, catalog_mtime, catalog_sections = marshal.load( f )
+			
+			if version == cls.catalog_version and python_version == sys.hexversion and catalog_mtime == mtime:
+				sections = catalog_sections
+		
+		except FileNotFoundError:
+			pass
+		
+		except (OSError, EOFError, ValueError, TypeError):
+			log.debug( "Ignoring invalid language catalog \"%s\"." % catalog_path )
+		
+		if sections == None:
+			sections = []
+			
+			with open( filepath, "r", encoding="utf-8" ) as f:
+				for line in f:
+					match = cls._section_regex.match( line )
+					
+					if match:
+						sections.append( match.group( 1 ) )
+		
+		return sections
+	
+	
+	@classmethod
+	def load_catalog( cls, filepath ):
+		"""Loads the compiled catalog of a language file.
+		
+		Return value:
+			- list -- the (section, texts, references) entries, None if there
+			  is no up-to-date catalog.
+		"""
+		
+		catalog = None
+		mtime = os.stat( filepath ).st_mtime_ns
+		catalog_path = cls.get_catalog_path( filepath, mtime=mtime )
+		
+		try:
+			with open( catalog_path, "rb" ) as f:
+				version, python_version, catalog_mtime, sections = marshal.load( f )
+				
+				if version == cls.catalog_version and python_version == sys.hexversion and catalog_mtime == mtime:
+					catalog = marshal.load( f )
+		
+		except FileNotFoundError:
+			pass
+		
+		except (OSError, EOFError, ValueError, TypeError):
+			log.debug( "Ignoring invalid language catalog \"%s\"." % catalog_path )
+		
+		return catalog
+	
+	
+	@classmethod
+	def compile( cls, filepath ):
+		"""Compiles a language file into a catalog.
+		
+		The INI file is parsed once and its texts are stored, in the user
+		cache (see `get_catalog_path`), into a binary file which is loaded
+		without `configparser`. The catalogs of the previous versions of the
+		file are removed, and none is written if the cache is not writable.
+		The file starts
+		with a header holding the section names, read by `register`, followed
+		by the texts. The texts containing references are listed, so they are
+		the only ones resolved at load time.
+		
+		Return value:
+			- list -- the (section, texts, references) entries, in the order of
+			  the file.
+		"""
+		
+		import configparser
+		
+		mtime = os.stat( filepath ).st_mtime_ns
+		config = configparser.ConfigParser()
+		config.read( filepath, encoding="utf-8" )
+		
+		catalog = []
+		
+		for section in config:
+			texts = { key: config[section][key] for key in config[section] }
+			references = [ key for key in texts if cls._reference_regex.search( texts[key] ) ]
+			
+			if len(texts):
+				catalog.append( ( section, texts, references ) )
+		
+		catalog_path = cls.get_catalog_path( filepath, mtime=mtime )
+		catalog_directory, catalog_name = os.path.split( catalog_path )
+		log.debug( "Compiling language catalog \"%s\"..." % catalog_path )
+		
+		try:
+			os.makedirs( catalog_directory, exist_ok=True )
+			
+			with open( catalog_path + ".tmp", "wb" ) as f:
+				marshal.dump( ( cls.catalog_version, sys.hexversion, mtime, [ entry[0] for entry in catalog ] ), f )
+				marshal.dump( catalog, f )
+			
+			os.replace( catalog_path + ".tmp", catalog_path )
+			
+			# Catalogs of the previous modification times of the file
+			prefix = catalog_name.rpartition( "-" )[0] + "-"
+			
+			for f in os.listdir( catalog_directory ):
+				if f.startswith( prefix ) and f.endswith( cls.catalog_extension ) and f != catalog_name:
+					os.remove( catalog_directory + os.sep + f )
+		
+		except OSError as e:
+			log.warn( "Unable to write language catalog \"%s\": %s" % ( catalog_path, e.strerror ), level=2 )
+		
+		return catalog
 	
 	
 	@classmethod
@@ -123,11 +399,18 @@ class Language():
 			- (str) key: The text key.
 		"""
 		
-		language = cls.getInstance()
+		table = cls.getInstance()._tables.get( class_ )
 		
-		if cls.get_path( class_, key ) in language._content:			
-			return language._content[cls.get_path( class_, key )]
-		else:
-			log.warn( "Text not found: %s" % cls.get_path( class_, key ), level=2 )
-			return ""
-
+		if table == None:
+			table = cls.get_table( class_ )
+		
+		value = table.get( key )
+		
+		if value == None:
+			value = table.get( key.lower() )
+			
+			if value == None:
+				log.warn( "Text not found: %s" % cls.get_path( class_, key ), level=2 )
+				value = ""
+		
+		return value
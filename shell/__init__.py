@@ -1,4 +1,4 @@
 # -*- coding: utf-8 -*-
-__all__ = [ "shell", "commands" ]
+__all__ = [ "shell", "commands", "server", "index", "trie" ]
 __version__ = "0.2.0"
 
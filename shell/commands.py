@@ -72,6 +72,28 @@ class Command():
 		return []
 		
 	
+	def completion_index( self, shell ):
+		"""Describes the command autocompletion for static completion indexes.
+		
+		Describes the command autocompletion as a `shell.index` node. Commands
+		overriding `autocomplete` must also override this method, otherwise
+		their completion is not indexed.
+		
+		Parameters:
+			- (shell.shell.Shell) shell: The invoker shell.
+		
+		Return value:
+			- dict -- the index node, None if the completion can not be indexed.
+		"""
+		
+		node = None
+		
+		if type( self ).autocomplete is Command.autocomplete:
+			node = { "type": "none" }
+		
+		return node
+		
+	
 	@classmethod
 	def parse_options_as_array( cls, args, silent=False ):
 		"""Parses options from arguments list to an ordered array.
@@ -190,6 +212,53 @@ class Command():
 				options["_"].append( arg )
 		
 		return options
+	
+	
+	@classmethod
+	def parse_sort_options( cls, shell, options, attributes, class_=None ):
+		"""Parses the "sort" and "limit" options of a listing command.
+		
+		The sort option is an attribute name, optionally followed by "asc" or
+		"desc". Only the listed attributes are accepted: private names and
+		methods of the listed class are rejected too. The options are
+		checked without listed objects, so before loading them. Errors are
+		reported to the shell with the "unknown_sort_attribute" and
+		"not_a_limit" texts of the command class.
+		
+		Parameters:
+			- (shell.shell.Shell) shell: The invoker shell.
+			- (dict) options: The parsed options.
+			- (list) attributes: The sortable attributes names.
+			- (class) class_: The class of the listed objects (default: None).
+		
+		Return value:
+			- tuple -- (str, bool, int) the sort attribute (None if unsorted),
+			  the descending order and the limit (None if unlimited), None if
+			  the options are invalid.
+		"""
+		
+		sort = None
+		reverse = False
+		limit = None
+		
+		if options.get( "sort" ) and len(options["sort"]):
+			sort_elements = options["sort"].split()
+			sort = sort_elements[0].lower()
+			reverse = len(sort_elements) > 1 and sort_elements[1].lower() == "desc"
+			
+			if sort not in attributes or sort.startswith( "_" ) or (class_ != None and callable( getattr( class_, sort, None ) )):
+				shell.error( Language.get( cls, "unknown_sort_attribute" ) % sort )
+				return None
+		
+		if options.get( "limit" ) and len(options["limit"]):
+			if re.match( r"^[0-9]+$", options["limit"] ) and int( options["limit"] ) > 0:
+				limit = int( options["limit"] )
+			
+			else:
+				shell.error( Language.get( cls, "not_a_limit" ) )
+				return None
+		
+		return ( sort, reverse, limit )
 
 
 class Exit(Command):
@@ -216,23 +285,16 @@ class Help(Command):
 	
 		if len(args) > 1:
 			if args[1] in shell._commands:
-				command_name = args[1]
-				
-				# Avoid cyclic-dependencies
-				tested_names = []
-		
-				while isinstance( shell._commands[command_name], str ) and command_name not in tested_names:
-					tested_names.append( command_name )
-					command_name = shell._commands[command_name]
+				command = shell.get_command( args[1] )
 					
-				if isinstance( shell._commands[command_name], Command ):
-					if args[1] == command_name:
-						shell.print( Language.get( Help, "help_of_command" ) % command_name, lpad=1 )
+				if command != None:
+					if args[1] == command.name:
+						shell.print( Language.get( Help, "help_of_command" ) % command.name, lpad=1 )
 					else:
-						shell.print( Language.get( Help, "help_of_alias" ) % (args[1], command_name), lpad=1 )
+						shell.print( Language.get( Help, "help_of_alias" ) % (args[1], command.name), lpad=1 )
 					
 					shell.print( "" )
-					shell.print( shell._commands[command_name].long_description, lpad=2 )
+					shell.print( command.long_description, lpad=2 )
 					
 				else:
 					shell.error( Language.get( Help, "unknown_command" ) % args[1] )
@@ -251,10 +313,10 @@ class Help(Command):
 	
 			command_name_length += 5
 		
-			for command_name in shell._commands:
-				command = shell._commands[command_name]
+			for command_name in list( shell._commands ):
+				command = shell.get_command( command_name ) if not isinstance( shell._commands[command_name], str ) else None
 			
-				if isinstance( command, Command ):
+				if command != None:
 					lines = shell.print( command.description, left_text=" %s" % command_name, lpad=command_name_length )
 			
 					# Print aliases' list if any
@@ -284,3 +346,6 @@ class Help(Command):
 		
 		return choices
 		
+		
+	def completion_index( self, shell ):
+		return { "type": "help", "choices": [ command_name for command_name in shell._commands if command_name != "help" ] }
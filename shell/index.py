@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import marshal
+from .trie import Trie
+
+# Static completion indexes.
+#
+# A completion index is a tree of nodes describing the autocompletion of a
+# shell and of its commands, so a command line can be completed without
+# loading the shell. Each node is a dict with a "type" key:
+#	- "none": the command has no autocompletion.
+#	- "shell": a sub-shell; "choices" lists the proposed command names and
+#	  "commands" maps every command name to its node (None if the command
+#	  can not be indexed).
+#	- "help": the `help` command; "choices" lists the command names.
+#	- "options": options of `shell.commands.Command`; "options" lists the
+#	  option names.
+#	- "names": the rest of the line is a name, "trie" is the root of the
+#	  `shell.trie.Trie` of the names.
+#	- "units": a value and its unit, "pattern" is the unit parsing
+#	  expression, "units" is the root of the trie of the units and
+#	  "conversions" maps each unit to the trie of its conversion units.
+
+INDEX_VERSION = 2
+
+OPTION_REGEX = re.compile( r"^-(?:-?([a-zA-Z0-9][a-zA-Z0-9_-]*)?)$" )
+NEW_OPTION_REGEX = re.compile( r"^-(?:-([a-zA-Z0-9][a-zA-Z0-9_-]*)?)?$" )
+NUMBER_REGEX = re.compile( r"^[+-]?[0-9]+(?:[\.,][0-9]+)?$" )
+
+def build( shell, path, data_paths=None ):
+	"""Builds the completion index of a shell and writes it.
+	
+	The index keeps the modification times of the loaded modules of the
+	application, of the data files and of their directories: it is
+	invalidated as soon as the code or the data changes.
+	
+	Parameters:
+		- (shell.shell.Shell) shell: The shell to index.
+		- (str) path: The index file path.
+		- (list) data_paths: The data files used by the autocompletion
+		  (default: None).
+	
+	Return value:
+		- dict -- the index.
+	"""
+	
+	root = os.path.dirname( os.path.realpath( os.path.abspath( sys.argv[0] ) ) )
+	sources = []
+	
+	if data_paths == None:
+		data_paths = []
+	
+	for module in list( sys.modules.values() ):
+		filepath = getattr( module, "__file__", None )
+		
+		if filepath != None and os.path.realpath( filepath ).startswith( root + os.sep ):
+			sources.append( os.path.realpath( filepath ) )
+	
+	sources += data_paths
+	sources += list( dict.fromkeys( os.path.dirname( filepath ) for filepath in data_paths ) )
+	
+	index = {
+		"sources": { filepath: os.stat( filepath ).st_mtime_ns for filepath in sources if os.path.exists( filepath ) },
+		"root": shell.completion_index()
+	}
+	
+	try:
+		os.makedirs( os.path.dirname( path ), exist_ok=True )
+		
+		with open( path + ".tmp", "wb" ) as f:
+			f.write( marshal.dumps( ( INDEX_VERSION, sys.hexversion, index ) ) )
+		
+		os.replace( path + ".tmp", path )
+	
+	except OSError:
+		pass
+	
+	return index
+
+
+def load( path ):
+	"""Loads a completion index if it is up to date.
+	
+	Return value:
+		- dict -- the index, None if it is missing or outdated.
+	"""
+	
+	index = None
+	
+	try:
+		with open( path, "rb" ) as f:
+			version, python_version, content = marshal.loads( f.read() )
+		
+		if version == INDEX_VERSION and python_version == sys.hexversion:
+			index = content
+			
+			for filepath in content["sources"]:
+				if os.stat( filepath ).st_mtime_ns != content["sources"][filepath]:
+					index = None
+					break
+	
+	except (OSError, EOFError, ValueError, TypeError, KeyError):
+		index = None
+	
+	return index
+
+
+def get_index_path( name ):
+	"""Returns the per-user path of a completion index.
+	
+	The index is stored in $XDG_CACHE_HOME, or in ~/.cache.
+	"""
+	
+	directory = os.environ.get( "XDG_CACHE_HOME", os.path.expanduser( "~" ) + os.sep + ".cache" )
+	
+	return directory + os.sep + name + os.sep + "completion.index"
+
+
+def parse_line( line ):
+	"""Parses a command line as `shell.shell.Shell.parse_line` keeping trailing spaces."""
+	
+	args = []
+	
+	for match in re.findall( r'"([^"]*)"|([^\s]+)', line ):
+		args.append( match[0] if len( match[0] ) else match[1] )
+	
+	if re.search( r"[^\s]+\s+$", line ):
+		args.append( "" )
+	
+	return args
+
+
+def complete( index, line ):
+	"""Gets the autocompletion choices of a command line from an index.
+	
+	Return value:
+		- list -- the choices, None if the index can not answer.
+	"""
+	
+	return complete_node( index["root"], [ "" ] + parse_line( line ) )
+
+
+def complete_node( node, args ):
+	"""Gets the autocompletion choices of a node.
+	
+	Parameters:
+		- (dict) node: The index node.
+		- (list) args: The arguments, starting with the command name.
+	
+	Return value:
+		- list -- the choices, None if the node can not answer.
+	"""
+	
+	choices = []
+	
+	if node == None:
+		choices = None
+	
+	elif node["type"] == "shell":
+		args = args[1:]
+		
+		if len(args) == 1:
+			choices = [ command_name for command_name in node["choices"] if command_name[:len(args[0])] == args[0] ]
+		
+		elif len(args) > 1 and args[0] in node["commands"]:
+			choices = complete_node( node["commands"][args[0]], args )
+	
+	elif node["type"] == "help":
+		if len(args) == 2:
+			choices = [ command_name for command_name in node["choices"] if command_name[:len(args[1])] == args[1] ]
+	
+	elif node["type"] == "options":
+		choices = complete_options( node, args )
+	
+	elif node["type"] == "names":
+		name = " ".join( args[1:] )
+		
+		if len(name):
+			choices = Trie( node["trie"] ).find( name )
+	
+	elif node["type"] == "units":
+		choices = complete_units( node, args )
+	
+	return choices
+
+
+def complete_options( node, args ):
+	"""Gets the autocompletion choices of an "options" node."""
+	
+	choices = []
+	defined_options = []
+	
+	for arg in args[:-1]:
+		match = OPTION_REGEX.match( arg )
+		
+		if match and match.group( 1 ) and match.group( 1 ).lower() in node["options"]:
+			defined_options.append( match.group( 1 ).lower() )
+	
+	match = OPTION_REGEX.match( args[-1] )
+	
+	# Option values and standalone arguments have no autocompletion, neither
+	# have fully typed options.
+	if not match or not ( match.group( 1 ) and match.group( 1 ).lower() in node["options"] ):
+		match = NEW_OPTION_REGEX.match( args[-1] )
+		
+		if match:
+			last_opt = match.group( 1 ) if match.group( 1 ) else ""
+			
+			for opt in node["options"]:
+				if opt not in defined_options and (len(last_opt) == 0 or last_opt == opt[:len(last_opt)]):
+					choices.append( "--%s" % opt )
+	
+	return choices
+
+
+def complete_units( node, args ):
+	"""Gets the autocompletion choices of a "units" node."""
+	
+	choices = []
+	unit_as_two_args = False
+	args = list( args )
+	
+	if len(args) > 1:
+		args.pop( 0 )
+		
+		s_value = args.pop( 0 )
+		elements = parse_unit( node, s_value )
+		
+		# Unit may be the next argument
+		if elements == None:
+			if len(args) > 0:
+				unit_as_two_args = True
+				s_value += args.pop( 0 )
+				elements = parse_unit( node, s_value )
+			
+			# No unit specified
+			elif NUMBER_REGEX.search( s_value ):
+				choices = Trie( node["units"] ).find( "" )
+		
+		if elements != None:
+			incomplete_unit = False
+			
+			if elements[1] in node["conversions"]:
+				if len(args) == 1 and args[0] == "in"[:len(args[0])]:
+					choices.append( "in" )
+				
+				elif len(args) > 1:
+					if args[0] == "in":
+						args.pop( 0 )
+						
+						if len(args) == 1:
+							choices = Trie( node["conversions"][elements[1]] ).find( args[0] )
+				
+				else:
+					incomplete_unit = True
+			
+			else:
+				incomplete_unit = True
+			
+			if incomplete_unit:
+				for u in Trie( node["units"] ).find( elements[1] ):
+					if unit_as_two_args:
+						choices.append( u )
+					else:
+						choices.append( "%s%s" % ( format_value( elements[0] ), u ) )
+	
+	return choices
+
+
+def parse_unit( node, text ):
+	"""Parses a value and its unit as `units.unit.Unit.parse`.
+	
+	Return value:
+		- tuple -- (float, str), None if the text is not an unit.
+	"""
+	
+	elements = None
+	match = re.match( node["pattern"], text )
+	
+	if match:
+		lsign = -1.0 if match.group( 1 ) == "-" else 1.0
+		elements = ( lsign * float( match.group( 2 ).replace( ",", "." ) ), match.group( 5 ) )
+	
+	return elements
+
+
+def format_value( value ):
+	"""Convert a float to a standardized string as `units.unit.Unit.format_value`."""
+	
+	return re.sub( r"\.?0+$", "", "%0.3f" % round( value, 3 ) )
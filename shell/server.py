@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+import os
+import stat
+import errno
+import socket
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+class CompletionServer():
+	"""Represents a long-lived autocompletion server.
+	
+	The server answers autocompletion requests over a Unix socket, so the
+	clients do not have to load a whole shell for each request. A request is
+	a command line terminated by a new line, the response is the list of
+	choices separated by new lines. The server exits after an idle timeout.
+	
+	A server holds a lock next to its socket while it runs: a server which
+	can not take it exits at once, and only the holder of the lock removes
+	a socket left by a dead server.
+	
+	Attributes:
+		- (callable) _autocomplete: Returns the choices of a command line.
+		- (str) _path: Path of the Unix socket, None if there is no safe one.
+		- (float) _timeout: Idle timeout in seconds.
+		- (socket.socket) _socket: The bound socket, None until `bind`.
+		- (int) _lock: The lock file descriptor, None until `bind`.
+	"""
+	
+	def __init__( self, autocomplete, path, timeout=600 ):
+		"""Initialize a completion server.
+		
+		Parameters:
+			- (callable) autocomplete: Returns the choices of a command line,
+			  None if it is given to `serve`.
+			- (str) path: Path of the Unix socket (see `get_socket_path`).
+			- (float) timeout: Idle timeout in seconds (default: 600).
+		"""
+		
+		self._autocomplete = autocomplete
+		self._path = path
+		self._timeout = timeout
+		self._socket = None
+		self._lock = None
+	
+	
+	def bind( self ):
+		"""Takes the server lock and binds the socket.
+		
+		The lock is taken without waiting, so servers started concurrently do
+		not load anything once one of them is running. The holder of the lock
+		is the only server, so an existing socket is a stale one.
+		
+		Return value:
+			- bool -- False if another server is running or the socket could
+			  not be bound, True otherwise.
+		"""
+		
+		if self._socket == None and self._path != None:
+			try:
+				self._lock = os.open( self._path + ".lock", os.O_RDWR | os.O_CREAT | getattr( os, "O_NOFOLLOW", 0 ), 0o600 )
+				
+				if fcntl != None:
+					fcntl.flock( self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB )
+			
+			except OSError:
+				self.close()
+				return False
+			
+			server = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+			old_umask = os.umask( 0o177 )
+			
+			try:
+				try:
+					server.bind( self._path )
+				
+				except OSError as e:
+					# Remove a socket left by a dead server
+					if e.errno != errno.EADDRINUSE or fcntl == None:
+						raise
+					
+					os.unlink( self._path )
+					server.bind( self._path )
+				
+				server.listen( 16 )
+				self._socket = server
+			
+			except OSError:
+				server.close()
+				self.close()
+			
+			finally:
+				os.umask( old_umask )
+		
+		return self._socket != None
+	
+	
+	def close( self ):
+		"""Closes the socket, removes it and releases the lock."""
+		
+		if self._socket != None:
+			self._socket.close()
+			self._socket = None
+			
+			if os.path.exists( self._path ):
+				os.unlink( self._path )
+		
+		if self._lock != None:
+			os.close( self._lock )
+			self._lock = None
+	
+	
+	def serve( self, autocomplete=None ):
+		"""Serves autocompletion requests until the idle timeout expires.
+		
+		The socket is bound first if `bind` was not called.
+		
+		Parameters:
+			- (callable) autocomplete: Returns the choices of a command line
+			  (default: None, the one given at initialization).
+		
+		Return value:
+			- bool -- False if the socket could not be bound (another server
+			  is probably running), True otherwise.
+		"""
+		
+		if autocomplete != None:
+			self._autocomplete = autocomplete
+		
+		if not self.bind():
+			return False
+		
+		server = self._socket
+		server.settimeout( self._timeout )
+		
+		try:
+			while True:
+				try:
+					connection, address = server.accept()
+				
+				except socket.timeout:
+					break
+				
+				with connection:
+					connection.settimeout( 1.0 )
+					
+					try:
+						self.handle( connection )
+					
+					except OSError:
+						continue
+		
+		finally:
+			self.close()
+		
+		return True
+	
+	
+	def handle( self, connection ):
+		"""Answers one autocompletion request."""
+		
+		data = b""
+		
+		while not data.endswith( b"\n" ):
+			chunk = connection.recv( 4096 )
+			
+			if not chunk:
+				break
+			
+			data += chunk
+		
+		line = data.decode( "utf-8", "replace" ).rstrip( "\n" )
+		choices = self._autocomplete( line ) if len(line) else []
+		
+		connection.sendall( ( "\n".join( choices ) + "\n" ).encode( "utf-8" ) )
+
+
+def get_socket_path( name ):
+	"""Returns the per-user socket path of a completion server.
+	
+	The socket is created in $XDG_RUNTIME_DIR, or in a private directory of
+	$TMPDIR or /tmp, which is created if necessary. The bash completion
+	script (install/etc/bash_completion.d/beer) uses the same path.
+	
+	Return value:
+		- str -- the path, None if there is no private directory for it.
+	"""
+	
+	uid = os.getuid() if hasattr( os, "getuid" ) else 0
+	directory = os.environ.get( "XDG_RUNTIME_DIR" )
+	
+	# Empty variables are unset ones, as for the bash completion script
+	if directory == None or len(directory) == 0:
+		directory = ( os.environ.get( "TMPDIR" ) or "/tmp" ) + os.sep + "%s-completion-%d" % ( name, uid )
+		
+		try:
+			os.mkdir( directory, 0o700 )
+		
+		except OSError:
+			pass
+	
+	return directory + os.sep + "%s-completion.sock" % name if is_private( directory, directory=True ) else None
+
+
+def is_private( path, directory=False ):
+	"""Checks that a path belongs to the current user.
+	
+	Parameters:
+		- (str) path: The path, which is not followed if it is a link.
+		- (bool) directory: The path is a directory which must not be
+		  accessible to other users, otherwise a socket (default: False).
+	
+	Return value:
+		- bool -- True if the path exists, is of the expected type and
+		  belongs to the current user.
+	"""
+	
+	private = False
+	
+	try:
+		status = os.lstat( path )
+		
+		if not hasattr( os, "getuid" ) or status.st_uid == os.getuid():
+			if directory:
+				private = stat.S_ISDIR( status.st_mode ) and status.st_mode & 0o077 == 0
+			else:
+				private = stat.S_ISSOCK( status.st_mode )
+	
+	except OSError:
+		private = False
+	
+	return private
+
+
+def request( path, line, timeout=1.0 ):
+	"""Sends an autocompletion request to a running server.
+	
+	Parameters:
+		- (str) path: Path of the Unix socket, it is only used if it belongs
+		  to the current user.
+		- (str) line: The command line to complete.
+		- (float) timeout: Timeout of the request in seconds (default: 1.0).
+	
+	Return value:
+		- list -- the choices, None if no server answered.
+	"""
+	
+	choices = None
+	
+	if hasattr( socket, "AF_UNIX" ) and path != None and is_private( path ):
+		client = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+		client.settimeout( timeout )
+		
+		try:
+			client.connect( path )
+			client.sendall( ( line + "\n" ).encode( "utf-8" ) )
+			
+			data = b""
+			chunk = client.recv( 4096 )
+			
+			while chunk:
+				data += chunk
+				chunk = client.recv( 4096 )
+			
+			choices = [ choice for choice in data.decode( "utf-8", "replace" ).split( "\n" ) if len(choice) ]
+		
+		except OSError:
+			choices = None
+		
+		finally:
+			client.close()
+	
+	return choices
+
+
+def spawn( args ):
+	"""Starts a completion server in a detached background process.
+	
+	Parameters:
+		- (list) args: The command starting the server.
+	"""
+	
+	if hasattr( socket, "AF_UNIX" ):
+		import subprocess
+		
+		subprocess.Popen( args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True, close_fds=True )
@@ -3,6 +3,7 @@
 import sys
 import re
 import os
+import importlib
 
 try:
 	import termios
@@ -44,14 +45,17 @@ class Shell():
 		- (int) _width: Width of the shell (default: 79).
 		- (bool) _running: Status of the shell session.
 		- (int) _verbosity: Level of verbosity (default: 1).
-		- (dict) _commands: Dictionary of registered commands.
+		- (dict) _commands: Dictionary of registered commands. Values are
+		  commands, names of the aliased commands, or (module, class name)
+		  tuples of the commands registered with `register_command` which
+		  are not built yet.
 	"""
 
 	def __init__( self, title="", verbosity=1 ):
 		"""Initialize a new shell."""
 
 		# Load localized strings
-		Language.load( "shell.ini" )
+		Language.register( "shell.ini" )
 		
 		self._title = title
 		self._width = 79
@@ -198,6 +202,32 @@ class Shell():
 		return choices
 		
 		
+	def completion_index( self, choices=None ):
+		"""Describes the shell autocompletion for static completion indexes.
+		
+		Parameters:
+			- (list) choices: The proposed command names (default: None, all).
+		
+		Returns:
+			- dict -- the `shell.index` node of the shell.
+		"""
+		
+		commands = {}
+		
+		# Building a command may register aliases which were not given to
+		# `register_command`, so all the commands are built first
+		for command_name in list( self._commands ):
+			self.get_command( command_name )
+		
+		for command_name in list( self._commands ):
+			command = self.get_command( command_name )
+			
+			if command != None:
+				commands[command_name] = command.completion_index( self )
+		
+		return { "type": "shell", "choices": list( self._commands ) if choices == None else choices, "commands": commands }
+		
+		
 	def parse_line( self, line, keep_trailing_space=False ):
 		"""Parses the specified command line into an arguments array.
 		
@@ -569,7 +599,63 @@ class Shell():
 			self.error( Language.get( Shell, "command_not_loaded" ) )
 	
 	
+	def register_command( self, name, module, class_name="Command", aliases=None ):
+		"""Registers a command which is built on first use.
+		
+		The module of the command is only imported, and the command built,
+		when it is got with `get_command` (by `execute`, `autocomplete` or
+		the help), so the shell startup does not depend on the number of
+		commands. The aliases of the command must be given here to be known
+		before it is built.
+		
+		Parameters:
+			- (str) name: The name of the command.
+			- (str) module: The full name of the module of the command.
+			- (str) class_name: The name of the command class (default: "Command").
+			- (list) aliases: The aliases of the command (default: None).
+		"""
+		
+		self._commands[name] = ( module, class_name )
+		
+		for alias in aliases if aliases != None else []:
+			if alias not in self._commands:
+				self._commands[alias] = name
+	
+	
+	def build_command( self, command_name ):
+		"""Builds a registered command.
+		
+		Parameters:
+			- (str) command_name: The name of the command.
+		
+		Return value:
+			- shell.commands.Command -- the command.
+		"""
+		
+		module, class_name = self._commands[command_name]
+		command = getattr( importlib.import_module( module ), class_name )()
+		
+		self.log( Language.get( Shell, "loading_command" ) % command.name, level=3 )
+		self._commands[command_name] = command
+		
+		for alias in command.aliases:
+			if alias not in self._commands:
+				self.log( Language.get( Shell, "adding_alias" ) % ( alias, command.name ), level=3 )
+				self._commands[alias] = command.name
+		
+		return command
+	
+	
 	def get_command( self, command_name ):
+		"""Returns a command, building it if it is only registered.
+		
+		Parameters:
+			- (str) command_name: The name or an alias of the command.
+		
+		Return value:
+			- shell.commands.Command -- the command, None if it does not exist.
+		"""
+		
 		command = None
 	
 		if command_name in self._commands:
@@ -579,6 +665,9 @@ class Shell():
 			while isinstance( self._commands[command_name], str ) and command_name not in tested_names:
 				tested_names.append( command_name )
 				command_name = self._commands[command_name]
+			
+			if isinstance( self._commands[command_name], tuple ):
+				self.build_command( command_name )
 	
 			if isinstance( self._commands[command_name], commands.Command ):
 				command = self._commands[command_name]
@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import socket
+import shutil
+import marshal
+import tempfile
+import threading
+import subprocess
+import unittest
+import environment
+
+from shell import trie
+from shell import server
+from shell import shell
+from shell import commands
+
+class Aliased(commands.Command):
+
+	def __init__( self ):
+		commands.Command.__init__( self, "aliased" )
+		self.aliases = [ "al", "other" ]
+	
+	
+	def run( self, shell, args ):
+		return 0
+
+
+class TestTrie(unittest.TestCase):
+
+	def test_find( self ):
+		
+		names = trie.Trie()
+		
+		for key, value in [ ( "Cascade", "Cascade" ), ( "Centennial", "Centennial" ), ( "CTZ", "Columbus" ), ( "Columbus", "Columbus" ), ( "Tomahawk", "Columbus" ) ]:
+			names.add( key, value )
+		
+		# Prefixes, in insertion order
+		self.assertEqual( names.find( "c" ), [ "Cascade", "Centennial", "Columbus" ] )
+		self.assertEqual( names.find( "ce" ), [ "Centennial" ] )
+		self.assertEqual( names.find( "Centennial" ), [ "Centennial" ] )
+		self.assertEqual( names.find( "" ), [ "Cascade", "Centennial", "Columbus" ] )
+		self.assertEqual( names.find( "Centennials" ), [] )
+		self.assertEqual( names.find( "x" ), [] )
+		
+		# Keys and prefixes are case insensitive, values keep their case
+		self.assertEqual( names.find( "CAS" ), [ "Cascade" ] )
+		self.assertEqual( names.find( "ctz" ), [ "Columbus" ] )
+		self.assertEqual( names.find( "toMA" ), [ "Columbus" ] )
+		
+		# Found values are copies
+		names.find( "c" ).append( "Galena" )
+		self.assertEqual( names.find( "c" ), [ "Cascade", "Centennial", "Columbus" ] )
+		
+		# Trees can be stored
+		self.assertEqual( trie.Trie( marshal.loads( marshal.dumps( names.root ) ) ).find( "co" ), [ "Columbus" ] )
+
+
+class TestShell(unittest.TestCase):
+
+	def test_register_command( self ):
+		
+		lazy_shell = shell.Shell()
+		lazy_shell.register_command( "aliased", __name__, "Aliased", aliases=[ "al" ] )
+		
+		# Registered aliases are known before the command is built
+		self.assertEqual( lazy_shell._commands["al"], "aliased" )
+		self.assertIsInstance( lazy_shell._commands["aliased"], tuple )
+		self.assertEqual( lazy_shell.autocomplete( "a" ), [ "aliased", "al" ] )
+		
+		# Aliases added when building commands are indexed too
+		index = lazy_shell.completion_index()
+		self.assertIsInstance( lazy_shell._commands["aliased"], Aliased )
+		self.assertEqual( sorted( index["commands"] ), [ "al", "aliased", "exit", "help", "other", "quit" ] )
+		self.assertEqual( sorted( index["choices"] ), [ "al", "aliased", "exit", "help", "other", "quit" ] )
+		self.assertIs( lazy_shell.get_command( "other" ), lazy_shell.get_command( "al" ) )
+
+
+@unittest.skipUnless( hasattr( socket, "AF_UNIX" ) and hasattr( os, "getuid" ), "Unix sockets are unavailable" )
+class TestServer(unittest.TestCase):
+
+	def setUp( self ):
+		
+		self._directory = tempfile.TemporaryDirectory()
+		self._environ = dict( os.environ )
+		os.environ.pop( "XDG_RUNTIME_DIR", None )
+		os.environ["TMPDIR"] = self._directory.name
+	
+	
+	def tearDown( self ):
+		
+		os.environ.clear()
+		os.environ.update( self._environ )
+		self._directory.cleanup()
+	
+	
+	def test_socket_path( self ):
+		
+		# Sockets are created in a private directory
+		path = server.get_socket_path( "test" )
+		self.assertEqual( os.path.dirname( path ), self._directory.name + os.sep + "test-completion-%d" % os.getuid() )
+		self.assertEqual( os.stat( os.path.dirname( path ) ).st_mode & 0o777, 0o700 )
+		
+		# A directory readable by other users is not used
+		os.mkdir( self._directory.name + os.sep + "shared-completion-%d" % os.getuid(), 0o755 )
+		os.chmod( self._directory.name + os.sep + "shared-completion-%d" % os.getuid(), 0o755 )
+		self.assertEqual( server.get_socket_path( "shared" ), None )
+		self.assertEqual( server.request( None, "hop" ), None )
+		
+		# Files which are not sockets are not connected to
+		with open( path, "w" ) as f:
+			f.write( "" )
+		
+		self.assertEqual( server.request( path, "hop" ), None )
+	
+	
+	def test_serve( self ):
+		
+		path = server.get_socket_path( "test" )
+		
+		# A socket left by a dead server is replaced
+		stale = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+		stale.bind( path )
+		stale.close()
+		
+		completion_server = server.CompletionServer( None, path, timeout=0.5 )
+		self.assertTrue( completion_server.bind() )
+		
+		# Only one server runs, the running one keeps its socket
+		duplicate = server.CompletionServer( None, path, timeout=0.5 )
+		self.assertFalse( duplicate.bind() )
+		self.assertFalse( duplicate.serve( lambda line: [] ) )
+		self.assertTrue( os.path.exists( path ) )
+		
+		thread = threading.Thread( target=completion_server.serve, args=( lambda line: [ line.upper(), "done" ], ) )
+		thread.start()
+		
+		try:
+			self.assertEqual( server.request( path, "hop li", timeout=5 ), [ "HOP LI", "done" ] )
+		
+		finally:
+			# The server exits after its idle timeout
+			thread.join()
+		
+		self.assertFalse( os.path.exists( path ) )
+	
+	
+	@unittest.skipUnless( shutil.which( "bash" ), "bash is unavailable" )
+	def test_bash_socket_path( self ):
+		
+		script = environment.basepath + os.sep + "install" + os.sep + "etc" + os.sep + "bash_completion.d" + os.sep + "beer"
+		
+		# The bash completion script connects to the socket of the server
+		for runtime_directory in [ None, "", self._directory.name ]:
+			if runtime_directory == None:
+				os.environ.pop( "XDG_RUNTIME_DIR", None )
+			else:
+				os.environ["XDG_RUNTIME_DIR"] = runtime_directory
+			
+			path = subprocess.run( [ "bash", "-c", "source \"$0\" && _beer_socket", script ], stdout=subprocess.PIPE, check=True ).stdout.decode( "utf-8" ).rstrip( "\n" )
+			self.assertEqual( path, server.get_socket_path( "beer" ) )
+
+if __name__ == "__main__":
+	unittest.main()
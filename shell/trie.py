@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+class Trie():
+	"""Represents a case-insensitive prefix tree for autocompletion.
+	
+	Keys are lowercased and inserted character by character. Each node is a
+	dict mapping the next character to its child node, its "" key lists the
+	values of all the keys starting with the node prefix, in insertion order.
+	Finding the values of a prefix costs its length plus the number of
+	results, whatever the number of keys. Nodes only contain dicts, lists and
+	strings so a tree can be stored with `marshal`.
+	
+	Attributes:
+		- (dict) root: The root node.
+	"""
+	
+	def __init__( self, root=None ):
+		"""Initialize a trie.
+		
+		Parameters:
+			- (dict) root: The root node of an existing tree (default: None, empty).
+		"""
+		
+		self.root = root if root != None else { "": [] }
+	
+	
+	def add( self, key, value ):
+		"""Inserts a key.
+		
+		The keys of a value should be inserted consecutively: a value is only
+		listed once per node if it is not interleaved with other values.
+		
+		Parameters:
+			- (str) key: The key.
+			- (str) value: The value returned for the prefixes of the key.
+		"""
+		
+		nodes = [ self.root ]
+		
+		for character in key.lower():
+			nodes.append( nodes[-1].setdefault( character, { "": [] } ) )
+		
+		for node in nodes:
+			if len(node[""]) == 0 or node[""][-1] != value:
+				node[""].append( value )
+	
+	
+	def find( self, prefix ):
+		"""Returns the values of the keys starting with a prefix.
+		
+		Parameters:
+			- (str) prefix: The prefix, case insensitive.
+		
+		Return value:
+			- list -- the values, in insertion order.
+		"""
+		
+		node = self.root
+		
+		for character in prefix.lower():
+			node = node.get( character )
+			
+			if node == None:
+				break
+		
+		return list( node[""] ) if node != None else []
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+import environment
+
+from language import Language
+
+class Texts():
+	pass
+
+
+class Names():
+	pass
+
+
+class Late():
+	pass
+
+
+class TestLanguage(unittest.TestCase):
+
+	def setUp( self ):
+		
+		self._directory = tempfile.TemporaryDirectory()
+		self._instance = Language._instance
+		
+		os.mkdir( self._directory.name + os.sep + "en" )
+		self.write( "texts.ini", "[%s.Texts]\nhello = Hello\nreference = [[%s.Names.name]] world\n" % ( __name__, __name__ ) )
+		self.write( "names.ini", "[%s.Names]\nname = Big\n" % __name__ )
+		self.write( "late.ini", "[%s.Late]\ntext = Late text\n" % __name__ )
+		
+		Language._instance = None
+		Language.catalog_directory = self._directory.name + os.sep + "cache"
+		Language.initialize( lang="en", path=self._directory.name )
+	
+	
+	def tearDown( self ):
+		
+		Language._instance = self._instance
+		Language.catalog_directory = None
+		self._directory.cleanup()
+	
+	
+	def write( self, filename, content ):
+		
+		with open( self._directory.name + os.sep + "en" + os.sep + filename, "w", encoding="utf-8" ) as f:
+			f.write( content )
+	
+	
+	def test_compile( self ):
+		
+		filepath = self._directory.name + os.sep + "en" + os.sep + "texts.ini"
+		
+		self.assertEqual( Language.load_catalog( filepath ), None )
+		
+		Language.load( "texts.ini" )
+		self.assertTrue( os.path.isfile( Language.get_catalog_path( filepath ) ) )
+		self.assertEqual( Language.load_catalog( filepath ), Language.compile( filepath ) )
+		self.assertEqual( Language.load_sections( filepath ), [ "%s.Texts" % __name__ ] )
+		
+		# Catalogs are written in the cache, not next to the language files
+		self.assertEqual( sorted( os.listdir( os.path.dirname( filepath ) ) ), [ "late.ini", "names.ini", "texts.ini" ] )
+		self.assertEqual( os.listdir( Language.catalog_directory ), [ os.path.basename( Language.get_catalog_path( filepath ) ) ] )
+		
+		# Catalogs of modified files are outdated, and replaced
+		mtime = os.stat( filepath ).st_mtime_ns + 1000000000
+		os.utime( filepath, ns=( mtime, mtime ) )
+		self.assertEqual( Language.load_catalog( filepath ), None )
+		
+		Language.compile( filepath )
+		self.assertEqual( os.listdir( Language.catalog_directory ), [ os.path.basename( Language.get_catalog_path( filepath ) ) ] )
+		self.assertNotEqual( Language.load_catalog( filepath ), None )
+		
+		# Without writable cache, files are still loaded
+		Language.catalog_directory = filepath + os.sep + "cache"
+		Language._instance = None
+		Language.initialize( lang="en", path=self._directory.name )
+		Language.load( "texts.ini" )
+		self.assertEqual( Language.get( Texts, "hello" ), "Hello" )
+		self.assertEqual( Language.load_catalog( filepath ), None )
+	
+	
+	def test_load( self ):
+		
+		Language.register( "names.ini" )
+		Language.load( "texts.ini" )
+		
+		# References are resolved at load time, loading their registered files
+		self.assertEqual( Language.get( Texts, "hello" ), "Hello" )
+		self.assertEqual( Language.get( Texts, "HELLO" ), "Hello" )
+		self.assertEqual( Language.get( Texts, "reference" ), "Big world" )
+		self.assertIn( "names.ini", Language.getInstance()._files )
+		
+		# Texts are loaded from the compiled catalog by the next instances
+		Language._instance = None
+		Language.initialize( lang="en", path=self._directory.name )
+		Language.register( "names.ini" )
+		Language.load( "texts.ini" )
+		self.assertEqual( Language.get( Texts, "reference" ), "Big world" )
+		
+		with self.assertRaises( FileNotFoundError ):
+			Language.load( "missing.ini" )
+	
+	
+	def test_register( self ):
+		
+		Language.register( "names.ini" )
+		self.assertNotIn( "names.ini", Language.getInstance()._files )
+		
+		# Registered files are loaded on first use
+		self.assertEqual( Language.get( Names, "name" ), "Big" )
+		self.assertIn( "names.ini", Language.getInstance()._files )
+		
+		# Files registered after a missing text are still loaded
+		self.assertEqual( Language.get( Late, "text" ), "" )
+		Language.register( "late.ini" )
+		self.assertEqual( Language.get( Late, "text" ), "Late text" )
+		
+		# So are files adding texts to a resolved class
+		self.write( "more.ini", "[%s.Names]\nother = Other\n" % __name__ )
+		Language.register( "more.ini" )
+		self.assertEqual( Language.get( Names, "other" ), "Other" )
+		self.assertEqual( Language.get( Names, "name" ), "Big" )
+
+if __name__ == "__main__":
+	unittest.main()
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-__all__ = [ "unit", "time", "color", "weight", "volume", "density", "extract", "pressure", "proportion", "bitterness", "temperature" ]
+__all__ = [ "unit", "time", "color", "weight", "volume", "density", "extract", "pressure", "proportion", "bitterness", "temperature", "ibu" ]
 
 from .unit import *
 from .time import *
@@ -15,7 +15,7 @@ from .temperature import *
 
 from language import Language
 
-Language.load( "units.ini" )
+Language.register( "units.ini" )
 
 def _load_units( cls ):
 	"""Recursively loads all subclasses of Unit into *.units class variables."""
@@ -35,5 +35,80 @@ def _load_units( cls ):
 			cls.units = { **cls.units, **unit_cls.units }
 
 
+def _chain( first, second ):
+	"""Returns the composition of two conversion functions."""
+	
+	if first == None:
+		return second
+	
+	return lambda v: second( first( v ) )
+
+
+def _compile_conversions():
+	"""Compiles the conversion graph of all loaded units.
+	
+	Each unit class is a node of the graph and each entry of its `conversions`
+	dict is an edge. The graph is walked breadth-first from every unit class
+	and all the reachable units (multiples included) are stored in the class
+	`_compiled_conversions` dict, associated to a single function converting a
+	value from the class default unit. Direct conversions take precedence over
+	longer paths.
+	"""
+	
+	for unit_cls in dict.fromkeys( Unit.units.values() ):
+		compiled = {}
+		
+		for multiple in unit_cls.multiples:
+			compiled[multiple] = lambda v, factor=unit_cls.multiples[multiple]: v / factor
+		
+		visited = [ unit_cls ]
+		queue = [ ( unit_cls, None ) ]
+		
+		while len(queue):
+			current_cls, to_current = queue.pop( 0 )
+			
+			for conversion_unit in current_cls.conversions:
+				conversion = _chain( to_current, current_cls.conversions[conversion_unit] )
+				
+				if conversion_unit in Unit.units:
+					target_cls = Unit.units[conversion_unit]
+					to_target = conversion
+					
+					if target_cls.multiples[conversion_unit] != 1:
+						to_target = _chain( conversion, lambda v, factor=target_cls.multiples[conversion_unit]: v * factor )
+					
+					for multiple in target_cls.multiples:
+						if multiple not in compiled:
+							if multiple == conversion_unit:
+								compiled[multiple] = conversion
+							else:
+								compiled[multiple] = _chain( to_target, lambda v, factor=target_cls.multiples[multiple]: v / factor )
+					
+					if target_cls not in visited:
+						visited.append( target_cls )
+						queue.append( ( target_cls, to_target ) )
+				
+				if conversion_unit not in compiled:
+					compiled[conversion_unit] = conversion
+		
+		unit_cls._compiled_conversions = compiled
+
+
+def _compile_decompositions():
+	"""Sorts the multiples of all loaded units for value decompositions.
+	
+	Multiples are sorted once from the largest to the smallest and their
+	factors are expressed in the smallest multiple.
+	"""
+	
+	for unit_cls in dict.fromkeys( Unit.units.values() ):
+		multiples = sorted( unit_cls.multiples.items(), key=lambda k: k[1], reverse=True )
+		smallest = multiples[-1][1]
+		
+		unit_cls._decomposition = tuple( ( multiple, factor / smallest ) for multiple, factor in multiples )
+
+
 # Recursively load all units
 _load_units( Unit )
+_compile_conversions()
+_compile_decompositions()
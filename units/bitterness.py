@@ -5,11 +5,13 @@ from .unit import *
 class Bitterness(Unit):
 	"""Bitterness unit class container."""
 
+	__slots__ = ()
 	units = {}
 	
 
 class AcidAlphaUnit(Bitterness):
 
+	__slots__ = ()
 	unit = "AAU"
 	multiples = { "AAU": 1 }
 	conversions = {}
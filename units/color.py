@@ -4,53 +4,178 @@ from .unit import *
 from language import Language
 
 class Color(Unit):
-	"""Color unit class container."""
-
+	"""Color unit class container.
+	
+	Names and RGB values of colors are read from lookup tables, precomputed
+	on first use every `rgb_step` SRM (see `build_tables`).
+	"""
+	
+	__slots__ = ()
 	units = {}
 	srm_names = [2,3,4,6,9,12,15,18,20,24,30,40]
 	
-	# Functions are Lagrange interpolations from a set of predefined colors
+	# Functions are Lagrange interpolations from a set of predefined colors,
+	# "fx" functions are not rounded
 	rgb_functions = {
 		"r": {
 			"max": 80,
-			"fx": lambda x: round( (-32477 * pow(x,6) / 1769040000000) + (10511 * pow(x,5) / 2268000000) - (31861909 * pow(x,4) / 70761600000) + (142540771 * pow(x,3) / 7076160000) - (36465581 * pow(x,2) / 117936000) - (57530597 * x / 8845200) + 255 )
+			"fx": lambda x: (-32477 * pow(x,6) / 1769040000000) + (10511 * pow(x,5) / 2268000000) - (31861909 * pow(x,4) / 70761600000) + (142540771 * pow(x,3) / 7076160000) - (36465581 * pow(x,2) / 117936000) - (57530597 * x / 8845200) + 255
 		},
 		"g": {
 			"max": 38,
-			"fx": lambda x: round( (-173081 * pow(x,5) / 70685214600) + (18673381 * pow(x,4) / 35342607300) - (3010761059 * pow(x,3) / 70685214600) + (58136754119 * pow(x,2) / 35342607300) - (15956116849 * x / 504894390) + 255 )
+			"fx": lambda x: (-173081 * pow(x,5) / 70685214600) + (18673381 * pow(x,4) / 35342607300) - (3010761059 * pow(x,3) / 70685214600) + (58136754119 * pow(x,2) / 35342607300) - (15956116849 * x / 504894390) + 255
 		},
 		"b": {
 			"max": 8.5,
-			"fx": lambda x: round( (-0.00847763 * pow(x,5)) + (0.262428 * pow(x,4)) - (3.44515 * pow(x,3)) + (25.7081 * pow(x,2)) - 116.517 * x + 255 )
+			"fx": lambda x: (-0.00847763 * pow(x,5)) + (0.262428 * pow(x,4)) - (3.44515 * pow(x,3)) + (25.7081 * pow(x,2)) - 116.517 * x + 255
 		}
 	}
 	
-	@property
-	def name( self ):
+	rgb_step = 0.1
+	_rgb_table = None
+	_name_table = None
 	
-		srm_value = self.get_value( unit="°SRM" )
-		closest_srm = Color.srm_names[0]
+	@classmethod
+	def build_tables( cls ):
+		"""Precomputes the SRM to RGB and SRM to name lookup tables.
+		
+		The RGB table holds the values of the interpolation functions every
+		`rgb_step` SRM, up to the largest channel maximum. The names table
+		holds the text key of the closest lower named color of each integer
+		SRM value, names thresholds being integers.
+		"""
 		
-		for value in Color.srm_names:
-			if srm_value >= value:
-				closest_srm = value
-			else:
-				break
+		maximum = max( Color.rgb_functions[channel]["max"] for channel in "rgb" )
 		
-		return Language.get( Color, "color_%d_SRM" % closest_srm )
+		Color._rgb_table = [ tuple( Color.rgb_functions[channel]["fx"]( i * Color.rgb_step ) for channel in "rgb" ) for i in range( int( round( maximum / Color.rgb_step ) ) + 1 ) ]
+		Color._name_table = []
 		
+		for srm in range( Color.srm_names[-1] + 1 ):
+			closest_srm = Color.srm_names[0]
+			
+			for value in Color.srm_names:
+				if srm >= value:
+					closest_srm = value
+				else:
+					break
+			
+			Color._name_table.append( "color_%d_SRM" % closest_srm )
 	
-	@property
-	def rgb( self ):
-		srm_value = self.get_value( unit="°SRM" )
+	
+	@classmethod
+	def get_name( cls, srm_value ):
+		"""Returns the name of a color from its SRM value, with a table lookup."""
 		
-		r = 0 if srm_value >= Color.rgb_functions["r"]["max"] else Color.rgb_functions["r"]["fx"]( srm_value )
-		g = 0 if srm_value >= Color.rgb_functions["g"]["max"] else Color.rgb_functions["g"]["fx"]( srm_value )
-		b = 0 if srm_value >= Color.rgb_functions["b"]["max"] else Color.rgb_functions["b"]["fx"]( srm_value )
+		if Color._name_table == None:
+			Color.build_tables()
 		
-		return (r, g, b)
-
-
+		index = min( max( int( srm_value ), 0 ), len(Color._name_table) - 1 )
+		
+		return Language.get( Color, Color._name_table[index] )
+	
+	
+	@classmethod
+	def get_rgb( cls, srm_value ):
+		"""Returns the RGB values of a color from its SRM value.
+		
+		The values are linearly interpolated between the two closest entries
+		of the precomputed table, so the rendering of a color costs the same
+		whatever its value.
+		
+		Return value:
+			- tuple -- (int, int, int) the red, green and blue values.
+		"""
+		
+		if Color._rgb_table == None:
+			Color.build_tables()
+		
+		rgb = [ 0, 0, 0 ]
+		position = max( srm_value, 0 ) / Color.rgb_step
+		index = int( position )
+		
+		if index < len(Color._rgb_table) - 1:
+			ratio = position - index
+			low = Color._rgb_table[index]
+			high = Color._rgb_table[index + 1]
+			
+			for channel in range( 3 ):
+				if srm_value < Color.rgb_functions["rgb"[channel]]["max"]:
+					rgb[channel] = round( low[channel] + (high[channel] - low[channel]) * ratio )
+		
+		return tuple( rgb )
+	
+	
+	@classmethod
+	def get_grain_lovibond( cls, value ):
+		"""Returns the color of a grain in °L.
+		
+		The unit conversions of colors are the ones of beer colors, through
+		the Morey equation, which do not apply to grains: grain colors are
+		converted linearly (SRM = 1.3546 * °L - 0.76, EBC = 1.97 * SRM).
+		
+		Parameters:
+			- (Color|float) value: The grain color, a unit or a float in °L.
+		
+		Return value:
+			- float -- the color, in °L.
+		"""
+		
+		if isinstance( value, EBC ):
+			value = (value.get_value() / 1.97 + 0.76) / 1.3546
+		
+		elif isinstance( value, SRM ):
+			value = (value.get_value() + 0.76) / 1.3546
+		
+		elif isinstance( value, Unit ):
+			value = value.get_value( unit="°L" )
+		
+		return value
+	
+	
+	@classmethod
+	def get_malt_color_units( cls, srm_value ):
+		"""Returns the malt color units of a beer color, with the Morey equation."""
+		
+		return pow( srm_value / 1.4922, 1 / 0.6859 )
+	
+	
+	@classmethod
+	def predict( cls, weights, colors, volume ):
+		"""Predicts the color of a wort with the Morey equation.
+		
+		Parameters:
+			- (sequence) weights: The grain weights, `Weight` units or floats in grams.
+			- (sequence) colors: The grain colors, `Color` units or floats in °L
+			  (see `get_grain_lovibond`).
+			- (Unit|float) volume: The wort volume, a `Volume` unit or liters.
+		
+		Return value:
+			- SRM -- the predicted color.
+		"""
+		
+		if len(weights) and isinstance( weights[0], Unit ):
+			pounds = [ w.get_value( unit="lb" ) for w in weights ]
+		else:
+			pounds = Unit.convert_array( weights, "g", "lb" )
+		
+		lovibonds = [ Color.get_grain_lovibond( c ) for c in colors ]
+		gallons = volume.get_value( unit="gal" ) if isinstance( volume, Unit ) else Unit.units["L"]( volume ).get_value( unit="gal" )
+		
+		malt_color_units = sum( float( pounds[i] ) * lovibonds[i] for i in range( len(lovibonds) ) ) / gallons
+		
+		return SRM( 1.4922 * pow( malt_color_units, 0.6859 ) )
+	
+	
+	@property
+	def name( self ):
+		return Color.get_name( self.get_value( unit="°SRM" ) )
+	
+	
+	@property
+	def rgb( self ):
+		return Color.get_rgb( self.get_value( unit="°SRM" ) )
+	
+	
 	@property
 	def hex( self ):
 		return "#%02x%02x%02x" % self.rgb
@@ -58,30 +183,33 @@ class Color(Unit):
 
 class EBC(Color):
 
+	__slots__ = ()
 	unit = "EBC"
 	multiples = { "EBC": 1 }
 	conversions = { "°L": lambda c: pow( ((c / 1.97) / 1.4922), 1/0.6859 ), "°SRM": lambda c: c / 1.97 }
-
+	
 	def __init__( self, value, unit=None ):
 		Unit.__init__( self, value, unit=unit )
 
 
 class Lovibond(Color):
 
+	__slots__ = ()
 	unit = "°L"
 	multiples = { "°L": 1 }
 	conversions = { "EBC": lambda c: (1.4922 * pow( c, 0.6859 )) * 1.97, "°SRM": lambda c: 1.4922 * pow( c, 0.6859 ) }
-
+	
 	def __init__( self, value, unit=None ):
 		Unit.__init__( self, value, unit=unit )
-		
-		
+
+
 class SRM(Color):
 
+	__slots__ = ()
 	unit = "°SRM"
 	multiples = { "°SRM": 1 }
 	conversions = { "EBC": lambda c: c * 1.97, "°L": lambda c: pow( (c / 1.4922), 1/0.6859 ) }
-
+	
 	def __init__( self, value, unit=None ):
 		Unit.__init__( self, value, unit=unit )
-		
+
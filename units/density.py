@@ -12,11 +12,13 @@ class Density(Unit):
 		- Brix: °B
 	"""
 
+	__slots__ = ()
 	units = {}
 	
 
 class SpecificGravity(Density):
 
+	__slots__ = ()
 	unit = "SG"
 	multiples = { "SG": 1 }
 	conversions = {
@@ -35,6 +37,7 @@ class SpecificGravity(Density):
 
 class Points(Density):
 
+	__slots__ = ()
 	unit = "points"
 	multiples = { "points": 1 }
 	conversions = {
@@ -49,6 +52,7 @@ class Points(Density):
 
 class Plato(Density):
 
+	__slots__ = ()
 	unit = "°P"
 	multiples = { "°P": 1 }
 	conversions = {
@@ -63,6 +67,7 @@ class Plato(Density):
 
 class Brix(Density):
 
+	__slots__ = ()
 	unit = "°B"
 	multiples = { "°B": 1 }
 	conversions = {
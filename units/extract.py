@@ -11,11 +11,13 @@ class Extract(Unit):
 		- Hot Water Extract (kg-degrees/L): HWE
 	"""
 
+	__slots__ = ()
 	units = {}
 	
 
 class PercentExtract(Extract):
 
+	__slots__ = ()
 	unit = "%Extract"
 	multiples = { "%Extract": 1 }
 	conversions = {
@@ -29,6 +31,7 @@ class PercentExtract(Extract):
 
 class PointsPoundGallon(Extract):
 
+	__slots__ = ()
 	unit = "ppg"
 	multiples = { "ppg": 1 }
 	conversions = {
@@ -42,6 +45,7 @@ class PointsPoundGallon(Extract):
 
 class HotWaterExtract(Extract):
 
+	__slots__ = ()
 	unit = "HWE"
 	multiples = { "HWE": 1 }
 	conversions = {
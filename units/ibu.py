@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import math
+import array
+
+try:
+	import numpy
+
+except ImportError:
+	numpy = None
+
+from .unit import *
+
+# Bitterness of hop schedules.
+#
+# A hop schedule is a set of additions given as parallel arrays: the hop
+# weights, their alpha acids and their boil times. The bitterness of all the
+# additions is computed in one call, as NumPy arrays when NumPy is available
+# or as `array.array` of doubles otherwise, so callers evaluating many
+# schedules (like recipe optimizers) do not build an object per addition.
+#
+# Arrays of raw floats are read in the default units: grams for weights,
+# percents for alpha acids and seconds for boil times. Sequences of `Unit`
+# objects are converted first.
+
+FORMULAS = [ "tinseth", "rager" ]
+BOUNDS = [ "min", "mid", "max" ]
+
+def to_array( values, unit_name ):
+	"""Converts values into an array of floats.
+	
+	Parameters:
+		- (sequence) values: The values, floats or `Unit` objects.
+		- (str) unit_name: The unit of the floats.
+	
+	Return value:
+		- (numpy.ndarray|array.array) -- the values.
+	"""
+	
+	if not isinstance( values, array.array ) and not ( numpy != None and isinstance( values, numpy.ndarray ) ):
+		values = [ v.get_value( unit=unit_name ) if isinstance( v, Unit ) else v for v in values ]
+	
+	return numpy.asarray( values, dtype=numpy.float64 ) if numpy != None else array.array( "d", values )
+
+
+def get_alpha_acids( alpha_acids, bound="mid" ):
+	"""Returns the alpha acids of hops, in percent.
+	
+	Parameters:
+		- (sequence) alpha_acids: The alpha acids, floats, units or ranges.
+		- (str) bound: The value of the ranges: "min", "mid" or "max" (default: "mid").
+	
+	Return value:
+		- (numpy.ndarray|array.array) -- the alpha acids.
+	"""
+	
+	if bound not in BOUNDS:
+		raise ValueError( "unknown bound \"%s\"" % bound )
+	
+	if not isinstance( alpha_acids, array.array ) and not ( numpy != None and isinstance( alpha_acids, numpy.ndarray ) ):
+		values = []
+		
+		for value in alpha_acids:
+			if isinstance( value, Range ) and bound != "mid":
+				value = value.get_min() if bound == "min" else value.get_max()
+			
+			values.append( value.get_value( unit="%" ) if isinstance( value, Unit ) else value )
+		
+		alpha_acids = values
+	
+	return to_array( alpha_acids, "%" )
+
+
+def get_utilizations( times, gravity, formula="tinseth" ):
+	"""Returns the alpha acids utilization of boil times.
+	
+	Parameters:
+		- (sequence) times: The boil times, in seconds or `Second` units.
+		- (float|SpecificGravity) gravity: The wort gravity.
+		- (str) formula: "tinseth" or "rager" (default: "tinseth").
+	
+	Return value:
+		- (numpy.ndarray|array.array) -- the utilizations, between 0 and 1.
+	"""
+	
+	seconds = to_array( times, "s" )
+	gravity = gravity.get_value( unit="SG" ) if isinstance( gravity, Unit ) else gravity
+	
+	if formula == "tinseth":
+		bigness_factor = 1.65 * pow( 0.000125, gravity - 1.0 )
+		
+		if numpy != None:
+			utilizations = bigness_factor * (1.0 - numpy.exp( -0.04 * seconds / 60.0 )) / 4.15
+		else:
+			utilizations = array.array( "d", [ bigness_factor * (1.0 - math.exp( -0.04 * t / 60.0 )) / 4.15 for t in seconds ] )
+	
+	elif formula == "rager":
+		# Rager adjusts the utilization of high gravity worts
+		gravity_adjustment = 1.0 + max( 0.0, (gravity - 1.050) / 0.2 )
+		
+		if numpy != None:
+			utilizations = (18.11 + 13.86 * numpy.tanh( (seconds / 60.0 - 31.32) / 18.27 )) / 100.0 / gravity_adjustment
+		else:
+			utilizations = array.array( "d", [ (18.11 + 13.86 * math.tanh( (t / 60.0 - 31.32) / 18.27 )) / 100.0 / gravity_adjustment for t in seconds ] )
+	
+	else:
+		raise ValueError( "unknown formula \"%s\"" % formula )
+	
+	return utilizations
+
+
+def compute( weights, alpha_acids, times, gravity, volume, formula="tinseth", bound="mid" ):
+	"""Computes the bitterness of each addition of a hop schedule.
+	
+	Parameters:
+		- (sequence) weights: The hop weights, in grams or `Weight` units.
+		- (sequence) alpha_acids: The alpha acids, in percent or units or ranges.
+		- (sequence) times: The boil times, in seconds or `Second` units.
+		- (float|SpecificGravity) gravity: The wort gravity.
+		- (float|Volume) volume: The post-boil volume, in liters or a unit.
+		- (str) formula: "tinseth" or "rager" (default: "tinseth").
+		- (str) bound: The value of the alpha acids ranges: "min", "mid"
+		  or "max" (default: "mid").
+	
+	Return value:
+		- (numpy.ndarray|array.array) -- the bitterness of each addition, in IBU.
+	"""
+	
+	weights = to_array( weights, "g" )
+	alpha_acids = get_alpha_acids( alpha_acids, bound=bound )
+	utilizations = get_utilizations( times, gravity, formula=formula )
+	
+	if len(weights) != len(alpha_acids) or len(weights) != len(utilizations):
+		raise ValueError( "hop schedule arrays differ in length" )
+	
+	liters = volume.get_value( unit="L" ) if isinstance( volume, Unit ) else volume
+	
+	# Alpha acids are in percent and weights in grams: mg/L = % / 100 * g * 1000 / L
+	factor = 10.0 / liters
+	
+	if numpy != None:
+		bitterness = utilizations * alpha_acids * weights * factor
+	else:
+		bitterness = array.array( "d", [ u * a * w * factor for u, a, w in zip( utilizations, alpha_acids, weights ) ] )
+	
+	return bitterness
+
+
+def total( weights, alpha_acids, times, gravity, volume, formula="tinseth", bound="mid" ):
+	"""Computes the bitterness of a hop schedule, in IBU (see `compute`)."""
+	
+	bitterness = compute( weights, alpha_acids, times, gravity, volume, formula=formula, bound=bound )
+	
+	return float( bitterness.sum() if numpy != None else sum( bitterness ) )
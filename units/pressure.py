@@ -13,11 +13,13 @@ class Pressure(Unit):
 		- PoundsPerSquareInchGauge: psig
 	"""
 
+	__slots__ = ()
 	units = {}
 	
 
 class Atmosphere(Pressure):
 
+	__slots__ = ()
 	unit = "atm"
 	multiples = { "atm": 1 }
 	conversions = { "bar": lambda a: a * 1.01325, "Pa": lambda a: a * 101325, "psia": lambda a: a * 14.69595, "psig": lambda a: PoundsPerSquareInchAbsolute.conversions["psig"]( Atmosphere.conversions["psia"]( a ) ) }
@@ -28,6 +30,7 @@ class Atmosphere(Pressure):
 
 class Bar(Pressure):
 
+	__slots__ = ()
 	unit = "bar"
 	multiples = { "bar": 1, "mbar": 0.001 }
 	conversions = { "atm": lambda b: b / 1.101325, "Pa": lambda b: b * 100000, "psia": lambda b: b * 14.50377, "psig": lambda b: PoundsPerSquareInchAbsolute.conversions["psig"]( Bar.conversions["psia"]( b ) ) }
@@ -38,6 +41,7 @@ class Bar(Pressure):
 		
 class Pascal(Pressure):
 
+	__slots__ = ()
 	unit = "Pa"
 	multiples = { "Pa": 1, "hPa": 100, "kPa": 1000 }
 	conversions = { "atm": lambda p: p / 101325, "bar": lambda p: p / 100000, "psia": lambda p: p * 0.0001450377, "psig": lambda p: PoundsPerSquareInchAbsolute.conversions["psig"]( Pascal.conversions["psia"]( p ) ) }
@@ -48,6 +52,7 @@ class Pascal(Pressure):
 
 class PoundsPerSquareInchAbsolute(Pressure):
 
+	__slots__ = ()
 	unit = "psia"
 	multiples = { "psia": 1, "psi": 1 }
 	conversions = { "atm": lambda p: p * 0.068046, "Pa": lambda p: p * 6894.8, "bar": lambda p: p * 0.068948, "psig": lambda p: p - 14.69595 }
@@ -58,6 +63,7 @@ class PoundsPerSquareInchAbsolute(Pressure):
 
 class PoundsPerSquareInchGauge(Pressure):
 
+	__slots__ = ()
 	unit = "psig"
 	multiples = { "psig": 1 }
 	conversions = {
@@ -4,6 +4,7 @@ from .unit import *
 
 class Proportion(Unit):
 	
+	__slots__ = ()
 	units = {}
 	
 	@property
@@ -14,6 +15,7 @@ class Proportion(Unit):
 class Percentage(Proportion):
 	"""Percentage."""
 
+	__slots__ = ()
 	unit = "%"
 	multiples = { "%": 1 }
 	conversions = {}
@@ -11,11 +11,13 @@ class Temperature(Unit):
 		- Kelvin: K
 	"""
 
+	__slots__ = ()
 	units = {}
 	
 
 class Celsius(Temperature):
 
+	__slots__ = ()
 	unit = "°C"
 	multiples = { "°C": 1 }
 	conversions = { "°F": lambda c: (c * 9/5) + 32, "K": lambda c: c + 273.15 }
@@ -26,6 +28,7 @@ class Celsius(Temperature):
 
 class Fahrenheit(Temperature):
 
+	__slots__ = ()
 	unit = "°F"
 	multiples = { "°F": 1 }
 	conversions = { "°C": lambda f: (f - 32) * 5/9, "K": lambda f: (f + 459.67) * 5/9 }
@@ -36,6 +39,7 @@ class Fahrenheit(Temperature):
 		
 class Kelvin(Temperature):
 
+	__slots__ = ()
 	unit = "K"
 	multiples = { "K": 1 }
 	conversions = { "°C": lambda k: k - 273.15, "°F": lambda k: (k * 9/5) - 459.67 }
@@ -1,10 +1,13 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
+import math
+import array
 import unittest
 import environment
 
 from units import *
+from language import Language
 
 class TestUnits(unittest.TestCase):
 
@@ -190,6 +193,211 @@ class TestUnits(unittest.TestCase):
 		self.assertFalse( kg2_4 <= kg0_1 )
 		self.assertTrue( kg1_3 <= kg0_5 )
 		self.assertTrue( kg0_5 <= kg1_3 )
+		
+	
+	def test_conversions( self ):
+	
+		kg2 = unit.Unit.create( "2kg" )
+		gal1 = unit.Unit.create( "1gal" )
+		c20 = unit.Unit.create( "20°C" )
+		
+		# Multiples
+		self.assertEqual( kg2.get_value(), 2000 )
+		self.assertEqual( kg2.get_value( unit="kg" ), 2 )
+		
+		# Direct conversions
+		self.assertAlmostEqual( kg2.get_value( unit="lb" ), 4.409246 )
+		self.assertAlmostEqual( c20.get_value( unit="°F" ), 68 )
+		
+		# Multiples of converted units
+		self.assertAlmostEqual( kg2.get_value( unit="oz" ), 70.547936 )
+		self.assertAlmostEqual( gal1.get_value( unit="mL" ), 3785.411784 )
+		
+		# Unavailable conversion
+		self.assertEqual( kg2.get_value( unit="L" ), None )
+		
+		self.assertEqual( kg2.conversion_units, [ "kg", "g", "mg", "lb", "oz" ] )
+		self.assertEqual( gal1.conversion_units, [ "gal", "qt", "pint", "cup", "fl-oz", "hL", "L", "dL", "cL", "mL" ] )
+		
+		
+	def test_convert_array( self ):
+	
+		gravities = [ 1.0, 1.048, 1.065, 1.1 ]
+		
+		for to_unit in [ "points", "°P", "°B" ]:
+			converted = unit.Unit.convert_array( gravities, "SG", to_unit )
+			
+			for i in range( len(gravities) ):
+				self.assertAlmostEqual( converted[i], unit.Unit.create( "%f SG" % gravities[i] ).get_value( unit=to_unit ) )
+		
+		# Multiples on both sides
+		converted = unit.Unit.convert_array( [ 1, 2.5 ], "kg", "oz" )
+		self.assertAlmostEqual( converted[0], unit.Unit.create( "1kg" ).get_value( unit="oz" ) )
+		self.assertAlmostEqual( converted[1], unit.Unit.create( "2.5kg" ).get_value( unit="oz" ) )
+		
+		# Unavailable conversion
+		self.assertEqual( unit.Unit.convert_array( [ 1 ], "L", "kg" ), None )
+		
+		
+	def test_scale_array( self ):
+	
+		weights = array.array( "d", [ 1000.0, 250.0, 30.0 ] )
+		
+		# Scaled in place, as Unit.__imul__
+		unit.Unit.scale_array( weights, 2 )
+		self.assertEqual( list( weights ), [ 2000.0, 500.0, 60.0 ] )
+		
+		unit.Unit.scale_array( weights, unit.Unit.create( "50 %" ) )
+		self.assertEqual( list( weights ), [ 1000.0, 250.0, 30.0 ] )
+		
+		# One factor per value
+		unit.Unit.scale_array( weights, [ 1.0, 2.0, 0.5 ] )
+		self.assertEqual( list( weights ), [ 1000.0, 500.0, 15.0 ] )
+		
+		with self.assertRaises( ValueError ):
+			unit.Unit.scale_array( weights, [ 1.0 ] )
+		
+		# Only arrays of doubles are scaled in place
+		for values in [ [ 1.0, 2.0 ], array.array( "i", [ 1, 2 ] ) ]:
+			with self.assertRaises( ValueError ):
+				unit.Unit.scale_array( values, 2 )
+		
+		# Same results with and without NumPy
+		numpy = unit.numpy
+		
+		try:
+			unit.numpy = None
+			weights = array.array( "d", [ 1000.0, 250.0, 30.0 ] )
+			unit.Unit.scale_array( weights, 2.5 )
+			self.assertEqual( list( weights ), [ 2500.0, 625.0, 75.0 ] )
+			unit.Unit.scale_array( weights, [ 0.5, 2.0, 1.0 ] )
+			self.assertEqual( list( weights ), [ 1250.0, 1250.0, 75.0 ] )
+		
+		finally:
+			unit.numpy = numpy
+		
+		if numpy != None:
+			weights = numpy.array( [ 1000.0, 250.0, 30.0 ] )
+			unit.Unit.scale_array( weights, 2.5 )
+			self.assertEqual( list( weights ), [ 2500.0, 625.0, 75.0 ] )
+			unit.Unit.scale_array( weights, [ 0.5, 2.0, 1.0 ] )
+			self.assertEqual( list( weights ), [ 1250.0, 1250.0, 75.0 ] )
+			
+			with self.assertRaises( ValueError ):
+				unit.Unit.scale_array( numpy.array( [ 1, 2 ] ), 2 )
+		
+		
+	def test_ibu( self ):
+	
+		weights = [ unit.Unit.create( "30g" ), unit.Unit.create( "1oz" ) ]
+		alpha_acids = [ unit.Unit.create( "4~6%" ), unit.Unit.create( "12%" ) ]
+		times = [ unit.Unit.create( "1h" ), unit.Unit.create( "10mn" ) ]
+		gravity = unit.Unit.create( "1.055SG" )
+		volume = unit.Unit.create( "20L" )
+		
+		# Tinseth, single addition: 1.65 * 0.000125^0.055 * (1 - e^-2.4) / 4.15 * 50 mg/L
+		bitterness = ibu.compute( [ 20 ], [ 5 ], [ 3600 ], 1.055, 20 )
+		self.assertAlmostEqual( bitterness[0], 1.65 * pow( 0.000125, 0.055 ) * (1 - math.exp( -2.4 )) / 4.15 * 50 )
+		
+		# Units and raw floats in default units are equivalent
+		self.assertAlmostEqual( ibu.total( weights, alpha_acids, times, gravity, volume ), ibu.total( [ 30, 28.349523125 ], [ 5, 12 ], [ 3600, 600 ], 1.055, 20 ) )
+		
+		# Ranges by bound
+		for formula in ibu.FORMULAS:
+			low = ibu.total( weights, alpha_acids, times, gravity, volume, formula=formula, bound="min" )
+			mid = ibu.total( weights, alpha_acids, times, gravity, volume, formula=formula, bound="mid" )
+			high = ibu.total( weights, alpha_acids, times, gravity, volume, formula=formula, bound="max" )
+			
+			self.assertTrue( low < mid < high )
+		
+		# Rager lowers the utilization of high gravity worts
+		self.assertTrue( ibu.total( [ 20 ], [ 5 ], [ 3600 ], 1.090, 20, formula="rager" ) < ibu.total( [ 20 ], [ 5 ], [ 3600 ], 1.050, 20, formula="rager" ) )
+		
+		with self.assertRaises( ValueError ):
+			ibu.compute( [ 20 ], [ 5, 6 ], [ 3600 ], 1.055, 20 )
+		
+		with self.assertRaises( ValueError ):
+			ibu.compute( [ 20 ], [ 5 ], [ 3600 ], 1.055, 20, formula="garetz" )
+		
+		
+	def test_color( self ):
+	
+		# Table lookups match the interpolation functions
+		for i in range( 900 ):
+			srm = i * 0.0937
+			rgb = color.SRM( srm ).rgb
+			
+			for channel in range( 3 ):
+				fx = color.Color.rgb_functions["rgb"[channel]]
+				expected = round( fx["fx"]( srm ) ) if srm < fx["max"] else 0
+				self.assertLessEqual( abs( rgb[channel] - expected ), 1 )
+		
+		self.assertEqual( color.SRM( 0 ).hex, "#ffffff" )
+		self.assertEqual( color.SRM( 85 ).rgb, ( 0, 0, 0 ) )
+		
+		# Names thresholds
+		self.assertEqual( color.SRM( 1.5 ).name, Language.get( color.Color, "color_2_SRM" ) )
+		self.assertEqual( color.SRM( 8.99 ).name, Language.get( color.Color, "color_6_SRM" ) )
+		self.assertEqual( color.SRM( 9 ).name, Language.get( color.Color, "color_9_SRM" ) )
+		self.assertEqual( color.SRM( 55 ).name, Language.get( color.Color, "color_40_SRM" ) )
+		
+		# Morey equation: 10 lb of 3 °L and 1 lb of 60 °L in 5 gal
+		expected = 1.4922 * pow( (10 * 3 + 60) / 5, 0.6859 )
+		predicted = color.Color.predict( [ unit.Unit.create( "10 lb" ), unit.Unit.create( "1 lb" ) ], [ 3, color.Lovibond( 60 ) ], unit.Unit.create( "5 gal" ) )
+		self.assertAlmostEqual( predicted.get_value( unit="°SRM" ), expected, places=6 )
+		
+		grams = array.array( "d", [ unit.Unit.create( "10 lb" ).get_value( unit="g" ), unit.Unit.create( "1 lb" ).get_value( unit="g" ) ] )
+		predicted = color.Color.predict( grams, [ 3, 60 ], unit.Unit.create( "5 gal" ).get_value( unit="L" ) )
+		self.assertAlmostEqual( predicted.get_value( unit="°SRM" ), expected, places=4 )
+		
+		# Grain colors in EBC or SRM are converted linearly, not as beer colors
+		weights = [ unit.Unit.create( "4 kg" ), unit.Unit.create( "200 g" ) ]
+		lovibonds = [ (6 / 1.97 + 0.76) / 1.3546, (1000 / 1.97 + 0.76) / 1.3546 ]
+		expected = 1.4922 * pow( (weights[0].get_value( unit="lb" ) * lovibonds[0] + weights[1].get_value( unit="lb" ) * lovibonds[1]) / unit.Unit.create( "20 L" ).get_value( unit="gal" ), 0.6859 )
+		
+		predicted = color.Color.predict( weights, [ color.EBC( 6 ), color.EBC( 1000 ) ], unit.Unit.create( "20 L" ) )
+		self.assertAlmostEqual( predicted.get_value( unit="°SRM" ), expected, places=6 )
+		self.assertTrue( 15 < predicted.get_value( unit="°SRM" ) < 20 )
+		
+		predicted = color.Color.predict( weights, [ color.SRM( 6 / 1.97 ), color.SRM( 1000 / 1.97 ) ], 20 )
+		self.assertAlmostEqual( predicted.get_value( unit="°SRM" ), expected, places=4 )
+		
+	def test_slots( self ):
+	
+		for unit_cls in set( unit.Unit.units.values() ):
+			self.assertFalse( hasattr( unit_cls( 1 ), "__dict__" ) )
+		
+		self.assertFalse( hasattr( unit.Unit.create( "1~2kg" ), "__dict__" ) )
+		
+		
+	def test_parse_cache( self ):
+	
+		unit.Unit.clear_parse_cache()
+		
+		self.assertEqual( unit.Unit.parse( "6.5~8.5 %" ), ( 6.5, "%", 8.5 ) )
+		self.assertEqual( unit.Unit.parse( "-2,5 °C" ), ( -2.5, "°C" ) )
+		self.assertEqual( unit.Unit.parse( "not an unit" ), None )
+		
+		kg2 = unit.Unit.create( "2kg" )
+		kg2b = unit.Unit.create( "2kg" )
+		
+		# Created units are distinct objects, even from a cached literal
+		kg2 *= 2
+		self.assertEqual( kg2b.get_value( unit="kg" ), 2 )
+		
+		info = unit.Unit.parse_cache_info()
+		self.assertEqual( info.misses, 4 )
+		self.assertEqual( info.hits, 1 )
+		
+		
+	def test_decompose( self ):
+	
+		self.assertEqual( unit.Unit.create( "3725 s" ).to_string( decompose=True ), "1 h 2 mn 5 s" )
+		self.assertEqual( unit.Unit.create( "3600000 s" ).to_string( decompose=True ), "1000 h" )
+		self.assertEqual( unit.Unit.create( "90 mn" ).to_string( unit="s", decompose=True ), "1 h 30 mn" )
+		self.assertEqual( unit.Unit.create( "1.3 gal" ).to_string( decompose=True ), "1 gal 1 qt 6 fl-oz" )
+		self.assertEqual( unit.Unit.create( "1.5 L" ).to_string( decompose=True ), "1 L 5 dL" )
+		self.assertEqual( unit.Unit.create( "0 L" ).to_string( decompose=True ), "0 mL" )
 
 if __name__ == "__main__":
 	unittest.main()
@@ -9,11 +9,13 @@ class Time(Unit):
 		- Second: s (h, mn)
 	"""
 
+	__slots__ = ()
 	units = {}
 	
 
 class Second(Time):
 
+	__slots__ = ()
 	unit = "s"
 	multiples = { "h": 3600, "mn": 60, "s": 1 }
 	conversions = {}
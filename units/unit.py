@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import re
+import array
 import numbers
-from collections import OrderedDict
+import functools
+
+try:
+	import numpy
+
+except ImportError:
+	numpy = None
 
 class Unit():
 	"""Represents an abstract unit.
@@ -13,6 +20,11 @@ class Unit():
 		- (dict) units: (str => class) array of loaded units.
 		- (dict) multiples: (str => float) array of unit multiples.
 		- (dict) conversions: (str => lambda) array of unit conversions.
+		- (dict) _compiled_conversions: (str => lambda) array of every reachable
+		  unit, multiples included, with its conversion from the default unit.
+		- (tuple) _decomposition: ((str, float), ...) unit multiples sorted from
+		  the largest to the smallest, with factors expressed in the smallest.
+		- (re.Pattern) _parse_regex: compiled expression of unit representations.
 	
 	Attributes:
 		- (float) _value: The value.
@@ -20,7 +32,11 @@ class Unit():
 		
 	"""
 
+	__slots__ = ( "_value", "_unit" )
 	units = {}
+	_compiled_conversions = {}
+	_decomposition = ()
+	_parse_regex = re.compile( r"^\s*([+-]?)\s*([0-9]+(?:[.,][0-9]+)?)(?:\s*~\s*([+-]?)\s*([0-9]+(?:[.,][0-9]+)?))?\s*([a-zA-Z°%]+(?:/[a-zA-Z°%]+)?)\s*$" )
 
 	def __init__( self, value, unit=None ):
 		"""Initialize an unit."""
@@ -51,27 +67,8 @@ class Unit():
 		v = self._value
 		
 		if unit != None:
-			if unit in self.multiples:
-				v /= self.multiples[unit]
-				
-			else:
-				unit_found = False
-				
-				for conversion_unit in self.conversions:
-					if unit == conversion_unit:				
-						v = self.conversions[conversion_unit]( v )
-						unit_found = True
-						break
-						
-					else:
-						if conversion_unit in self.units and unit in self.units[conversion_unit].multiples:
-							transition_unit = Unit.units[conversion_unit]( self.conversions[conversion_unit]( v ), unit=conversion_unit )
-							v = transition_unit.get_value( unit=unit )
-							unit_found = True
-							break
-							
-				if not unit_found:
-					v = None
+			conversion = self._compiled_conversions.get( unit )
+			v = conversion( v ) if conversion != None else None
 		
 		return v
 	
@@ -83,17 +80,7 @@ class Unit():
 			- list -- the available units for conversion.
 		"""
 	
-		units = []
-		
-		for multiple in self.multiples:
-			units.append( multiple )
-			
-		for conversion_unit in self.conversions:
-			if conversion_unit in Unit.units:
-				for multiple in Unit.units[conversion_unit].multiples:
-					units.append( multiple )
-		
-		return units
+		return list( self._compiled_conversions )
 	
 	
 	@property
@@ -129,7 +116,7 @@ class Unit():
 		
 		elif not decompose:
 			unit = self.best_unit
-			value /= self.multiples[unit]
+			value = self._compiled_conversions[unit]( value )
 		
 		else:
 			unit = self._unit
@@ -139,32 +126,18 @@ class Unit():
 			
 		else:
 			values = []
-			last_unit = ""
-			
-			multiples = OrderedDict( sorted( Unit.units[unit].multiples.items(), key=lambda k: k[1], reverse=True ) )
+			decomposition = Unit.units[unit]._decomposition
+			last_unit = decomposition[-1][0]
 			
 			# Get the value in the smallest unit
-			for multiple in multiples:
-				last_unit = multiple
-			
 			value = self.get_value( unit=last_unit )
 			
-			# Update multiples factors
-			for multiple in multiples:
-				if multiple != last_unit:
-					multiples[multiple] /= multiples[last_unit]
-					
-			multiples[last_unit] = 1.0
-			
 			# Decompose value
-			for multiple in multiples:
-				multiple_value = 0
-				
-				while value >= multiples[multiple]:
-					multiple_value += 1
-					value -= multiples[multiple]
-				
-				if multiple_value > 0:
+			for multiple, factor in decomposition:
+				if value >= factor:
+					multiple_value = value // factor
+					value -= multiple_value * factor
+					
 					values.append( "%s %s" % ( Unit.format_value( multiple_value ), multiple ) )
 			
 			if len(values) > 0:
@@ -373,14 +346,25 @@ class Unit():
 	def parse( cls, text ):
 		"""Parses a string representation of a unit into a tuple (float, str [, float]).
 		
+		Parses a string representation of a unit. Results are immutable and
+		kept in a bounded LRU cache, see `parse_cache_info`.
+		
 		Return value:
 			- float -- the number part of the string or the lower value or the range.
 			- str -- the unit part of the string.
 			- float -- the higher value of the range.
 		"""
 		
+		return Unit._parse_text( text )
+		
+	
+	@staticmethod
+	@functools.lru_cache( maxsize=1024 )
+	def _parse_text( text ):
+		"""Cached implementation of `parse`."""
+		
 		elements = None
-		match = re.match( r"^\s*([+-]?)\s*([0-9]+(?:[.,][0-9]+)?)(?:\s*~\s*([+-]?)\s*([0-9]+(?:[.,][0-9]+)?))?\s*([a-zA-Z°%]+(?:/[a-zA-Z°%]+)?)\s*$", text )
+		match = Unit._parse_regex.match( text )
 		
 		if match:
 			lsign = -1.0 if match.group( 1 ) == "-" else 1.0
@@ -395,6 +379,24 @@ class Unit():
 		return elements
 		
 	
+	@classmethod
+	def parse_cache_info( cls ):
+		"""Returns the statistics of the parse cache.
+		
+		Return value:
+			- functools._CacheInfo -- the hits, misses, maxsize and currsize of the cache.
+		"""
+		
+		return Unit._parse_text.cache_info()
+		
+	
+	@classmethod
+	def clear_parse_cache( cls ):
+		"""Empties the parse cache and resets its statistics."""
+		
+		Unit._parse_text.cache_clear()
+		
+	
 	@classmethod
 	def format_value( cls, value ):
 		"""Convert a float to a standardized string."""
@@ -428,6 +430,106 @@ class Unit():
 		return unit
 		
 		
+	@classmethod
+	def convert_array( cls, values, from_unit, to_unit ):
+		"""Converts a whole array of values from an unit to another one.
+		
+		Converts a whole array of values at once with the compiled conversion
+		function of the unit. When NumPy is available, the values are converted
+		as a NumPy array so each arithmetic operation is a single vectorized
+		pass. Otherwise, the values are converted into an `array.array` of
+		doubles. Raw buffers (bytes, bytearray, memoryview) are read as native
+		doubles.
+		
+		Parameters:
+			- (numpy.ndarray|buffer|iterable) values: The values to convert.
+			- (str) from_unit: The unit of the values.
+			- (str) to_unit: The unit in which to convert the values.
+			
+		Return value:
+			- (numpy.ndarray|array.array) -- the converted values.
+			
+			If the asked conversion is unavailable, None is returned.
+		"""
+		
+		converted = None
+		
+		if from_unit in Unit.units and to_unit in Unit.units[from_unit]._compiled_conversions:
+			unit_cls = Unit.units[from_unit]
+			conversion = unit_cls._compiled_conversions[to_unit]
+			factor = unit_cls.multiples[from_unit]
+			
+			if isinstance( values, ( bytes, bytearray, memoryview ) ):
+				values = memoryview( values ).cast( "B" ).cast( "d" )
+			
+			if numpy != None:
+				values = numpy.asarray( values, dtype=numpy.float64 )
+				
+				if factor != 1:
+					values = values * factor
+					
+				converted = conversion( values )
+			
+			else:
+				if factor != 1:
+					converted = array.array( "d", [ conversion( v * factor ) for v in values ] )
+				else:
+					converted = array.array( "d", map( conversion, values ) )
+		
+		return converted
+		
+		
+	@classmethod
+	def scale_array( cls, values, factor ):
+		"""Multiplies a whole array of values in place.
+		
+		The factor follows the `__imul__` semantics: it is a real number or a
+		`Proportion`, whose numeric value is used. It can also be a sequence
+		of factors, one per value. As `convert_array`, the values are scaled
+		as a NumPy array when NumPy is available; an `array.array` of doubles
+		is then scaled through its buffer, without copy. Other sequences,
+		like lists, can not be scaled in place and raise a ValueError.
+		
+		Parameters:
+			- (numpy.ndarray|array.array) values: The values to scale, a float64
+			  NumPy array or an `array.array` of doubles.
+			- (float|Proportion|sequence) factor: The factor, or the factors.
+			
+		Return value:
+			- (numpy.ndarray|array.array) -- the scaled values.
+		"""
+		
+		from .proportion import Proportion
+		
+		if isinstance( values, array.array ):
+			if values.typecode != "d":
+				raise ValueError( "expected an array of doubles, got typecode \"%s\"" % values.typecode )
+		
+		elif numpy == None or not isinstance( values, numpy.ndarray ) or values.dtype != numpy.float64:
+			raise ValueError( "expected an array of doubles or a float64 NumPy array" )
+		
+		if isinstance( factor, Proportion ):
+			factor = factor.numeric_value
+		
+		elif not isinstance( factor, numbers.Real ) and len(factor) != len(values):
+			raise ValueError( "expected %d factors, got %d" % ( len(values), len(factor) ) )
+		
+		if len(values) == 0:
+			pass
+		
+		elif numpy != None:
+			array_values = numpy.frombuffer( values, dtype=numpy.float64 ) if isinstance( values, array.array ) else values
+			array_values *= factor if isinstance( factor, numbers.Real ) else numpy.asarray( factor, dtype=numpy.float64 )
+		
+		elif isinstance( factor, numbers.Real ):
+			values[:] = array.array( "d", [ v * factor for v in values ] )
+		
+		else:
+			values[:] = array.array( "d", [ v * f for v, f in zip( values, factor ) ] )
+		
+		return values
+		
+		
 	@classmethod
 	def get_all_units( cls ):
 		"""Returns the list of all loaded units.
@@ -440,6 +542,16 @@ class Unit():
 		
 		
 class Range(Unit):
+	"""Represents a range of values of the same unit.
+	
+	Attributes:
+		- (Unit) _min: The lower value.
+		- (Unit) _max: The higher value.
+		- (float) _value: The middle of the range, in the default unit.
+		- (str) _unit: The unit of the values.
+	"""
+
+	__slots__ = ( "_min", "_max" )
 
 	def __init__( self, min_value, max_value, unit ):
 		
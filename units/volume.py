@@ -10,11 +10,13 @@ class Volume(Unit):
 		- Gallon: gal (qt, pint, cup, fl-oz)
 	"""
 
+	__slots__ = ()
 	units = {}
 	
 
 class Liter(Volume):
 
+	__slots__ = ()
 	unit = "L"
 	multiples = { "hL": 100, "L": 1, "dL": 0.1, "cL": 0.01, "mL": 0.001 }
 	conversions = { "gal": lambda l: l * 0.264172052 }
@@ -25,6 +27,7 @@ class Liter(Volume):
 
 class Gallon(Volume):
 
+	__slots__ = ()
 	unit = "gal"
 	multiples = { "gal": 1, "qt": 0.25, "pint": 0.125, "cup": 0.0625, "fl-oz": 0.0078125 }
 	conversions = { "L": lambda g: g * 3.785411784 }
@@ -10,11 +10,13 @@ class Weight(Unit):
 		- Pound: lb (oz)
 	"""
 
+	__slots__ = ()
 	units = {}
 	
 
 class Gram(Weight):
 
+	__slots__ = ()
 	unit = "g"
 	multiples = { "kg": 1000, "g": 1, "mg": 0.001 }
 	conversions = { "lb": lambda g: g * 0.002204623 }
@@ -25,6 +27,7 @@ class Gram(Weight):
 
 class Pound(Weight):
 
+	__slots__ = ()
 	unit = "lb"
 	multiples = { "lb": 1, "oz": 0.0625 }
 	conversions = { "g": lambda p: p * 453.59237 }